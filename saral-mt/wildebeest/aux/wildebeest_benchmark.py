@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Throughput benchmark for wildebeest_normalize.py
+Generates reproducible synthetic corpora for a number of scripts and encoding problems, and measures
+lines/sec and MB/sec of norm_clean_string and of the individual normalization step functions,
+as well as startup time and peak RSS. Results are written as JSON, for comparison across commits.
+Examples:
+  PYTHONPATH=../.. python wildebeest_benchmark.py -o benchmark.json
+  PYTHONPATH=../.. python wildebeest_benchmark.py --corpora ascii,arabic --lines 20000 --steps -o benchmark.json
+  PYTHONPATH=../.. python wildebeest_benchmark.py --compare old-benchmark.json -o benchmark.json
+  PYTHONPATH=../.. python wildebeest_benchmark.py --corpora devanagari,bengali,gujarati --steps repair-combining
+"""
+
+import argparse
+import datetime
+import json
+import logging as log
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+import unicodedata as ud
+from wildebeest import wildebeest_normalize
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+log.basicConfig(level=log.INFO)
+
+
+def random_chars(rng: random.Random, code_point_ranges: List[tuple], n: int) -> str:
+    """Random assigned characters from a list of code point ranges (inclusive)."""
+    chars = []
+    while len(chars) < n:
+        start, end = rng.choice(code_point_ranges)
+        char = chr(rng.randint(start, end))
+        if ud.name(char, None):
+            chars.append(char)
+    return ''.join(chars)
+
+
+def windows1252_mojibake(s: str) -> str:
+    """UTF-8 text wrongly decoded as Windows-1252 (with Latin-1 for bytes undefined in Windows-1252)."""
+    result = []
+    for byte in s.encode('utf-8'):
+        try:
+            result.append(bytes([byte]).decode('cp1252'))
+        except UnicodeDecodeError:
+            result.append(chr(byte))
+    return ''.join(result)
+
+
+def ascii_word(rng: random.Random) -> str:
+    word = ''.join(rng.choice('etaoinshrdlucmfwypvbgkjqxz') for _ in range(rng.randint(1, 9)))
+    r = rng.random()
+    if r < 0.1:
+        word = word.capitalize()
+    elif r < 0.15:
+        word += rng.choice(',.;:!?')
+    elif r < 0.2:
+        word = str(rng.randint(0, 9999))
+    return word
+
+
+arabic_letters = 'ابتثجحخدذرسشصضطظعغفقكلمنهويةىءأإآ'
+farsi_letters = 'ابپتثجچحخدذرزژسشصضطظعغفقکگلمنوهیی'
+pashto_letters = 'ابپتټثجځچڅحخدډذرړزژږسشښصضطظعغفقکګلمنڼوهیېۍئ'
+
+
+def arabic_script_word(rng: random.Random, letters: str) -> str:
+    word = ''.join(rng.choice(letters) for _ in range(rng.randint(2, 7)))
+    r = rng.random()
+    if r < 0.2:
+        # diacritics (harakat)
+        word = ''.join(char + (random_chars(rng, [(0x064B, 0x0652)], 1) if rng.random() < 0.4 else '')
+                       for char in word)
+    elif r < 0.35:
+        # presentation forms
+        word = random_chars(rng, [(0xFB50, 0xFDFF), (0xFE70, 0xFEFC)], rng.randint(1, 4))
+    elif r < 0.45:
+        # Arabic-Indic or Extended Arabic-Indic digits
+        word = random_chars(rng, [(0x0660, 0x0669), (0x06F0, 0x06F9)], rng.randint(1, 4))
+    elif r < 0.5:
+        word += rng.choice('،؛؟.')
+    return word
+
+
+# Indic scripts: consonants, vowel signs (incl. virama), nukta, consonants used with nukta,
+# precomposed nukta consonants, digits
+indic_script_specs: Dict[str, tuple] = {
+    'devanagari': ('कखगघङचछजझञटठडढणतथदधनपफबभमयरलवशषसह',
+                   ['', '', 'ा', 'ि', 'ी', 'ु', 'ू', 'े', 'ै', 'ो', 'ौ', 'ं', '्'],
+                   '़', 'कखगजडढफय', [(0x0958, 0x095F)], (0x0966, 0x096F)),
+    'bengali': ('কখগঘঙচছজঝঞটঠডঢণতথদধনপফবভমযরলশষসহ',
+                ['', '', 'া', 'ি', 'ী', 'ু', 'ূ', 'ে', 'ৈ', 'ো', 'ৌ', 'ং', '্'],
+                '়', 'ডঢয', [(0x09DC, 0x09DD), (0x09DF, 0x09DF)], (0x09E6, 0x09EF)),
+    'gujarati': ('કખગઘઙચછજઝઞટઠડઢણતથદધનપફબભમયરલવશષસહ',
+                 ['', '', 'ા', 'િ', 'ી', 'ુ', 'ૂ', 'ે', 'ૈ', 'ો', 'ૌ', 'ં', '્'],
+                 '઼', 'કખગજડઢફ', [], (0x0AE6, 0x0AEF)),
+}
+
+
+def indic_word(rng: random.Random, script: str) -> str:
+    consonants, vowel_signs, nukta, nukta_consonants, precomposed_ranges, digit_range = indic_script_specs[script]
+    syllables = []
+    for _ in range(rng.randint(1, 4)):
+        r = rng.random()
+        if r < 0.1 and precomposed_ranges:
+            # precomposed nukta consonants, e.g. क़ (U+0958)
+            syllables.append(random_chars(rng, precomposed_ranges, 1))
+        elif r < 0.2:
+            # consonant + nukta (e.g. U+093C), in canonical or non-canonical order with a vowel sign
+            consonant = rng.choice(nukta_consonants)
+            vowel_sign = rng.choice(vowel_signs)
+            syllables.append(consonant + nukta + vowel_sign if rng.random() < 0.5
+                             else consonant + vowel_sign + nukta)
+        else:
+            syllables.append(rng.choice(consonants) + rng.choice(vowel_signs))
+    word = ''.join(syllables)
+    if rng.random() < 0.05:
+        word = random_chars(rng, [digit_range], rng.randint(1, 4))
+    elif rng.random() < 0.05:
+        word += '।'
+    return word
+
+
+def cjk_compatibility_word(rng: random.Random) -> str:
+    r = rng.random()
+    if r < 0.3:
+        return random_chars(rng, [(0x4E00, 0x9FA5)], rng.randint(1, 4))  # regular CJK ideographs
+    elif r < 0.45:
+        return random_chars(rng, [(0xFF01, 0xFF5E)], rng.randint(1, 6))  # fullwidth ASCII
+    elif r < 0.55:
+        return random_chars(rng, [(0xFF61, 0xFF9F)], rng.randint(1, 4))  # halfwidth katakana
+    elif r < 0.7:
+        return random_chars(rng, [(0xF900, 0xFAD9)], rng.randint(1, 3))  # CJK compatibility ideographs
+    elif r < 0.85:
+        return random_chars(rng, [(0x2460, 0x24FF), (0x3200, 0x32FF)], rng.randint(1, 2))  # enclosed
+    else:
+        return random_chars(rng, [(0x3300, 0x33FF)], rng.randint(1, 2))  # squared Latin abbreviations
+
+
+def windows1252_mojibake_word(rng: random.Random) -> str:
+    word = rng.choice(['café', 'naïve', 'über', 'Straße', 'façade', 'résumé', 'años', 'coöperate', 'señor',
+                       '“quoted”', '‘single’', '€5', '–', '—', '…', '•', '™', '©2021', 'Zürich', 'Ærø'])
+    return windows1252_mojibake(word) if rng.random() < 0.6 else word
+
+
+def hangul_jamo_word(rng: random.Random) -> str:
+    word = random_chars(rng, [(0xAC00, 0xD7A3)], rng.randint(1, 4))
+    # conjoining jamo (decomposed syllables)
+    return ud.normalize('NFD', word) if rng.random() < 0.7 else word
+
+
+latin_cyrillic_words = ['Москва', 'Казахстан', 'Србија', 'България', 'привет', 'компания', 'London', 'company',
+                        'people', 'Coca-Cola', 'ABC', 'USA', 'XIV', 'www.gov.kz/ru/новости', 'сайт.рф']
+
+
+def latin_cyrillic_word(rng: random.Random) -> str:
+    word = rng.choice(latin_cyrillic_words)
+    if rng.random() < 0.3:
+        # replace a character by a look-alike of the other script
+        look_alikes = {'a': 'а', 'e': 'е', 'o': 'о', 'p': 'р', 'c': 'с', 'x': 'х', 'C': 'С', 'A': 'А',
+                       'а': 'a', 'е': 'e', 'о': 'o', 'р': 'p', 'с': 'c', 'К': 'K', 'М': 'M'}
+        positions = [i for i, char in enumerate(word) if char in look_alikes]
+        if positions:
+            i = rng.choice(positions)
+            word = word[:i] + look_alikes[word[i]] + word[i+1:]
+    return word
+
+
+# corpus name -> (word generator, language code)
+corpus_specs: Dict[str, tuple] = {
+    'ascii': (ascii_word, ''),
+    'arabic': (lambda rng: arabic_script_word(rng, arabic_letters), ''),
+    'farsi': (lambda rng: arabic_script_word(rng, farsi_letters), 'fas'),
+    'pashto': (lambda rng: arabic_script_word(rng, pashto_letters), 'pas'),
+    'devanagari': (lambda rng: indic_word(rng, 'devanagari'), ''),
+    'bengali': (lambda rng: indic_word(rng, 'bengali'), ''),
+    'gujarati': (lambda rng: indic_word(rng, 'gujarati'), ''),
+    'cjk-compatibility': (cjk_compatibility_word, ''),
+    'windows1252-mojibake': (windows1252_mojibake_word, ''),
+    'hangul-jamo': (hangul_jamo_word, ''),
+    'latin-cyrillic': (latin_cyrillic_word, ''),
+}
+
+
+def generate_corpus(corpus_name: str, n_lines: int, seed: int = 1) -> List[str]:
+    """Reproducible synthetic corpus of n_lines lines (mostly with words of the corpus, some ASCII words)."""
+    word_function = corpus_specs[corpus_name][0]
+    rng = random.Random(f'{corpus_name}-{seed}')
+    lines = []
+    for _ in range(n_lines):
+        words = [word_function(rng) if rng.random() < 0.8 else ascii_word(rng) for _ in range(rng.randint(3, 25))]
+        lines.append(' '.join(words))
+    return lines
+
+
+def throughput(lines: list, function: Callable, n_repeats: int, n_bytes: Optional[int] = None) -> dict:
+    """Best of n_repeats runs of function over lines, in lines/sec and (if n_bytes is given) MB/sec."""
+    best_time = None
+    for _ in range(n_repeats):
+        start_time = time.perf_counter()
+        for line in lines:
+            function(line)
+        elapsed_time = time.perf_counter() - start_time
+        if best_time is None or elapsed_time < best_time:
+            best_time = elapsed_time
+    best_time = max(best_time, 1e-9)
+    result = {'time': round(best_time, 6),
+              'lines-per-second': round(len(lines) / best_time, 1)}
+    if n_bytes is not None:
+        result['mb-per-second'] = round(n_bytes / best_time / 1e6, 3)
+    return result
+
+
+def benchmark_corpus(wb: wildebeest_normalize.Wildebeest, lines: List[str], lang_code: str,
+                     n_repeats: int = 3, steps: bool = False, step_names: Optional[List[str]] = None) -> dict:
+    """
+    steps: also benchmark the individual step functions (all of them, or those in step_names),
+    e.g. step_names=['repair-combining'] as a microbenchmark for Indic corpora.
+    """
+    result = {'lines': len(lines),
+              'bytes': sum(len(line.encode('utf-8')) for line in lines),
+              'lang-code': lang_code}
+    # Warm up lazily built tables, so that all repeats measure the same work.
+    ht = {}
+    for line in lines:
+        wb.norm_clean_string(line, ht, lang_code=lang_code)
+    result['changed-lines'] = ht.get('COUNT-ALL', 0)
+    result['norm-clean-string'] = throughput(lines, lambda s: wb.norm_clean_string(s, {}, lang_code=lang_code),
+                                             n_repeats, n_bytes=result['bytes'])
+    if steps:
+        # Each step function on the lines to which it applies (see Wildebeest.ncs_steps).
+        step_results = {}
+        or_reduce = wb.char_type_table.or_reduce
+        line_type_vectors = [or_reduce(line) for line in lines]
+        for group_name, group_function, gate, _char_map, lv_mask in wb.ncs_steps(lang_code):
+            if step_names and group_name not in step_names:
+                continue
+            step_lines = [(line, lv) for line, lv in zip(lines, line_type_vectors)
+                          if all(lv & bits for bits in gate)]
+            if not step_lines:
+                continue
+
+            def apply_step(line_and_lv, function=group_function, takes_lv=bool(lv_mask)):
+                if takes_lv:
+                    return function(line_and_lv[0], lv=line_and_lv[1])
+                return function(line_and_lv[0])
+            step_result = throughput(step_lines, apply_step, n_repeats)
+            step_result['lines'] = len(step_lines)
+            step_results[group_name] = step_result
+        result['steps'] = step_results
+    return result
+
+
+def startup_time(n_repeats: int = 3) -> dict:
+    """Best time (in seconds) of a fresh Python process importing Wildebeest and loading its tables."""
+    code = 'from wildebeest import wildebeest_normalize as wb_norm; wb_norm.Wildebeest().load_look_alike_file(False)'
+    src_dir_path = os.path.dirname(os.path.realpath(__file__))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([os.path.abspath(os.path.join(src_dir_path, '..', '..')),
+                                         env.get('PYTHONPATH', '')])
+    baseline_times, wildebeest_times = [], []
+    for _ in range(n_repeats):
+        for command, times in (('pass', baseline_times), (code, wildebeest_times)):
+            start_time = time.perf_counter()
+            subprocess.run([sys.executable, '-c', command], env=env, check=True)
+            times.append(time.perf_counter() - start_time)
+    return {'process': round(min(wildebeest_times), 4),
+            'wildebeest': round(min(wildebeest_times) - min(baseline_times), 4)}
+
+
+def peak_rss_kb() -> Optional[int]:
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss // 1024 if sys.platform == 'darwin' else max_rss  # bytes on macOS, kilobytes on Linux
+
+
+def git_commit() -> Optional[str]:
+    try:
+        src_dir_path = os.path.dirname(os.path.realpath(__file__))
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=src_dir_path, capture_output=True,
+                              text=True, check=True).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(old_results: dict, new_results: dict) -> None:
+    """Logs the speed ratios (new/old) of norm_clean_string per corpus."""
+    log.info(f"Comparison with {old_results.get('git-commit')} ({old_results.get('date')})")
+    for corpus_name, new_corpus_result in new_results['corpora'].items():
+        old_corpus_result = old_results.get('corpora', {}).get(corpus_name)
+        if old_corpus_result:
+            old_speed = old_corpus_result['norm-clean-string']['lines-per-second']
+            new_speed = new_corpus_result['norm-clean-string']['lines-per-second']
+            log.info(f'   {corpus_name}: {old_speed:.0f} -> {new_speed:.0f} lines/sec ({new_speed / old_speed:.2f}x)')
+            for group_name, new_step_result in new_corpus_result.get('steps', {}).items():
+                old_step_result = old_corpus_result.get('steps', {}).get(group_name)
+                if old_step_result:
+                    old_speed = old_step_result['lines-per-second']
+                    new_speed = new_step_result['lines-per-second']
+                    log.info(f'      {group_name}: {old_speed:.0f} -> {new_speed:.0f} lines/sec '
+                             f'({new_speed / old_speed:.2f}x)')
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Benchmarks the throughput of Wildebeest normalization')
+    parser.add_argument('-o', '--output', type=str, default=None, metavar='JSON-FILENAME',
+                        help='benchmark results (default: STDOUT)')
+    parser.add_argument('--corpora', type=str, default=','.join(corpus_specs.keys()), metavar='CORPORA',
+                        help=f"comma-separated list of corpora (default: {','.join(corpus_specs.keys())})")
+    parser.add_argument('--lines', type=int, default=10000, metavar='N', help='lines per corpus (default: 10000)')
+    parser.add_argument('--repeats', type=int, default=3, metavar='N', help='best of N runs (default: 3)')
+    parser.add_argument('--seed', type=int, default=1, help='random seed for corpus generation (default: 1)')
+    parser.add_argument('--steps', type=str, nargs='?', const='', default=None, metavar='STEPS',
+                        help='also benchmark the individual step functions (optionally a comma-separated list, '
+                             'e.g. repair-combining)')
+    parser.add_argument('--compare', type=str, default=None, metavar='JSON-FILENAME',
+                        help='log speed ratios relative to the results of an earlier benchmark')
+    parser.add_argument('--write-corpora', type=str, default=None, metavar='DIRECTORY',
+                        help='write the synthetic corpora to DIRECTORY (as <corpus>.txt)')
+    args = parser.parse_args(argv)
+    corpus_names = [corpus_name for corpus_name in args.corpora.split(',') if corpus_name]
+    for corpus_name in corpus_names:
+        if corpus_name not in corpus_specs:
+            parser.error(f"Unknown corpus '{corpus_name}'")
+
+    results = {'wildebeest-version': wildebeest_normalize.__version__,
+               'git-commit': git_commit(),
+               'date': datetime.datetime.now().isoformat(timespec='seconds'),
+               'python-version': platform.python_version(),
+               'platform': platform.platform(),
+               'lines-per-corpus': args.lines,
+               'seed': args.seed,
+               'startup-time': startup_time()}
+    start_time = time.perf_counter()
+    wb = wildebeest_normalize.Wildebeest()
+    wb.load_look_alike_file(verbose=False)
+    results['init-time'] = round(time.perf_counter() - start_time, 4)
+    results['corpora'] = {}
+    for corpus_name in corpus_names:
+        lines = generate_corpus(corpus_name, args.lines, args.seed)
+        if args.write_corpora:
+            os.makedirs(args.write_corpora, exist_ok=True)
+            with open(os.path.join(args.write_corpora, f'{corpus_name}.txt'), 'w', encoding='utf-8') as f:
+                f.write(''.join([line + '\n' for line in lines]))
+        lang_code = corpus_specs[corpus_name][1]
+        corpus_result = benchmark_corpus(wb, lines, lang_code, n_repeats=args.repeats, steps=args.steps is not None,
+                                         step_names=[step for step in (args.steps or '').split(',') if step])
+        results['corpora'][corpus_name] = corpus_result
+        speed = corpus_result['norm-clean-string']
+        log.info(f"{corpus_name}: {speed['lines-per-second']:.0f} lines/sec, {speed['mb-per-second']:.2f} MB/sec "
+                 f"({corpus_result['changed-lines']}/{corpus_result['lines']} lines changed)")
+    results['peak-rss-kb'] = peak_rss_kb()
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare_results(json.load(f), results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -12,6 +12,7 @@ and/or new or updated normalization steps in wildebeest_normalize.py
 """
 
 import codecs
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from itertools import chain
 import logging as log
@@ -20,6 +21,7 @@ from pathlib import Path
 import re
 import unicodedata as ud
 import sys
+from typing import List, Optional, Tuple
 from wildebeest import wildebeest_normalize
 
 log.basicConfig(level=log.INFO)
@@ -399,7 +401,7 @@ def build_wildebeest_tsv_file(codeblock: str, verbose: bool = True, supplementar
         n_input_lines = 0
         output_lines = []
         current_function_name = ''
-        with open('../wildebeest_normalize.py', 'r', encoding='utf-8') as f_in:
+        with open('../wildebeest_normalize_lib.py', 'r', encoding='utf-8') as f_in:
             for line in f_in:
                 n_input_lines += 1
                 if re.match(r'\s*#', line):
@@ -588,124 +590,197 @@ def init_core_mapping_dict() -> None:
         log.error(f"Could not open {full_unicode_composition_exclusion_filename}")
 
 
-def compare_mappings_with_unicodedata_normalize_nfkc_on_mapping_files() -> None:
+# Wildebeest shared by the comparisons with NFKC (see shared_wildebeest) and Wildebeest of a worker process
+# of wb_nfkc_normalize, kept warm across chunks.
+shared_wb: Optional[wildebeest_normalize.Wildebeest] = None
+worker_wb: Optional[wildebeest_normalize.Wildebeest] = None
+
+
+def shared_wildebeest() -> wildebeest_normalize.Wildebeest:
+    global shared_wb
+    if shared_wb is None:
+        shared_wb = wildebeest_normalize.Wildebeest()
+    return shared_wb
+
+
+def init_worker_wildebeest() -> None:
+    global worker_wb
+    worker_wb = wildebeest_normalize.Wildebeest()
+
+
+def wb_nfkc_normalize_strings(wb: wildebeest_normalize.Wildebeest, strings: List[str]) -> List[Tuple[str, str]]:
+    """Returns the Wildebeest and NFKC normalization of each string."""
+    return list(zip(wb.norm_clean_batch(strings, {}), [ud.normalize('NFKC', s) for s in strings]))
+
+
+def wb_nfkc_normalize_chunk(strings: List[str]) -> List[Tuple[str, str]]:
+    """Worker function of wb_nfkc_normalize."""
+    return wb_nfkc_normalize_strings(worker_wb, strings)
+
+
+def wb_nfkc_normalize(strings: List[str], n_workers: int = 1) -> List[Tuple[str, str]]:
+    """
+    Returns the Wildebeest and NFKC normalization of each string, by a single shared Wildebeest, or with n_workers > 1,
+    in shards by a pool of n_workers processes, each with a single Wildebeest.
+    """
+    if n_workers <= 1 or len(strings) < 10000:  # not worth starting worker processes
+        return wb_nfkc_normalize_strings(shared_wildebeest(), strings)
+    chunk_size = -(-len(strings) // (4 * n_workers))
+    chunks = [strings[i:i + chunk_size] for i in range(0, len(strings), chunk_size)]
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=init_worker_wildebeest) as executor:
+        return list(chain.from_iterable(executor.map(wb_nfkc_normalize_chunk, chunks)))
+
+
+def compare_mappings_with_unicodedata_normalize_nfkc_on_mapping_files(n_workers: int = 1) -> None:
     """For testing, compares the mappings in ../data/*MappingAnnotated files with standard NFKC normalization."""
     src_dir_path = os.path.dirname(os.path.realpath(__file__))
     data_dir_path = os.path.join(src_dir_path, "../data")
     log_filename = os.path.join(data_dir_path, 'log-diff-wb-nfkc-mf.txt')
+    # Sources and targets of all files are normalized in one go (see wb_nfkc_normalize).
+    file_entries = []
+    for filename in sorted(os.listdir(data_dir_path)):
+        if re.match(r'.*MappingAnnotated\.tsv$', filename):
+            full_filename = os.path.join(data_dir_path, filename)
+            sources, reverse_dict = [], {}
+            with open(full_filename, 'r', encoding='utf-8') as f_in:
+                line_number = 0
+                for line in f_in:
+                    line_number += 1
+                    tsv_list = re.split(r'\t', line.rstrip())
+                    if (len(tsv_list) >= 2) and (line_number >= 2):
+                        sources.append(tsv_list[0])
+                        reverse_dict[tsv_list[1]] = True
+            targets = [target for target in sorted(reverse_dict.keys()) if target != '']
+            file_entries.append((filename, sources, targets))
+    normalizations = iter(wb_nfkc_normalize(list(chain.from_iterable(sources + targets
+                                                                     for _, sources, targets in file_entries)),
+                                            n_workers))
     n_files = 0
     total_n_diffs = 0
     total_n_tests = 0
     with open(log_filename, 'w', encoding='utf-8') as f_out:
-        for filename in sorted(os.listdir(data_dir_path)):
-            if re.match(r'.*MappingAnnotated\.tsv$', filename):
-                full_filename = os.path.join(data_dir_path, filename)
-                with open(full_filename, 'r', encoding='utf-8') as f_in:
-                    log.info(filename)
-                    f_out.write(filename + '\n')
-                    n_files += 1
-                    n_tests = 0
-                    n_diffs = 0
-                    line_number = 0
-                    reverse_dict = {}
-                    for line in f_in:
-                        line_number += 1
-                        tsv_list = re.split(r'\t', line.rstrip())
-                        if (len(tsv_list) >= 2) and (line_number >= 2):
-                            wb = wildebeest_normalize.Wildebeest()
-                            ht = {}
-                            source = tsv_list[0]
-                            target = tsv_list[1]
-                            reverse_dict[target] = True
-                            source_wb = wb.norm_clean_string(source, ht, loc_id=str(f'{filename}.S.{line_number}'))
-                            source_nfkc = ud.normalize('NFKC', source)
-                            source_descr = string_to_character_unicode_descriptions(source)
-                            n_tests += 1
-                            total_n_tests += 1
-                            if source_wb != source_nfkc:
-                                if (source_wb == '') and (source_nfkc == source):
-                                    annotation = 'DEL-SAME'
-                                else:
-                                    annotation = ''
-                                n_diffs += 1
-                                total_n_diffs += 1
-                                f_out.write(f"{annotation}\ts:{source}\twb:{source_wb}\tnfkc:{source_nfkc}"
-                                            f"\t{source_descr}\t{filename}\n")
-                            elif ('Digit' in filename) or ('Python' in filename):
-                                f_out.write(f"IDENTICAL\ts:{source}\twb:{source_wb}\tnfkc:{source_nfkc}"
-                                            f"\t{source_descr}\t{filename}\n")
-                    for target in sorted(reverse_dict.keys()):
-                        if target != '':
-                            target_wb = wb.norm_clean_string(target, ht, loc_id=str(f'{filename}.T.{line_number}'))
-                            target_nfkc = ud.normalize('NFKC', target)
-                            target_descr = string_to_character_unicode_descriptions(target)
-                            n_tests += 1
-                            total_n_tests += 1
-                            if target_wb != target_nfkc:
-                                annotation = 'REV'
-                                n_diffs += 1
-                                total_n_diffs += 1
-                                f_out.write(f"{annotation}\ts:{target}\twb:{target_wb}\tnfkc:{target_nfkc}"
-                                            f"\t{target_descr}\t{filename}\n")
-                    log.info(f'    {n_diffs}/{n_tests} diffs in {filename}')
+        for filename, sources, targets in file_entries:
+            log.info(filename)
+            f_out.write(filename + '\n')
+            n_files += 1
+            n_tests = 0
+            n_diffs = 0
+            for source in sources:
+                source_wb, source_nfkc = next(normalizations)
+                source_descr = string_to_character_unicode_descriptions(source)
+                n_tests += 1
+                total_n_tests += 1
+                if source_wb != source_nfkc:
+                    if (source_wb == '') and (source_nfkc == source):
+                        annotation = 'DEL-SAME'
+                    else:
+                        annotation = ''
+                    n_diffs += 1
+                    total_n_diffs += 1
+                    f_out.write(f"{annotation}\ts:{source}\twb:{source_wb}\tnfkc:{source_nfkc}"
+                                f"\t{source_descr}\t{filename}\n")
+                elif ('Digit' in filename) or ('Python' in filename):
+                    f_out.write(f"IDENTICAL\ts:{source}\twb:{source_wb}\tnfkc:{source_nfkc}"
+                                f"\t{source_descr}\t{filename}\n")
+            for target in targets:
+                target_wb, target_nfkc = next(normalizations)
+                target_descr = string_to_character_unicode_descriptions(target)
+                n_tests += 1
+                total_n_tests += 1
+                if target_wb != target_nfkc:
+                    annotation = 'REV'
+                    n_diffs += 1
+                    total_n_diffs += 1
+                    f_out.write(f"{annotation}\ts:{target}\twb:{target_wb}\tnfkc:{target_nfkc}"
+                                f"\t{target_descr}\t{filename}\n")
+            log.info(f'    {n_diffs}/{n_tests} diffs in {filename}')
         log.info(f'{total_n_diffs}/{total_n_tests} total diffs in {n_files} files')
 
 
-def compare_mappings_with_unicodedata_normalize_nfkc_on_unicode_data() -> None:
+def compare_mappings_with_unicodedata_normalize_nfkc_on_unicode_data(n_workers: int = 1) -> None:
     """For testing, for all entries in UnicodeData.txt file, compare Wildebeest and NFKC."""
     src_dir_path = os.path.dirname(os.path.realpath(__file__))
     data_dir_path = os.path.join(src_dir_path, "../data")
     unicode_filename = os.path.join(data_dir_path, 'UnicodeData.txt')
     log_filename = os.path.join(data_dir_path, 'log-diff-wb-nfkc-uc.txt')
     n_diffs, n_tests, line_number = 0, 0, 0
-    ht, reverse_dict = {}, {}
-    wb = wildebeest_normalize.Wildebeest()
+    sources, reverse_dict = [], {}
+    with open(unicode_filename, 'r', encoding='utf-8') as f_in:
+        for line in f_in:
+            line_number += 1
+            unicode_record = re.split(r';', line.rstrip())
+            if len(unicode_record) >= 2:
+                # 00D4;LATIN CAPITAL LETTER O WITH CIRCUMFLEX;Lu;0;L;004F 0302;;;;N;LATIN...CIRCUMFLEX;;;00F4;
+                hex_string = unicode_record[0]     # e.g. 095F
+                sources.append(chr(int(hex_string, 16)))
+                decomp_ssv = unicode_record[5]     # e.g. '092F 093C'
+                decomp_codes = decomp_ssv.split()  # e.g. ['092F', '093C']
+                if (len(decomp_codes) >= 1) and (decomp_codes[0].startswith('<')):
+                    decomp_codes = decomp_codes[1:]
+                decomp_chars = [chr(int(x, 16)) for x in decomp_codes]  # e.g. ['य', '़']
+                target = ''.join(decomp_chars)  # e.g. 'य़' (2 characters)
+                reverse_dict[target] = True
+    targets = [target for target in sorted(reverse_dict.keys()) if target != '']
+    normalizations = iter(wb_nfkc_normalize(sources + targets, n_workers))
     with open(log_filename, 'w', encoding='utf-8') as f_out:
-        with open(unicode_filename, 'r', encoding='utf-8') as f_in:
-            for line in f_in:
-                line_number += 1
-                unicode_record = re.split(r';', line.rstrip())
-                if len(unicode_record) >= 2:
-                    # 00D4;LATIN CAPITAL LETTER O WITH CIRCUMFLEX;Lu;0;L;004F 0302;;;;N;LATIN...CIRCUMFLEX;;;00F4;
-                    hex_string = unicode_record[0]     # e.g. 095F
-                    source = chr(int(hex_string, 16))
-                    decomp_ssv = unicode_record[5]     # e.g. '092F 093C'
-                    decomp_codes = decomp_ssv.split()  # e.g. ['092F', '093C']
-                    if (len(decomp_codes) >= 1) and (decomp_codes[0].startswith('<')):
-                        decomp_codes = decomp_codes[1:]
-                    decomp_chars = [chr(int(x, 16)) for x in decomp_codes]  # e.g. ['य', '़']
-                    target = ''.join(decomp_chars)  # e.g. 'य़' (2 characters)
-                    reverse_dict[target] = True
-                    source_wb = wb.norm_clean_string(source, ht, loc_id=str(f'S.{line_number}'))
-                    source_nfkc = ud.normalize('NFKC', source)
-                    source_descr = string_to_character_unicode_descriptions(source)
-                    n_tests += 1
-                    if ((assert_wb_dict.get(source, None) == source_wb)
-                            and (assert_nfkc_dict.get(source, None) == source_nfkc)):
-                        continue
-                    elif source_wb != source_nfkc:
-                        if (source_wb == '') and (source_nfkc == source):
-                            annotation = 'DEL-SAME'
-                        else:
-                            annotation = ''
-                        n_diffs += 1
-                        f_out.write(f"{annotation}\ts:{source}\twb:{source_wb}\tnfkc:{source_nfkc}\t{source_descr}\n")
-            for target in sorted(reverse_dict.keys()):
-                if target != '':
-                    target_wb = wb.norm_clean_string(target, ht, loc_id=str(f'T.{line_number}'))
-                    target_nfkc = ud.normalize('NFKC', target)
-                    target_descr = string_to_character_unicode_descriptions(target)
-                    n_tests += 1
-                    if target_wb != target_nfkc:
-                        if (target_wb == '') and (target_nfkc == target):
-                            annotation = "REV DEL-SAME"
-                        else:
-                            annotation = 'REV'
-                        n_diffs += 1
-                        f_out.write(f"{annotation}\ts:{target}\twb:{target_wb}\tnfkc:{target_nfkc}\t{target_descr}\n")
+        for source in sources:
+            source_wb, source_nfkc = next(normalizations)
+            n_tests += 1
+            if ((assert_wb_dict.get(source, None) == source_wb)
+                    and (assert_nfkc_dict.get(source, None) == source_nfkc)):
+                continue
+            elif source_wb != source_nfkc:
+                if (source_wb == '') and (source_nfkc == source):
+                    annotation = 'DEL-SAME'
+                else:
+                    annotation = ''
+                n_diffs += 1
+                source_descr = string_to_character_unicode_descriptions(source)
+                f_out.write(f"{annotation}\ts:{source}\twb:{source_wb}\tnfkc:{source_nfkc}\t{source_descr}\n")
+        for target in targets:
+            target_wb, target_nfkc = next(normalizations)
+            n_tests += 1
+            if target_wb != target_nfkc:
+                if (target_wb == '') and (target_nfkc == target):
+                    annotation = "REV DEL-SAME"
+                else:
+                    annotation = 'REV'
+                n_diffs += 1
+                target_descr = string_to_character_unicode_descriptions(target)
+                f_out.write(f"{annotation}\ts:{target}\twb:{target_wb}\tnfkc:{target_nfkc}\t{target_descr}\n")
         log.info(f'{n_diffs}/{n_tests} total diffs in {line_number} lines')
 
 
+def check_assert_files(n_workers: int = 1) -> int:
+    """
+    Regression check, e.g. after rebuilding mapping files: Wildebeest must still normalize the entries of
+    ../data/assert.tsv and assert-preserve.tsv as asserted there (see load_assert_files).
+    Writes the differences to ../data/log-diff-assert.txt and returns their number.
+    Entries whose NFKC reference differs from unicodedata.normalize (e.g. after a Unicode update of Python)
+    are logged as NFKC-CHANGED, but not counted.
+    """
+    if not assert_wb_dict:
+        load_assert_files()
+    src_dir_path = os.path.dirname(os.path.realpath(__file__))
+    data_dir_path = os.path.join(src_dir_path, "../data")
+    log_filename = os.path.join(data_dir_path, 'log-diff-assert.txt')
+    sources = list(assert_wb_dict.keys())
+    n_diffs, n_nfkc_diffs = 0, 0
+    with open(log_filename, 'w', encoding='utf-8') as f_out:
+        for source, (source_wb, source_nfkc) in zip(sources, wb_nfkc_normalize(sources, n_workers)):
+            source_descr = string_to_character_unicode_descriptions(source)
+            if source_wb != assert_wb_dict[source]:
+                n_diffs += 1
+                f_out.write(f"\ts:{source}\twb:{source_wb}\tassert:{assert_wb_dict[source]}\t{source_descr}\n")
+            if source_nfkc != assert_nfkc_dict[source]:
+                n_nfkc_diffs += 1
+                f_out.write(f"NFKC-CHANGED\ts:{source}\tnfkc:{source_nfkc}\tassert:{assert_nfkc_dict[source]}"
+                            f"\t{source_descr}\n")
+    log.info(f'{n_diffs}/{len(sources)} asserted entries normalized differently ({n_nfkc_diffs} NFKC changes), '
+             f'see {log_filename}')
+    return n_diffs
+
+
 def mapping_to_assert_orig_wb_nfkc(filename_i: str, filename_o: str) -> None:
     """
     For testing, build initial draft for an assert.tsv file, which serves as a basis of manual verification.
@@ -824,6 +899,13 @@ def rebuild_all_mapping_files() -> None:
             build_wildebeest_tsv_file(codeblock)
             n_files += 1
     log.info(f'Rebuilt {n_files} mapping files')
+    build_table_artifact()
+
+
+def build_table_artifact() -> None:
+    """Writes the prebuilt tables loaded by Wildebeest at startup (see Wildebeest.write_table_artifact)."""
+    wb = wildebeest_normalize.Wildebeest(use_table_artifact=False)
+    wb.write_table_artifact()
 
 
 def main(argv):
@@ -837,10 +919,17 @@ def main(argv):
         build_wildebeest_tsv_file(codeblock)
     elif (len(argv) >= 1) and (argv[0] == 'rebuild-all-mapping-files'):
         rebuild_all_mapping_files()
-    elif (len(argv) >= 1) and (argv[0] == 'compare-wb-nfkc-mf'):
-        compare_mappings_with_unicodedata_normalize_nfkc_on_mapping_files()
-    elif (len(argv) >= 1) and (argv[0] == 'compare-wb-nfkc-uc'):
-        compare_mappings_with_unicodedata_normalize_nfkc_on_unicode_data()
+    elif (len(argv) >= 1) and (argv[0] == 'build-table-artifact'):
+        build_table_artifact()
+    elif (len(argv) >= 1) and (argv[0] in ('compare-wb-nfkc-mf', 'compare-wb-nfkc-uc', 'check-asserts')):
+        # optional number of worker processes, e.g. compare-wb-nfkc-uc 8
+        n_workers = int(argv[1]) if len(argv) >= 2 else (os.cpu_count() or 1)
+        if argv[0] == 'compare-wb-nfkc-mf':
+            compare_mappings_with_unicodedata_normalize_nfkc_on_mapping_files(n_workers)
+        elif argv[0] == 'compare-wb-nfkc-uc':
+            compare_mappings_with_unicodedata_normalize_nfkc_on_unicode_data(n_workers)
+        elif check_assert_files(n_workers):
+            sys.exit(1)
     elif (len(argv) >= 3) and (argv[0] == 'mapping-to-assert-orig-wb-nfkc'):
         mapping_to_assert_orig_wb_nfkc(argv[1], argv[2])
     elif (len(argv) >= 4) and (argv[0] == 'addenda-to-assert-orig-wb-nfkc'):
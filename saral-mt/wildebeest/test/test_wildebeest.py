@@ -3,8 +3,15 @@ Written by Ulf Hermjakob, USC/ISI
 Pytest for wildebeest_normalize.py
 """
 # -*- encoding: utf-8 -*-
+import asyncio
+import io
+import json
 import logging as log
+import os
+import pickle
+import threading
 import wildebeest.wildebeest_normalize as wb_norm
+import wildebeest.wildebeest_server as wb_server
 
 log.basicConfig(level=log.INFO)
 
@@ -21,8 +28,576 @@ def test_indic_diacritics():
     assert norm_s == ref_norm_s
 
 
+def test_combining_modifiers_with_nukta():
+    # Vowel sign + nukta (Devanagari, Bengali, Gujarati) is reordered; a vowel sign and nukta of different scripts not.
+    s = 'कि\u093C ডা\u09BC કે\u0ABC কি\u093C'
+    norm_s = wb.repair_combining_modifiers_with_nukta(s)
+    ref_norm_s = 'क\u093Cि ড\u09BCা ક\u0ABCે কি\u093C'
+    assert norm_s == ref_norm_s
+
+
 def test_indic_numbers():
     s = '₹९० ₹൯൦'
     norm_s = wb.map_digits_to_ascii(s)
     ref_norm_s = '₹90 ₹90'
     assert norm_s == ref_norm_s
+
+
+def test_compiled_engine_matches_stepwise():
+    """Merged character-mapping steps must yield the same output and stats as calling each step separately."""
+    test_dir_path = os.path.dirname(os.path.realpath(__file__))
+    data_dir_path = os.path.join(test_dir_path, '..', 'data')
+    lines = []
+    for filename in ('wildebeest-test.txt', 'wildebeest-test-windows1252.txt'):
+        with open(os.path.join(test_dir_path, 'data', filename), 'r', encoding='utf-8', errors='surrogateescape') as f:
+            lines += [line.rstrip() for line in f]
+    for filename in ('assert.tsv', 'assert-preserve.tsv'):
+        with open(os.path.join(data_dir_path, filename), 'r', encoding='utf-8') as f:
+            lines += [line.split('\t')[0] for line in f]
+    wb_stepwise = wb_norm.Wildebeest(compiled=False)
+    wb_compiled = wb_norm.Wildebeest()
+    wb_stepwise.load_look_alike_file()
+    wb_compiled.load_look_alike_file()
+    for lang_code in ('', 'fas', 'pas'):
+        ht_stepwise, ht_compiled = {}, {}
+        for line_number, line in enumerate(lines, 1):
+            norm_stepwise = wb_stepwise.norm_clean_string(line, ht_stepwise, lang_code, loc_id=str(line_number))
+            norm_compiled = wb_compiled.norm_clean_string(line, ht_compiled, lang_code, loc_id=str(line_number))
+            assert norm_compiled == norm_stepwise
+        assert ht_compiled == ht_stepwise
+
+
+def test_parallel_lines_match_sequential():
+    """Parallel normalization must preserve line order and produce the same change stats."""
+    test_dir_path = os.path.dirname(os.path.realpath(__file__))
+    with open(os.path.join(test_dir_path, 'data', 'wildebeest-test.txt'), 'r', encoding='utf-8') as f:
+        text = f.read() * 3
+    results = []
+    for n_workers in (1, 3):
+        wb_lines = wb_norm.Wildebeest()
+        wb_lines.load_look_alike_file()
+        ht = {'SKIP-digit': 1}
+        output_file = io.StringIO()
+        if n_workers == 1:
+            wb_lines.norm_clean_lines(ht, io.StringIO(text), output_file)
+        else:
+            wb_lines.norm_clean_lines_in_parallel(ht, io.StringIO(text), output_file, n_workers=n_workers,
+                                                  chunk_size=5)
+        results.append((output_file.getvalue(), ht, wb_lines.look_alike_dict, wb_lines.look_alike_unchanged_dict))
+    assert results[0] == results[1]
+
+
+def test_threads_match_sequential():
+    """Threads sharing one Wildebeest must produce the same output and stats as sequential normalization."""
+    test_dir_path = os.path.dirname(os.path.realpath(__file__))
+    with open(os.path.join(test_dir_path, 'data', 'wildebeest-test.txt'), 'r', encoding='utf-8') as f:
+        text = f.read() * 3
+    results = []
+    for n_threads in (1, 4):
+        wb_lines = wb_norm.Wildebeest()
+        ht = {'SKIP-punct': 1}
+        output_file = io.StringIO()
+        if n_threads == 1:
+            wb_lines.norm_clean_lines(ht, io.StringIO(text), output_file)
+        else:
+            wb_lines.norm_clean_lines_threaded(ht, io.StringIO(text), output_file, n_threads=n_threads, chunk_size=3)
+        results.append((output_file.getvalue(), ht, wb_lines.look_alike_dict, wb_lines.look_alike_unchanged_dict))
+    assert results[0] == results[1]
+
+
+def test_iter_normalize():
+    """Generator and async streaming API produce the same lines and stats as norm_clean_batch."""
+    test_dir_path = os.path.dirname(os.path.realpath(__file__))
+    with open(os.path.join(test_dir_path, 'data', 'wildebeest-test.txt'), 'r', encoding='utf-8') as f:
+        lines = [line.rstrip() for line in f] * 3
+    ref_ht = {'SKIP-punct': 1}
+    ref_lines = wb.norm_clean_batch(lines, ref_ht, lang_code='fas',
+                                    loc_ids=[str(line_number) for line_number in range(1, len(lines) + 1)])
+    ht = {'SKIP-punct': 1}
+    assert list(wb.iter_normalize(iter(lines), ht, lang_code='fas', batch_size=7)) == ref_lines
+    assert ht == ref_ht
+
+    async def stream_lines(n_read_lines: list):
+        for line in lines:
+            n_read_lines[0] += 1
+            await asyncio.sleep(0)
+            yield line
+
+    async def normalize_stream():
+        async_ht = {'SKIP-punct': 1}
+        n_read_lines = [0]
+        results = []
+        async for result in wb.aiter_normalize(stream_lines(n_read_lines), async_ht, lang_code='fas', batch_size=5):
+            results.append(result)
+            assert n_read_lines[0] <= len(results) + 2 * 5 + 5 + 1  # bounded read-ahead
+        # asyncio.StreamReader of UTF-8 bytes
+        reader = asyncio.StreamReader()
+        reader.feed_data(''.join(line + '\n' for line in lines).encode('utf-8'))
+        reader.feed_eof()
+        stream_results = [result async for result in wb.aiter_normalize(reader, lang_code='fas',
+                                                                         ht={'SKIP-punct': 1})]
+        return results, async_ht, stream_results
+
+    async_results, async_ht, stream_results = asyncio.run(normalize_stream())
+    assert async_results == ref_lines and stream_results == ref_lines
+    assert async_ht == ref_ht
+
+
+def test_batch_matches_norm_clean_string():
+    """norm_clean_batch must produce the same lines and change stats as norm_clean_string."""
+    test_dir_path = os.path.dirname(os.path.realpath(__file__))
+    with open(os.path.join(test_dir_path, 'data', 'wildebeest-test.txt'), 'r', encoding='utf-8') as f:
+        lines = [line.rstrip() for line in f] * 2
+    loc_ids = [str(line_number) for line_number in range(1, len(lines) + 1)]
+    for lang_code in ('', 'fas'):
+        ht_string, ht_batch = {'SKIP-punct': 1}, {'SKIP-punct': 1}
+        string_lines = [wb.norm_clean_string(line, ht_string, lang_code=lang_code, loc_id=loc_id)
+                        for line, loc_id in zip(lines, loc_ids)]
+        assert wb.norm_clean_batch(lines, ht_batch, lang_code=lang_code, loc_ids=loc_ids) == string_lines
+        assert ht_batch == ht_string
+
+
+def test_skip_steps_specialization():
+    """A Wildebeest specialized for skipped steps loads fewer mappings, but normalizes like ht 'SKIP-' entries."""
+    test_dir_path = os.path.dirname(os.path.realpath(__file__))
+    with open(os.path.join(test_dir_path, 'data', 'wildebeest-test.txt'), 'r', encoding='utf-8') as f:
+        lines = [line.rstrip() for line in f]
+    skip_steps = ['cjk', 'width', 'font', 'small', 'vertical', 'enclosure', 'pres-form', 'look-alike']
+    wb_full = wb_norm.Wildebeest(use_table_artifact=False)
+    wb_specialized = wb_norm.Wildebeest(use_table_artifact=False, skip_steps=skip_steps, lang_code='fas')
+    assert len(wb_specialized.mapping_dict) < len(wb_full.mapping_dict)
+    ht_full = {f'SKIP-{step}': 1 for step in skip_steps}
+    ht_specialized = dict(ht_full)
+    full_lines = [wb_full.norm_clean_string(line, ht_full, lang_code='fas') for line in lines]
+    assert [wb_specialized.norm_clean_string(line, ht_specialized) for line in lines] == full_lines
+    assert ht_specialized == ht_full
+    assert not wb_specialized.look_alike_loaded
+    wb_look_alike = wb_norm.Wildebeest(skip_steps=['digit'])
+    assert not wb_look_alike.look_alike_loaded
+    assert wb_look_alike.norm_clean_string('Cоcа-Cola', {}) == 'Coca-Cola'
+    assert wb_look_alike.look_alike_loaded
+
+
+def test_swapped_skip_entries():
+    """The plan must follow SKIP- entries that are swapped in an ht, even if the size of the ht stays the same."""
+    ht = {'SKIP-width': 1}
+    assert [wb.norm_clean_string('Ｈ', ht) for _ in range(2)] == ['Ｈ', 'Ｈ']
+    del ht['SKIP-width']
+    ht['SKIP-cjk'] = 1
+    assert wb.norm_clean_string('Ｈ', ht) == 'H'
+
+
+def test_plan_stats_merge():
+    """Merged stats of a precompiled plan must match the ht of norm_clean_string (incl. change locations)."""
+    test_dir_path = os.path.dirname(os.path.realpath(__file__))
+    with open(os.path.join(test_dir_path, 'data', 'wildebeest-test.txt'), 'r', encoding='utf-8') as f:
+        lines = [line.rstrip() for line in f] * 3
+    loc_ids = [str(line_number) for line_number in range(1, len(lines) + 1)]
+    ht = {'SKIP-digit': 1}
+    ref_lines = [wb.norm_clean_string(line, ht, lang_code='fas', loc_id=loc_id) for line, loc_id in zip(lines, loc_ids)]
+    plan = wb.ncs_plan('fas', ['digit'])
+    assert 'digit' not in plan.step_names
+    stats = plan.new_stats()
+    middle = len(lines) // 2
+    for start, end in ((0, middle), (middle, len(lines))):
+        chunk_stats = plan.new_stats()
+        assert [wb.norm_clean_plan_string(line, plan, chunk_stats, loc_id=loc_id)
+                for line, loc_id in zip(lines[start:end], loc_ids[start:end])] == ref_lines[start:end]
+        stats.merge(chunk_stats)
+    assert stats.ht_view() == {key: value for key, value in ht.items() if not key.startswith('SKIP-')}
+
+
+def test_binary_lines_match_text_lines():
+    """Block-buffered binary I/O must produce the same output and stats as text I/O (incl. \\r, invalid UTF-8)."""
+    test_dir_path = os.path.dirname(os.path.realpath(__file__))
+    with open(os.path.join(test_dir_path, 'data', 'wildebeest-test.txt'), 'rb') as f:
+        data = f.read() + b'CR\rCRLF\r\nbad \xe9\xff bytes\n\nno final newline \xd9\x83\r'
+    ht_text = {}
+    text_output = io.StringIO()
+    input_text_file = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8', errors='surrogateescape')
+    wb.norm_clean_lines(ht_text, input_file=input_text_file, output_file=text_output, lang_code='fas')
+    for block_size in (7, 1 << 20):
+        ht_binary = {}
+        binary_output = io.BytesIO()
+        wb.norm_clean_binary_lines(ht_binary, input_file=io.BytesIO(data), output_file=binary_output,
+                                   lang_code='fas', block_size=block_size)
+        assert binary_output.getvalue() == text_output.getvalue().encode('utf-8', errors='ignore')
+        assert ht_binary == ht_text
+
+
+def test_shards_concat_to_full_run(tmp_path):
+    """Normalizing all shards of a file and concatenating them must match a single run (output and stats)."""
+    test_dir_path = os.path.dirname(os.path.realpath(__file__))
+    input_filename = os.path.join(test_dir_path, 'data', 'wildebeest-test.txt')
+    ht_full = {}
+    full_output = io.BytesIO()
+    wb.norm_clean_mmap_file(ht_full, input_filename, full_output, lang_code='fas')
+    with open(input_filename, 'rb') as f:
+        ht_stream = {}
+        stream_output = io.BytesIO()
+        wb.norm_clean_binary_lines(ht_stream, f, stream_output, lang_code='fas')
+    assert stream_output.getvalue() == full_output.getvalue()
+    assert ht_stream == ht_full
+    for n_shards in (1, 3, 7):
+        output_filename = str(tmp_path / f'out-{n_shards}.txt')
+        for shard_index in range(1, n_shards + 1):
+            wb_norm.write_shard_files(wb_norm.Wildebeest(), {}, input_filename, output_filename, shard_index, n_shards,
+                                      lang_code='fas')
+        ht = {}
+        assert wb_norm.concat_shard_files(wb_norm.Wildebeest(), f'{output_filename}.manifest.json', ht) \
+            == output_filename
+        with open(output_filename, 'rb') as f:
+            assert f.read() == full_output.getvalue()
+        assert ht == ht_full
+
+
+def test_resume_from_checkpoint(tmp_path):
+    """A run that is interrupted and resumed from its last checkpoint must match an uninterrupted run."""
+    test_dir_path = os.path.dirname(os.path.realpath(__file__))
+    input_filename = str(tmp_path / 'input.txt')
+    with open(os.path.join(test_dir_path, 'data', 'wildebeest-test.txt'), 'rb') as f:
+        data = f.read()
+    with open(input_filename, 'wb') as f:
+        f.write(data + 'Kомпания Cоcа-Cola\n'.encode('utf-8') + data)
+    ref_wb = wb_norm.Wildebeest()
+    ref_ht = {'SKIP-punct': 1}
+    ref_output_filename = str(tmp_path / 'ref.txt')
+    wb_norm.norm_clean_file_with_checkpoints(ref_wb, ref_ht, input_filename, ref_output_filename, lang_code='fas',
+                                             checkpoint_every=7)
+    assert not os.path.exists(f'{ref_output_filename}.checkpoint.json')
+    output_filename = str(tmp_path / 'output.txt')
+    interrupted_wb = wb_norm.Wildebeest()
+    norm_clean_mmap_file = interrupted_wb.norm_clean_mmap_file
+    n_calls = [0]
+
+    def interrupted_norm_clean_mmap_file(*args, **kwargs):
+        n_calls[0] += 1
+        if n_calls[0] == 5:
+            with open(output_filename, 'ab') as output_file:
+                output_file.write(b'partial output')
+            raise KeyboardInterrupt
+        return norm_clean_mmap_file(*args, **kwargs)
+    interrupted_wb.norm_clean_mmap_file = interrupted_norm_clean_mmap_file
+    try:
+        wb_norm.norm_clean_file_with_checkpoints(interrupted_wb, {'SKIP-punct': 1}, input_filename, output_filename,
+                                                 lang_code='fas', checkpoint_every=7)
+    except KeyboardInterrupt:
+        pass
+    assert os.path.exists(f'{output_filename}.checkpoint.json')
+    resumed_wb = wb_norm.Wildebeest()
+    ht = {'SKIP-punct': 1}
+    wb_norm.norm_clean_file_with_checkpoints(resumed_wb, ht, input_filename, output_filename, lang_code='fas',
+                                             checkpoint_every=7, resume=True)
+    with open(ref_output_filename, 'rb') as f1, open(output_filename, 'rb') as f2:
+        assert f1.read() == f2.read()
+    assert ht == ref_ht
+    assert resumed_wb.look_alike_dict == ref_wb.look_alike_dict
+
+
+def test_file_batch(tmp_path):
+    """A batch of files is normalized like single files, with per-file stats; up-to-date outputs are skipped."""
+    test_dir_path = os.path.dirname(os.path.realpath(__file__))
+    with open(os.path.join(test_dir_path, 'data', 'wildebeest-test.txt'), 'r', encoding='utf-8') as f:
+        text = f.read()
+    for doc_dir in ('a', 'b'):
+        (tmp_path / 'docs' / doc_dir).mkdir(parents=True)
+        for doc_id in range(3):
+            (tmp_path / 'docs' / doc_dir / f'{doc_id}.txt').write_text(text[doc_id * 100:], encoding='utf-8')
+    file_pairs = wb_norm.batch_file_pairs(str(tmp_path / 'docs' / '**' / '*.txt'), output_dir=str(tmp_path / 'out'))
+    assert len(file_pairs) == 6
+    file_look_alike_stats = {}
+    for n_workers in (2, 1, 1):
+        wb_batch = wb_norm.Wildebeest()
+        ht = {'SKIP-digit': 1}
+        summary = wb_norm.norm_clean_file_batch(wb_batch, ht, file_pairs, lang_code='fas', skip_list_csv='digit',
+                                                n_workers=n_workers)
+        if n_workers in file_look_alike_stats:
+            assert summary == {'files': 6, 'normalized': 0, 'up-to-date': 6}
+            continue
+        assert summary == {'files': 6, 'normalized': 6, 'up-to-date': 0}
+        assert ht['NUMBER-OF-LINES'] == 2 * sum(text[doc_id * 100:].count('\n') for doc_id in range(3))
+        file_look_alike_stats[n_workers] = []
+        for _, output_filename in file_pairs:
+            with open(wb_norm.batch_stats_filename(output_filename), encoding='utf-8') as f:
+                file_look_alike_stats[n_workers].append(json.load(f)['look-alike'])
+            if n_workers == 2:
+                os.remove(wb_norm.batch_stats_filename(output_filename))  # to be normalized again with 1 worker
+    assert file_look_alike_stats[1] == file_look_alike_stats[2]
+    for (input_filename, output_filename), look_alike_stats in zip(file_pairs, file_look_alike_stats[1]):
+        ht = {'SKIP-digit': 1}
+        file_wb = wb_norm.Wildebeest()
+        output_file = io.StringIO()
+        with open(input_filename, encoding='utf-8') as f:
+            file_wb.norm_clean_lines(ht, f, output_file, lang_code='fas')
+        with open(output_filename, encoding='utf-8') as f:
+            assert f.read() == output_file.getvalue()
+        with open(wb_norm.batch_stats_filename(output_filename), encoding='utf-8') as f:
+            assert json.load(f)['ht']['COUNT-ALL'] == ht['COUNT-ALL']
+        assert look_alike_stats['counts'] == file_wb.pop_look_alike_stats()['counts'] != {}
+
+
+def test_tsv_columns():
+    """Only the selected TSV columns are normalized, each with its own language code."""
+    test_dir_path = os.path.dirname(os.path.realpath(__file__))
+    with open(os.path.join(test_dir_path, 'data', 'wildebeest-test.txt'), 'r', encoding='utf-8') as f:
+        lines = [line.rstrip().replace('\t', ' ') for line in f]
+    rows = [[f'ID\u00A0{i}', line, lines[-i - 1], ''] for i, line in enumerate(lines)] + [['ID-last', lines[0]]]
+    wb_tsv = wb_norm.Wildebeest()
+    tsv_columns = wb_norm.parse_tsv_columns('2,3:fas')
+    assert tsv_columns == {1: None, 2: 'fas'}
+    ht = {}
+    output_file = io.BytesIO()
+    text = ''.join('\t'.join(fields) + '\n' for fields in rows)
+    wb_tsv.norm_clean_binary_lines(ht, io.BytesIO(text.encode('utf-8')), output_file, lang_code='hin',
+                                   tsv_columns=tsv_columns)
+    ref_rows = [[fields[0], wb.norm_clean_string(fields[1], {}, lang_code='hin')]
+                + [wb.norm_clean_string(field, {}, lang_code='fas') for field in fields[2:3]] + fields[3:]
+                for fields in rows]
+    assert output_file.getvalue().decode('utf-8').split('\n')[:-1] == ['\t'.join(fields) for fields in ref_rows]
+    assert ht['NUMBER-OF-LINES'] == len(rows)
+    assert ht['COUNT-ALL'] == sum(fields != ref_fields for fields, ref_fields in zip(rows, ref_rows))
+    text_ht = {}
+    text_output_file = io.StringIO()
+    wb_tsv.norm_clean_lines(text_ht, io.StringIO(text), text_output_file, lang_code='hin', tsv_columns=tsv_columns)
+    assert text_output_file.getvalue() == output_file.getvalue().decode('utf-8')
+    assert text_ht == ht
+    # Steps are counted once per line, even if they change several fields of a line.
+    ht = {}
+    output_file = io.BytesIO()
+    wb_tsv.norm_clean_binary_lines(ht, io.BytesIO('id1\tＡＢＣ\tＡＢＣ\nid2\tx\tＡ\nid3\tＡ\n'.encode('utf-8')), output_file,
+                                   tsv_columns={1: None, 2: None})
+    assert output_file.getvalue().decode('utf-8') == 'id1\tABC\tABC\nid2\tx\tA\nid3\tA\n'
+    assert (ht['NUMBER-OF-LINES'], ht['COUNT-ALL'], ht['CALL-width'], ht['COUNT-width']) == (3, 3, 3, 3)
+    assert [ht[f'COUNT-width-{count}'] for count in range(1, 4)] == ['1', '2', '3']
+
+
+def test_repair_encoding_errors_single_pass():
+    """The single-pass encoding repair must match the multi-pass method, incl. repairs of repairs."""
+    for s in ('StraÃŸe', 'Ãâ\x80\x99', 'ÃÃ©', 'Ââ\x80¦', 'â€œquotedâ€\x9d', 'x\x85 Â\x85', 'caf\udce9 \udc93',
+              'Ã\udca9'):
+        assert wb.repair_encoding_errors(s) == wb.repair_encoding_errors_multi_pass(s)
+    assert wb.repair_encoding_errors('StraÃŸe â\x80\x9cquotedâ\x80\x9d') == 'Straße “quoted”'
+    # byte-level repair when decoding
+    data = 'café “quoted”\n'.encode('cp1252') + 'Straße\n'.encode('utf-8')
+    assert wb_norm.decode_lines(data, 'wildebeest-windows1252') == ['café “quoted”', 'Straße']
+    assert wb_norm.decode_lines(data) == ['caf\udce9 \udc93quoted\udc94', 'Straße']
+
+
+def test_sniff_encoding(tmp_path):
+    text = 'Le café “déjà vu” coûte 3 €.\n' * 20 + 'plain line\n' * 20
+    data_dict = {'utf-8': text.encode('utf-8'), 'windows-1252': text.encode('cp1252'),
+                 'double-encoded': text.encode('utf-8').decode('cp1252', errors='ignore').encode('utf-8')}
+    wb_sniff = wb_norm.Wildebeest()
+    outputs = []
+    for encoding, data in data_dict.items():
+        filename = str(tmp_path / f'{encoding}.txt')
+        with open(filename, 'wb') as f:
+            f.write(data)
+        sniff = wb_norm.sniff_encoding(filename)
+        assert sniff['encoding'] == encoding
+        # The input encoding is passed per file, so that one Wildebeest can normalize files of different encodings.
+        input_encoding, _ = wb_sniff.input_encoding_for_sniff(sniff)
+        output_filename = str(tmp_path / f'{encoding}.clean.txt')
+        wb_norm.norm_clean_files(wb_sniff, {}, open(filename, 'rb'), open(output_filename, 'wb'), filename,
+                                 output_filename, input_encoding=input_encoding)
+        with open(output_filename, encoding='utf-8') as f:
+            outputs.append(f.read())
+    double_encoded_lines = [wb_norm.undo_double_encoding(line)
+                            for line in data_dict['double-encoded'].decode('utf-8').splitlines()]
+    assert outputs == [''.join(line + '\n' for line in wb.norm_clean_batch(lines, {}))
+                       for lines in (text.splitlines(), text.splitlines(), double_encoded_lines)]
+    assert wb_sniff.default_input_encoding.encoding == 'utf-8'
+    assert wb_norm.undo_double_encoding('cafÃ© â€œokâ€\x9d') == 'café “ok”'
+    assert wb_norm.undo_double_encoding('café') == 'café'
+
+
+def test_sparse_batch_matches_batch():
+    """The fast path for clean UTF-8 must have the same results and change stats as norm_clean_plan_batch."""
+    lines = ['plain text line'] * 40 + ['ＡＢＣ full width', 'call 555-1234'] + ['more plain text'] * 40 \
+        + ['x\u00A0y', 'https://x.org/%41']
+    plan = wb.ncs_plan()
+    stats = plan.new_stats()
+    sparse_stats = plan.new_stats()
+    loc_ids = [str(i + 1) for i in range(len(lines))]
+    result = wb.norm_clean_plan_batch(lines, plan, stats, loc_ids=loc_ids)
+    assert wb.norm_clean_plan_sparse_batch(lines, plan, sparse_stats, loc_ids=loc_ids) == result
+    assert sparse_stats.ht_view() == stats.ht_view()
+    assert stats.ht_view()['COUNT-ALL'] >= 2
+
+
+def test_analyze_file(tmp_path):
+    """The step line counts of an analysis must match the CALL- stats of normalization, also for shards."""
+    test_dir_path = os.path.dirname(os.path.realpath(__file__))
+    input_filename = os.path.join(test_dir_path, 'data', 'wildebeest-test.txt')
+    ht = {'SKIP-digit': 1}
+    wb.norm_clean_mmap_file(ht, input_filename, io.BytesIO())
+    analysis = wb.analyze_file({'SKIP-digit': 1}, input_filename)
+    plan = wb.ht_ncs_plan(ht, '')
+    assert {f'CALL-{step_name}': count for step_name, count in zip(plan.step_names, analysis.call_counts)
+            if count} == {key: value for key, value in ht.items() if key.startswith('CALL-')}
+    assert analysis.n_lines == ht['NUMBER-OF-LINES']
+    shard_analysis = plan.new_analysis()
+    for shard_index in (1, 2, 3):
+        byte_range = wb_norm.shard_byte_range(input_filename, shard_index, 3)
+        shard_analysis.merge(wb.analyze_file({'SKIP-digit': 1}, input_filename, byte_range=byte_range))
+    assert shard_analysis.call_counts == analysis.call_counts
+    assert shard_analysis.char_counts == analysis.char_counts
+    report = wb.analysis_report(analysis, plan)
+    assert 'digit' not in [step['step'] for step in report['steps']]
+    for step in report['steps']:
+        assert step['lines'] == ht[f"CALL-{step['step']}"]
+        assert step['trigger-chars'] or not plan.steps[plan.step_names.index(step['step'])][2]
+
+
+def test_renorm_since_tables(tmp_path):
+    """Re-normalizing only lines with characters of changed table entries must match a full run with new tables."""
+    test_dir_path = os.path.dirname(os.path.realpath(__file__))
+    input_filename = os.path.join(test_dir_path, 'data', 'wildebeest-test.txt')
+    output_filename = str(tmp_path / 'output.txt')
+    wb_norm.norm_clean_file_with_index(wb, {}, input_filename, output_filename)
+    full_output_file = io.BytesIO()
+    wb.norm_clean_mmap_file({}, input_filename, full_output_file)
+    # Simulate output of old tables that mapped ∭ to ∫∫ rather than ∫∫∫.
+    new_tables = wb.table_artifact_dict()
+    old_tables = dict(new_tables, mapping_dict=dict(new_tables['mapping_dict'], **{'∭': '∫∫'}))
+    assert '∭' in wb_norm.table_changed_chars(old_tables, new_tables)
+    # Hangul syllables are computed from jamo by code, so their jamo are traced as well.
+    hangul_tables = dict(new_tables, mapping_dict=dict(new_tables['mapping_dict'], **{'각': '가'}))
+    assert {'각', '\u1100', '\u1161', '\u11A8'} <= wb_norm.table_changed_chars(hangul_tables, new_tables)
+    old_tables_filename = str(tmp_path / 'old-tables.pickle')
+    with open(old_tables_filename, 'wb') as f:
+        pickle.dump(old_tables, f)
+    with open(output_filename, 'rb') as f:
+        old_output = f.read().replace('∫∫∫'.encode('utf-8'), '∫∫'.encode('utf-8'))
+    with open(output_filename, 'wb') as f:
+        f.write(old_output)
+    with open(f'{output_filename}.index.json', encoding='utf-8') as f:
+        index = json.load(f)
+    index['tables'] = wb_norm.table_fingerprint(old_tables)
+    index['blocks'][-1]['output-end'] = len(old_output)
+    with open(f'{output_filename}.index.json', 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    patched_output_filename = str(tmp_path / 'patched.txt')
+    summary = wb_norm.renorm_file_since_tables(wb, {}, input_filename, output_filename, old_tables_filename,
+                                               patched_output_filename=patched_output_filename)
+    with open(patched_output_filename, 'rb') as f:
+        assert f.read() == full_output_file.getvalue()
+    assert summary['changed-lines'] == 1
+    assert 1 <= summary['renormalized-lines'] < summary['lines']
+    # In place
+    summary = wb_norm.renorm_file_since_tables(wb, {}, input_filename, output_filename, old_tables_filename)
+    with open(output_filename, 'rb') as f:
+        assert f.read() == full_output_file.getvalue()
+
+
+def test_line_cache_keeps_stats():
+    """Cache hits must produce the same lines and change stats as an uncached run."""
+    test_dir_path = os.path.dirname(os.path.realpath(__file__))
+    with open(os.path.join(test_dir_path, 'data', 'wildebeest-test.txt'), 'r', encoding='utf-8') as f:
+        lines = [line.rstrip() for line in f] * 3
+    results = []
+    for line_cache_size in (0, 10, 1000):
+        wb_cache = wb_norm.Wildebeest(line_cache_size=line_cache_size)
+        wb_cache.load_look_alike_file()
+        ht = {'SKIP-digit': 1}
+        output_lines = [wb_cache.norm_clean_string(line, ht, loc_id=str(line_number))
+                        for line_number, line in enumerate(lines, 1)]
+        results.append((output_lines, ht, wb_cache.look_alike_dict))
+        assert len(wb_cache.line_cache) <= line_cache_size
+        assert (wb_cache.line_cache_hits > 0) == (line_cache_size >= 1000)
+    assert results[0] == results[1] == results[2]
+
+
+def test_correct_look_alikes():
+    """Look-alike correction of mixed-script tokens, incl. stats (repeated tokens are taken from the token cache)."""
+    wb_look_alike = wb_norm.Wildebeest()
+    wb_look_alike.load_look_alike_file()
+    s = 'Kомпания Cоcа-Cola pеople ABCDEFмир http://site.ru/путь Kомпания'
+    ref_norm_s = 'Компания Coca-Cola people ABCDEF мир http://site.ru/путь Компания'
+    assert wb_look_alike.correct_look_alikes(s) == ref_norm_s
+    for key, count in (('n-to-Cyrillic', 2), ('n-to-Latin', 2), ('n-split', 1), ('n-unchanged', 1)):
+        assert wb_look_alike.look_alike_dict[key] == count
+    assert wb_look_alike.look_alike_split_dict == {'ABCDEFмир': 'ABCDEF мир'}
+    assert wb_look_alike.look_alike_url_dict == {'http://site.ru/путь': True}
+
+
+def test_concurrent_look_alike_stats():
+    """Threads that count look-alikes into a shared Wildebeest's own stats (the default) must not lose counts."""
+    s = 'Kомпания Cоcа-Cola pеople ABCDEFмир'
+    wb_look_alike = wb_norm.Wildebeest()
+    n_threads, n_calls = 4, 2000
+
+    def correct_look_alikes():
+        for _ in range(n_calls):
+            wb_look_alike.norm_clean_string(s, {})
+
+    threads = [threading.Thread(target=correct_look_alikes) for _ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counts = wb_look_alike.pop_look_alike_stats()['counts']
+    assert counts == {key: n_threads * n_calls * count
+                      for key, count in (('n-to-Cyrillic', 1), ('n-to-Latin', 2), ('n-split', 1))}
+
+
+def test_profile_report():
+    """Profiling must not change the output; the report has times for the steps that were called."""
+    test_dir_path = os.path.dirname(os.path.realpath(__file__))
+    with open(os.path.join(test_dir_path, 'data', 'wildebeest-test.txt'), 'r', encoding='utf-8') as f:
+        text = f.read()
+    outputs = []
+    for profile in (False, True):
+        wb_profile = wb_norm.Wildebeest()
+        if profile:
+            wb_profile.enable_profile()
+        ht = {}
+        output_file = io.StringIO()
+        wb_profile.norm_clean_lines(ht, io.StringIO(text), output_file)
+        outputs.append(output_file.getvalue())
+    assert outputs[0] == outputs[1]
+    report = wb_profile.profile_report(ht)
+    assert report['number-of-lines'] == ht['NUMBER-OF-LINES']
+    assert {step['step'] for step in report['steps']} == {key[5:] for key in ht if key.startswith('CALL-')}
+    assert all(step['time'] >= 0 for step in report['steps'])
+
+
+def test_server_client(tmp_path):
+    """Text normalized through the server must match norm_clean_lines, with per-request lang code and skip list."""
+    test_dir_path = os.path.dirname(os.path.realpath(__file__))
+    with open(os.path.join(test_dir_path, 'data', 'wildebeest-test.txt'), 'rb') as f:
+        data = f.read()
+    socket_filename = str(tmp_path / 'wildebeest.sock')
+    server = wb_server.WildebeestUnixServer(socket_filename, wb_server.WildebeestRequestHandler)
+    server.wildebeest = wb_server.new_wildebeest()
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+    wb_ref = wb_norm.Wildebeest()
+    wb_ref.load_look_alike_file()
+    try:
+        for lang_code, skip_list_csv in (('', ''), ('fas', 'digit,punct')):
+            output_file = io.BytesIO()
+            wb_server.client(io.BytesIO(data), output_file, socket_filename=socket_filename,
+                             lang_code=lang_code, skip_list_csv=skip_list_csv)
+            ht = {f'SKIP-{skip_elem}': 1 for skip_elem in skip_list_csv.split(',') if skip_elem}
+            ref_output_file = io.StringIO()
+            wb_ref.norm_clean_lines(ht, io.StringIO(data.decode('utf-8')), ref_output_file, lang_code=lang_code)
+            assert output_file.getvalue().decode('utf-8') == ref_output_file.getvalue()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_table_artifact(tmp_path):
+    """Tables loaded from a prebuilt artifact must match those built from the data files."""
+    artifact_filename = str(tmp_path / 'wildebeest-tables.pickle')
+    wb_from_data = wb_norm.Wildebeest(use_table_artifact=False)
+    wb_from_data.write_table_artifact(artifact_filename)
+    wb_from_artifact = wb_norm.Wildebeest(use_table_artifact=False)
+    assert wb_from_artifact.load_table_artifact(artifact_filename)
+    assert wb_from_artifact.char_type_table.block_index == wb_from_data.char_type_table.block_index
+    assert wb_from_artifact.char_type_table.values == wb_from_data.char_type_table.values
+    assert wb_from_artifact.mapping_dict == wb_from_data.mapping_dict
+    wb_from_data.load_look_alike_file()
+    wb_from_artifact.load_look_alike_file()
+    assert wb_from_artifact.look_alike_dict == wb_from_data.look_alike_dict
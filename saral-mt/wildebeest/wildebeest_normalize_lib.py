@@ -0,0 +1,4138 @@
+# -*- coding: utf-8 -*-
+"""
+Written by Ulf Hermjakob, USC/ISI
+Normalization and cleaning code behind the wildebeest_normalize.py script (see there for usage and the list of
+normalization/cleaning-types). Kept in this module, so that Python can import it from cached bytecode rather than
+compile it each time the script starts.
+"""
+# -*- encoding: utf-8 -*-
+import argparse
+from array import array
+import bz2
+import codecs
+from collections import Counter, defaultdict, deque, OrderedDict
+import functools
+import glob
+from itertools import chain, islice
+import datetime
+import gzip
+import io
+import json
+import logging as log
+import lzma
+import mmap
+import os
+from pathlib import Path
+import pickle
+import random
+import re
+import shutil
+import sys
+import threading
+import time
+import unicodedata
+from typing import AsyncIterable, AsyncIterator, BinaryIO, Callable, Collection, Iterable, Iterator, List, Match, \
+    Optional, TextIO, Tuple, Union
+
+log.basicConfig(level=log.INFO)
+
+__version__ = '0.6.3'
+last_mod_date = 'April 21, 2021'
+
+# Prebuilt tables (see Wildebeest.write_table_artifact), built by: aux/wildebeest_build_data.py build-table-artifact
+TABLE_ARTIFACT_FILENAME = 'wildebeest-tables.pickle'
+TABLE_ARTIFACT_FORMAT_VERSION = 2
+
+
+class CodePointTable:
+    """
+    Compact code-point-indexed table of integer values (default: 0), used for character type bit vectors.
+    Code points are grouped into blocks of 256. For each block, block_index holds the offset of its values
+    in the values array; all blocks without non-zero values share the all-zero block at offset 0.
+    """
+    def __init__(self, block_index: Optional[array] = None, values: Optional[array] = None):
+        self.block_index = array('I', bytes(4 * (0x110000 >> 8))) if block_index is None else block_index
+        self.values = array('Q', bytes(8 * 256)) if values is None else values
+        self.ascii_class_table = b''
+        self.ascii_class_values = []
+        self.init_ascii_classes()
+
+    @classmethod
+    def from_dict(cls, value_dict: dict) -> 'CodePointTable':
+        """Builds a table from a dictionary that maps characters to values."""
+        table = cls()
+        block_index, values = table.block_index, table.values
+        for char, value in value_dict.items():
+            if len(char) == 1 and value:
+                code_point = ord(char)
+                if not block_index[code_point >> 8]:
+                    block_index[code_point >> 8] = len(values)
+                    values.extend(array('Q', bytes(8 * 256)))
+                values[block_index[code_point >> 8] + (code_point & 0xFF)] = value
+        table.init_ascii_classes()
+        return table
+
+    def init_ascii_classes(self) -> None:
+        """ASCII characters are grouped into classes of identical value for a fast path in or_reduce."""
+        ascii_class_table = bytearray(256)
+        self.ascii_class_values = []
+        for code_point in range(0x80):
+            value = self.values[self.block_index[0] + code_point]
+            if value not in self.ascii_class_values:
+                self.ascii_class_values.append(value)
+            ascii_class_table[code_point] = self.ascii_class_values.index(value)
+        self.ascii_class_table = bytes(ascii_class_table)
+
+    def get(self, char: str) -> int:
+        if len(char) != 1:
+            return 0
+        code_point = ord(char)
+        return self.values[self.block_index[code_point >> 8] + (code_point & 0xFF)]
+
+    def or_reduce(self, s: str) -> int:
+        """Returns the bitwise OR of the values of all characters in string s."""
+        result = 0
+        if s.isascii():
+            ascii_class_values = self.ascii_class_values
+            for ascii_class in set(s.encode('ascii').translate(self.ascii_class_table)):
+                result |= ascii_class_values[ascii_class]
+        else:
+            block_index, values = self.block_index, self.values
+            for char in set(s):
+                code_point = ord(char)
+                result |= values[block_index[code_point >> 8] + (code_point & 0xFF)]
+        return result
+
+    def __len__(self) -> int:
+        """Number of code points with a non-zero value."""
+        return len(self.values) - self.values.count(0)
+
+
+class CharMapTable(dict):
+    """
+    Lazily filled str.translate table for a sequence of character-mapping normalization steps.
+    The first time a character is looked up, its mapping is computed by applying the step functions
+    to that single character, so the table is by construction consistent with the step functions.
+    For characters changed by any step, change_mask_dict records which steps (bit i for step i) changed them.
+    """
+    def __init__(self, step_functions: List[Callable[[str], str]]):
+        super().__init__()
+        self.step_functions = step_functions
+        self.change_mask_dict = {}
+        # Set if some step changes a character, but a later step maps it back to the original character.
+        self.has_round_trip = False
+
+    def __missing__(self, code_point: int) -> str:
+        char = chr(code_point)
+        result = char
+        change_mask = 0
+        for i, step_function in enumerate(self.step_functions):
+            new_result = step_function(result)
+            if new_result != result:
+                change_mask |= 1 << i
+                result = new_result
+        if change_mask:
+            self.change_mask_dict[char] = change_mask
+            if result == char:
+                self.has_round_trip = True
+        self[code_point] = result
+        return result
+
+
+class EncodingRepairTable(dict):
+    """
+    Lazily filled table of repaired encoding-error segments (matches of Wildebeest.encoding_error_re).
+    The first time a segment is looked up, its repair is computed by repair_function (the multi-pass method),
+    so the table is by construction consistent with it.
+    """
+    def __init__(self, repair_function: Callable[[str], str]):
+        super().__init__()
+        self.repair_function = repair_function
+
+    def __missing__(self, segment: str) -> str:
+        result = self.repair_function(segment)
+        self[segment] = result
+        return result
+
+
+class NormCleanStats:
+    """
+    Change stats of normalization/cleaning, with per-step counters in preallocated lists indexed by the counter slots
+    of a NormCleanPlan. Stats of consecutive parts of a text can be merged (see merge).
+    ht_view returns the stats as a traditional ht dictionary, e.g. {'NUMBER-OF-LINES': 3, 'COUNT-ALL': 1,
+    'CALL-digit': 2, 'COUNT-digit': 1, 'COUNT-digit-1': '3'} with the locations of the first 20 changes per step.
+    """
+    max_n_locations = 20
+
+    def __init__(self, step_names: Tuple[str, ...]):
+        self.step_names = step_names
+        self.n_lines = 0
+        self.n_changed_lines = 0
+        self.call_counts = [0] * len(step_names)
+        self.change_counts = [0] * len(step_names)
+        self.change_locations = [[] for _ in step_names]  # per slot: list of (change count, loc_id)
+
+    def record_line(self, changed: bool, call_slots: Tuple[int, ...], changed_slots: Tuple[int, ...],
+                    loc_id: str = '') -> None:
+        """Records a normalized line: the steps that were called and those that changed it."""
+        self.n_lines += 1
+        call_counts = self.call_counts
+        for slot in call_slots:
+            call_counts[slot] += 1
+        if changed_slots:
+            change_counts = self.change_counts
+            for slot in changed_slots:
+                count = change_counts[slot] + 1
+                change_counts[slot] = count
+                if loc_id and (count <= self.max_n_locations):
+                    self.change_locations[slot].append((count, loc_id))
+        if changed:
+            self.n_changed_lines += 1
+
+    def record_unchanged_lines(self, n_lines: int) -> None:
+        """Records normalized lines to which no step was applied."""
+        self.n_lines += n_lines
+
+    def merge(self, stats: 'NormCleanStats') -> None:
+        """Adds the stats of the lines that follow those of this object. Change locations are renumbered."""
+        if stats.step_names != self.step_names:
+            raise ValueError('Cannot merge stats of different normalization/cleaning steps')
+        self.n_lines += stats.n_lines
+        self.n_changed_lines += stats.n_changed_lines
+        for slot, count in enumerate(stats.call_counts):
+            self.call_counts[slot] += count
+        for slot, count in enumerate(stats.change_counts):
+            if count:
+                prev_count = self.change_counts[slot]
+                self.change_counts[slot] = prev_count + count
+                for location_count, loc_id in stats.change_locations[slot]:
+                    if prev_count + location_count > self.max_n_locations:
+                        break
+                    self.change_locations[slot].append((prev_count + location_count, loc_id))
+
+    def ht_view(self) -> dict:
+        """Returns the stats as ht dictionary (without SKIP- entries)."""
+        ht = {}
+        if self.n_lines:
+            ht['NUMBER-OF-LINES'] = self.n_lines
+        for slot, step_name in enumerate(self.step_names):
+            if self.call_counts[slot]:
+                ht[f'CALL-{step_name}'] = self.call_counts[slot]
+            if self.change_counts[slot]:
+                ht[f'COUNT-{step_name}'] = self.change_counts[slot]
+                for count, loc_id in self.change_locations[slot]:
+                    ht[f'COUNT-{step_name}-{count}'] = loc_id
+        if self.n_changed_lines:
+            ht['COUNT-ALL'] = self.n_changed_lines
+        return ht
+
+    def add_to_ht(self, ht: dict) -> None:
+        """Adds the stats to those in ht (for lines that follow the lines already counted in ht)."""
+        Wildebeest.merge_ht(ht, self.ht_view())
+
+
+class NormCleanRowRecorder:
+    """
+    Stand-in for NormCleanStats in norm_clean_plan_batch (and norm_clean_plan_sparse_batch) for the fields of a TSV
+    column (see Wildebeest.norm_clean_tsv_line_batches). Records, per row index (passed as loc_id), the counter slots
+    of the steps applied to its field and of those that changed it, so that each row is counted once in the stats.
+    """
+    def __init__(self):
+        self.row_entries = {}  # row index -> (call_slots, changed_slots)
+
+    def record_line(self, changed: bool, call_slots: Tuple[int, ...], changed_slots: Tuple[int, ...],
+                    loc_id=None) -> None:
+        if call_slots:
+            self.row_entries[loc_id] = (call_slots, changed_slots)
+
+    def record_unchanged_lines(self, n_lines: int) -> None:
+        pass
+
+
+class NormCleanAnalysis:
+    """
+    Code point histogram of a text and, per counter slot of a NormCleanPlan, the number of lines to which the step
+    would be applied (the CALL- counts of normalization, an upper bound of the lines it changes), computed without
+    normalizing the text (see Wildebeest.analyze_line_batches). Analyses of parts of a text can be merged.
+    """
+    def __init__(self, step_names: Tuple[str, ...]):
+        self.step_names = step_names
+        self.n_lines = 0
+        self.call_counts = [0] * len(step_names)
+        self.char_counts = Counter()
+
+    def merge(self, analysis: 'NormCleanAnalysis') -> None:
+        if analysis.step_names != self.step_names:
+            raise ValueError('Cannot merge analyses of different normalization/cleaning steps')
+        self.n_lines += analysis.n_lines
+        for slot, count in enumerate(analysis.call_counts):
+            self.call_counts[slot] += count
+        self.char_counts.update(analysis.char_counts)
+
+
+class NormCleanPlan:
+    """
+    Normalization/cleaning steps for a configuration (language code, skipped steps), compiled once
+    (see Wildebeest.ncs_plan). steps is the ordered tuple of non-skipped steps (see Wildebeest.ncs_steps),
+    each extended by its counter slot in NormCleanStats. For each line type vector, the applicable steps,
+    grouped into stages (see Wildebeest.apply_ncs_stage), and their counter slots are computed only once.
+    """
+    def __init__(self, steps: list, compiled: bool = True):
+        self.steps = tuple([step + (slot,) for slot, step in enumerate(steps)])
+        self.step_names = tuple([step[0] for step in steps])
+        self.compiled = compiled
+        # Precomputed ht keys per counter slot, for callers that keep their stats in an ht dictionary.
+        self.call_keys = tuple([f'CALL-{step_name}' for step_name in self.step_names])
+        self.count_keys = tuple([f'COUNT-{step_name}' for step_name in self.step_names])
+        # Lines to which the look-alike step is applied are not line-cached, as it also collects per-token stats.
+        self.look_alike_slot = self.step_names.index('look-alike') if 'look-alike' in self.step_names else -1
+        self.stage_dict = {}  # line type vector -> (stages, call slots)
+
+    def stages(self, lv: int) -> Tuple[List[tuple], Tuple[int, ...]]:
+        """
+        Returns the stages of the steps applicable to line type vector lv, and the counter slots of these steps.
+        A stage is a tuple of steps that are applied together: either a run of consecutive character-mapping steps
+        (compiled mode only) or a single other step.
+        """
+        entry = self.stage_dict.get(lv)
+        if entry is None:
+            stages = []
+            char_map_run = []
+            call_slots = []
+            for step in self.steps:
+                if not all(lv & bits for bits in step[2]):
+                    continue
+                call_slots.append(step[5])
+                if step[3] and self.compiled:
+                    char_map_run.append(step)
+                    continue
+                if char_map_run:
+                    stages.append(tuple(char_map_run))
+                    char_map_run = []
+                stages.append((step,))
+            if char_map_run:
+                stages.append(tuple(char_map_run))
+            entry = (stages, tuple(call_slots))
+            self.stage_dict[lv] = entry
+        return entry
+
+    def new_stats(self) -> NormCleanStats:
+        return NormCleanStats(self.step_names)
+
+    def new_analysis(self) -> NormCleanAnalysis:
+        return NormCleanAnalysis(self.step_names)
+
+    def add_line_to_ht(self, ht: dict, changed: bool, call_slots: Tuple[int, ...], changed_slots: Tuple[int, ...],
+                       loc_id: str = '') -> None:
+        """Like NormCleanStats.record_line, but for stats kept in an ht dictionary."""
+        ht['NUMBER-OF-LINES'] = ht.get('NUMBER-OF-LINES', 0) + 1
+        call_keys = self.call_keys
+        for slot in call_slots:
+            call_key = call_keys[slot]
+            ht[call_key] = ht.get(call_key, 0) + 1
+        for slot in changed_slots:
+            count_key = self.count_keys[slot]
+            count = ht.get(count_key, 0) + 1
+            ht[count_key] = count
+            if loc_id and (count <= NormCleanStats.max_n_locations):
+                ht[f'{count_key}-{count}'] = loc_id
+        if changed:
+            ht['COUNT-ALL'] = ht.get('COUNT-ALL', 0) + 1
+
+
+class InputEncoding:
+    """
+    How the bytes of an input file are decoded into lines for normalization, e.g. as picked for a file by
+    Wildebeest.input_encoding_for_sniff. Passed per call to the file-level methods of a Wildebeest, which can thus
+    normalize files with different input encodings, also concurrently.
+      encoding: 'utf-8' or 'cp1252' (Windows-1252)
+      errors: error handler for undecodable bytes, e.g. 'surrogateescape' (see Wildebeest.decode_errors)
+      undo_double_encoding: the double encoding of lines is undone (see undo_double_encoding)
+      sparse_batches: lines are normalized with Wildebeest.norm_clean_plan_sparse_batch
+    """
+    def __init__(self, encoding: str = 'utf-8', errors: str = 'surrogateescape', undo_double_encoding: bool = False,
+                 sparse_batches: bool = False):
+        self.encoding = encoding
+        self.errors = errors
+        self.undo_double_encoding = undo_double_encoding
+        self.sparse_batches = sparse_batches
+
+
+class Wildebeest:
+    # Mapping files (in ../data) in load order, with the normalization/cleaning steps whose functions use their
+    # mappings or whose gates use the character types that the files define.
+    # Steps that are not listed here do not need any mapping file.
+    mapping_filenames = ('PythonWildebeestMapping.tsv',
+                         'ArabicPresentationFormMapping.tsv',
+                         'CJKCompatibilityMapping.tsv',
+                         'CombiningModifierMapping.tsv',
+                         'CoreCompatibilityMapping.tsv',
+                         'DigitMapping.tsv',
+                         'EnclosureMapping.tsv',
+                         'EncodingRepairMapping.tsv',
+                         'FontSmallVerticalMapping.tsv')
+    mapping_filenames_by_step = {
+        'repair-encodings-errors': ('EncodingRepairMapping.tsv',),
+        'core-compat': ('CoreCompatibilityMapping.tsv',),
+        'pres-form': ('ArabicPresentationFormMapping.tsv',),
+        'ligatures': ('PythonWildebeestMapping.tsv',),
+        'signs-and-symbols': ('PythonWildebeestMapping.tsv',),
+        'cjk': ('CJKCompatibilityMapping.tsv', 'EnclosureMapping.tsv'),
+        'width': ('CJKCompatibilityMapping.tsv',),
+        'font': ('FontSmallVerticalMapping.tsv', 'PythonWildebeestMapping.tsv'),
+        'small': ('FontSmallVerticalMapping.tsv',),
+        'vertical': ('FontSmallVerticalMapping.tsv',),
+        'enclosure': ('EnclosureMapping.tsv', 'CJKCompatibilityMapping.tsv', 'CoreCompatibilityMapping.tsv',
+                      'PythonWildebeestMapping.tsv'),
+        'combining-compose': ('CombiningModifierMapping.tsv', 'PythonWildebeestMapping.tsv'),
+        'combining-decompose': ('CombiningModifierMapping.tsv', 'CoreCompatibilityMapping.tsv', 'DigitMapping.tsv',
+                                'FontSmallVerticalMapping.tsv', 'PythonWildebeestMapping.tsv'),
+        'punct': ('CoreCompatibilityMapping.tsv', 'PythonWildebeestMapping.tsv'),
+        'punct-arabic': ('PythonWildebeestMapping.tsv',),
+        'punct-cjk': ('PythonWildebeestMapping.tsv',),
+        'punct-greek': ('PythonWildebeestMapping.tsv',),
+        'punct-misc-f': ('PythonWildebeestMapping.tsv',),
+        'digit': ('DigitMapping.tsv',),
+        'repair-token': ('DigitMapping.tsv',),
+    }
+
+    # noinspection PyPep8
+    def __init__(self, compiled: bool = True, use_table_artifact: bool = True, line_cache_size: int = 0,
+                 skip_steps: Iterable[str] = (), lang_code: str = '', repair_undecodable_bytes: bool = False):
+        """
+        skip_steps and lang_code pre-specialize a Wildebeest for a configuration, e.g. for a Farsi-only job:
+        Wildebeest(skip_steps=['look-alike', 'cjk'], lang_code='fas') only loads the mapping files needed by the
+        other steps, always skips the given steps (as if ht had 'SKIP-' entries for them), and uses lang_code
+        as default language code.
+        repair_undecodable_bytes: binary input files (see norm_clean_binary_lines) are decoded with a byte-level
+        repair of bytes that are not valid UTF-8 (see repair_undecodable_bytes) rather than with surrogates.
+        """
+        self.skip_steps = frozenset(skip_steps)
+        self.lang_code = lang_code
+        self.decode_errors = 'wildebeest-windows1252' if repair_undecodable_bytes else 'surrogateescape'
+        # Input encoding of file-level methods without input_encoding argument (see input_encoding_for_sniff).
+        self.default_input_encoding = InputEncoding(errors=self.decode_errors)
+        # The following dictionary captures the irregular mappings from Windows1252 to UTF8.
+        # noinspection SpellCheckingInspection
+        self.spec_windows1252_to_utf8_dict = {
+            '\x80': '\u20AC',  # Euro Sign
+            #  81 is unassigned in Windows-1252
+            '\x82': '\u201A',  # Single Low-9 Quotation Mark
+            '\x83': '\u0192',  # Latin Small Letter F With Hook
+            '\x84': '\u201E',  # Double Low-9 Quotation Mark
+            '\x85': '\u2026',  # Horizontal Ellipsis
+            '\x86': '\u2020',  # Dagger
+            '\x87': '\u2021',  # Double Dagger
+            '\x88': '\u02C6',  # Modifier Letter Circumflex Accent
+            '\x89': '\u2030',  # Per Mille Sign
+            '\x8A': '\u0160',  # Latin Capital Letter S With Caron
+            '\x8B': '\u2039',  # Single Left-Pointing Angle Quotation Mark
+            '\x8C': '\u0152',  # Latin Capital Ligature OE
+            #  8D is unassigned in Windows-1252
+            '\x8E': '\u017D',  # Latin Capital Letter Z With Caron
+            #  8F is unassigned in Windows-1252
+            #  90 is unassigned in Windows-1252
+            '\x91': '\u2018',  # Left Single Quotation Mark
+            '\x92': '\u2019',  # Right Single Quotation Mark
+            '\x93': '\u201C',  # Left Double Quotation Mark
+            '\x94': '\u201D',  # Right Double Quotation Mark
+            '\x95': '\u2022',  # Bullet
+            '\x96': '\u2013',  # En Dash
+            '\x97': '\u2014',  # Em Dash
+            '\x98': '\u02DC',  # Small Tilde
+            '\x99': '\u2122',  # Trade Mark Sign
+            '\x9A': '\u0161',  # Latin Small Letter S With Caron
+            '\x9B': '\u203A',  # Single Right-Pointing Angle Quotation Mark
+            '\x9C': '\u0153',  # Latin Small Ligature OE
+            #  9D is unassigned in Windows-1252
+            '\x9E': '\u017E',  # Latin Small Letter Z With Caron
+            '\x9F': '\u0178'  # Latin Capital Letter Y With Diaeresis
+        }
+        # Initialize elementary bit vectors (integers each with a different bit set) will be used in bitwise operations.
+        # To be expanded.
+        bit_vector = 1
+        self.char_is_deletable_control_character = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_decomposable_ligature = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_decomposable_sign_symbol = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_decomposable_with_combining = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_composable_anchor_with_combining = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_composable_combining_diacritic = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_decomposable_arabic_punctuation = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_decomposable_cjk_punctuation = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_decomposable_greek_punctuation = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_decomposable_misc_f_punctuation = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_decomposable_dash = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_decomposable_non_zero_space = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_decomposable_enclosure = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_decomposable_cjk = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_mappable_decimal_digit = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_font_small_vertical = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_core_compatibility = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_detachable_from_token = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_ampersand = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_semicolon = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_percent_sign = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_encoding_repair_anchor = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_100_plus_block_of_interest = bit_vector  # code_points >= 0x10000 and of interest (e.g. digit)
+        bit_vector = bit_vector << 1
+        self.char_is_latin = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_greek = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_cyrillic = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_hebrew = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_deletable_hebrew_diacritic = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_arabic = bit_vector  # includes Arabic presentation forms
+        bit_vector = bit_vector << 1
+        self.char_is_arabic_presentation_form = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_deletable_arabic_diacritic = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_mappable_in_arabic = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_mappable_in_farsi = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_mappable_in_pashto = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_georgian = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_thaana_plus = bit_vector  # Thaana, Nko, Samaritan, Mandaic, Syriac
+        bit_vector = bit_vector << 1
+        self.char_is_devanagari = bit_vector
+        bit_vector = bit_vector << 1
+        # Bengali, Gurmukhi, Gujarati, Oriya, Tamil, Telugu, Kannada, Malayalam, Sinhala
+        self.char_is_bengali_plus = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_nukta = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_thai_plus = bit_vector  # Thai, Lao, Tibetan, Myanmar, Georgian
+        bit_vector = bit_vector << 1
+        # Khmer, Mongolian, Canadian Syllabics, Limbu, Tai Le, New Tai Lue
+        # Buginese, Tai Tham, Balinese, Sundanese, Batak, Lepcha, Ol Chiki
+        self.char_is_khmer_plus = bit_vector
+        bit_vector = bit_vector << 1
+        # Lisu, Vai Syllable, Banum, Sloti Nagri, Phags-Pa, Saurashtra,
+        # Kayah Li, Rejang, Javanese, Cham, Tai Viet, Meetei Mayek
+        self.char_is_lisu_plus = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_surrogate = bit_vector
+        bit_vector = bit_vector << 1
+        self.char_is_fullwidth_or_halfwidth = bit_vector
+        bit_vector = bit_vector << 1
+        # Korean
+        self.char_is_mappable_hangul = bit_vector
+        # self.char_is_armenian = bit
+        # self.char_is_japanese_kana = bit
+        # char_type_vector_dict maps characters to character type vectors while the tables are built;
+        # lookups at normalization time use the compact char_type_table instead.
+        self.char_type_vector_dict = {}
+        self.char_type_table = CodePointTable()
+        #
+        # Initialize general mapping dictionary, which normalizes source strings (of length 1-3 characters)
+        # to target strings (of length 0-5 characters).
+        self.mapping_dict = {}
+        # Look-alike entries from a prebuilt table artifact (see load_table_artifact), used by load_look_alike_file.
+        self.prebuilt_look_alike_dict = None
+        if not (use_table_artifact and self.load_table_artifact()):
+            self.range_init_char_type_vector_dict()
+            self.init_mapping_dict(mapping_filenames=self.required_mapping_filenames())
+            self.char_type_table = CodePointTable.from_dict(self.char_type_vector_dict)
+            self.char_type_vector_dict = {}
+        # Shared tables are not changed after initialization, except for lazily filled caches, and may be used by
+        # concurrent threads. Per-line state (line type vector) and look-alike stats can be passed explicitly per call
+        # (see norm_clean_plan_batch, norm_clean_lines_threaded).
+        # look_alike_dict holds both the look-alike table and this Wildebeest's own look-alike counts.
+        self.look_alike_dict = {}
+        self.look_alike_loaded = False  # look-alikes are loaded on first use (see correct_look_alikes)
+        self.look_alike_lock = threading.Lock()
+        # Guards this Wildebeest's own look-alike stats (see merge_look_alike_stats, pop_look_alike_stats)
+        self.look_alike_stats_lock = threading.Lock()
+        self.look_alike_unchanged_dict = {}
+        self.look_alike_split_dict = {}
+        self.look_alike_url_dict = {}
+        self.look_alike_scripts = ['Latin', 'Greek', 'Cyrillic']
+        self.look_alike_script_bits = self.char_is_latin | self.char_is_greek | self.char_is_cyrillic
+        self.look_alike_translation_table_dict = None  # (source_script, target_script) -> translation table
+        self.look_alike_token_re = re.compile(r'(\S+)')
+        # Bounded cache of correct_look_alikes decisions for tokens already seen (see look_alike_token_decision)
+        self.look_alike_token_cache = {}
+        self.look_alike_token_cache_size = 100000
+        self.repair_tok_punct_arabic_match = re.compile(r"([-_+*|%0-9]+)([\u0600-\u06FF])")
+        self.repair_tok_arabic_punct_match = re.compile(r"([\u0600-\u06FF])([-_+*|%0-9]+)")
+        # Indic vowel signs (incl. virama) and the nukta of their script, see repair_combining_modifiers_with_nukta
+        vowel_signs_and_nukta_list = [
+            (((0x093E, 0x094D),), 0x093C),  # Devanagari
+            (((0x09BE, 0x09CD),), 0x09BC),  # Bengali
+            (((0x0A3E, 0x0A4D),), 0x0A3C),  # Gurmukhi
+            (((0x0ABE, 0x0ACD),), 0x0ABC),  # Gujarati
+            (((0x0B3E, 0x0B4D),), 0x0B3C),  # Oriya
+            (((0x0CBE, 0x0CCD),), 0x0CBC),  # Kannada
+            (((0x1C26, 0x1C2C),), 0x1C37),  # Lepcha
+            (((0x110B0, 0x110B8),), 0x110BA),  # Kaithi
+            (((0x111B3, 0x111C0),), 0x111CA),  # Sharada
+            (((0x1122C, 0x11235),), 0x11236),  # Khojki
+            (((0x112E0, 0x112E8), (0x112EA, 0x112EA)), 0x112E9),  # Khudawadi
+            (((0x1133E, 0x1134D),), 0x1133C),  # Grantha
+            (((0x11435, 0x11442),), 0x11446),  # Newa
+            (((0x114B0, 0x114C2),), 0x114C3),  # Tirhuta
+            (((0x115AF, 0x115BF),), 0x115C0),  # Siddham
+            (((0x116AD, 0x116B6),), 0x116B7),  # Takri
+            (((0x1182C, 0x11839),), 0x1183A),  # Dogra
+            (((0x11930, 0x1193E),), 0x11943),  # Dives Akuru
+            (((0x11D31, 0x11D3F), (0x11D45, 0x11D45)), 0x11D42),  # Masaram Gondi
+        ]
+        # A single regex matches any vowel sign followed by any nukta; only pairs of the same script are swapped.
+        self.vowel_sign_nukta_match = re.compile(
+            '[' + ''.join([f'{chr(start)}-{chr(end)}' for vowel_sign_ranges, _ in vowel_signs_and_nukta_list
+                           for start, end in vowel_sign_ranges]) + ']'
+            + '[' + ''.join([chr(nukta) for _, nukta in vowel_signs_and_nukta_list]) + ']')
+        self.vowel_sign_nukta_pairs = frozenset([chr(code_point) + chr(nukta)
+                                                 for vowel_sign_ranges, nukta in vowel_signs_and_nukta_list
+                                                 for start, end in vowel_sign_ranges
+                                                 for code_point in range(start, end + 1)])
+        self.georgian_intab = "\u1C90\u1C91\u1C92\u1C93\u1C94\u1C95\u1C96\u1C97\u1C98\u1C99\u1C9A\u1C9B\u1C9C\u1C9D\u1C9E\u1C9F\u1CA0\u1CA1\u1CA2\u1CA3\u1CA4\u1CA5\u1CA6\u1CA7\u1CA8\u1CA9\u1CAA\u1CAB\u1CAC\u1CAD\u1CAE\u1CAF\u1CB0\u1CB1\u1CB2\u1CB3\u1CB4\u1CB5\u1CB6\u1CB7\u1CB8\u1CB9\u1CBA\u1CBD\u1CBE\u1CBF\u10A0\u10A1\u10A2\u10A3\u10A4\u10A5\u10A6\u10A7\u10A8\u10A9\u10AA\u10AB\u10AC\u10AD\u10AE\u10AF\u10B0\u10B1\u10B2\u10B3\u10B4\u10B5\u10B6\u10B7\u10B8\u10B9\u10BA\u10BB\u10BC\u10BD\u10BE\u10BF\u10C0\u10C1\u10C2\u10C3\u10C4\u10C5\u10C7\u10CD\u2D00\u2D01\u2D02\u2D03\u2D04\u2D05\u2D06\u2D07\u2D08\u2D09\u2D0A\u2D0B\u2D0C\u2D0D\u2D0E\u2D0F\u2D10\u2D11\u2D12\u2D13\u2D14\u2D15\u2D16\u2D17\u2D18\u2D19\u2D1A\u2D1B\u2D1C\u2D1D\u2D1E\u2D1F\u2D20\u2D21\u2D22\u2D23\u2D24\u2D25\u2D27\u2D2D"
+        self.georgian_outtab = "\u10D0\u10D1\u10D2\u10D3\u10D4\u10D5\u10D6\u10D7\u10D8\u10D9\u10DA\u10DB\u10DC\u10DD\u10DE\u10DF\u10E0\u10E1\u10E2\u10E3\u10E4\u10E5\u10E6\u10E7\u10E8\u10E9\u10EA\u10EB\u10EC\u10ED\u10EE\u10EF\u10F0\u10F1\u10F2\u10F3\u10F4\u10F5\u10F6\u10F7\u10F8\u10F9\u10FA\u10FD\u10FE\u10FF\u10D0\u10D1\u10D2\u10D3\u10D4\u10D5\u10D6\u10D7\u10D8\u10D9\u10DA\u10DB\u10DC\u10DD\u10DE\u10DF\u10E0\u10E1\u10E2\u10E3\u10E4\u10E5\u10E6\u10E7\u10E8\u10E9\u10EA\u10EB\u10EC\u10ED\u10EE\u10EF\u10F0\u10F1\u10F2\u10F3\u10F4\u10F5\u10F7\u10FD\u10D0\u10D1\u10D2\u10D3\u10D4\u10D5\u10D6\u10D7\u10D8\u10D9\u10DA\u10DB\u10DC\u10DD\u10DE\u10DF\u10E0\u10E1\u10E2\u10E3\u10E4\u10E5\u10E6\u10E7\u10E8\u10E9\u10EA\u10EB\u10EC\u10ED\u10EE\u10EF\u10F0\u10F1\u10F2\u10F3\u10F4\u10F5\u10F7\u10FD"
+        self.georgian_trantab = str.maketrans(self.georgian_intab, self.georgian_outtab)
+        # Compiled normalization engine: runs of character-mapping steps are applied with a single str.translate.
+        # If compiled is False, norm_clean_string calls every normalization step function separately.
+        self.compiled = compiled
+        self.ncs_step_dict = {}            # lang_code -> list of normalization steps
+        self.ncs_plan_dict = {}            # (lang_code, frozenset of skipped steps) -> NormCleanPlan
+        self.char_map_run_table_dict = {}  # tuple of (group_name, line type vector bits) -> CharMapTable
+        self.ncs_skip_key_set_dict = {}    # lang_code -> (set of SKIP- keys of steps, plan without skipped steps)
+        # Single-pass encoding repair (see init_encoding_repair), initialized on first use
+        self.surrogate_re: Optional[re.Pattern] = None
+        self.surrogate_repair_table: Optional[dict] = None
+        self.encoding_repair_table: Optional[EncodingRepairTable] = None
+        self.encoding_error_re: Optional[re.Pattern] = None
+        # Optional LRU cache of normalized lines (see norm_clean_plan_entry), keyed by (line, NormCleanPlan).
+        # Corpora such as ASR transcripts, subtitles and social-media text repeat many lines exactly.
+        self.line_cache_size = line_cache_size
+        self.line_cache = OrderedDict()
+        self.line_cache_lock = threading.Lock()
+        self.line_cache_hits = 0
+        self.line_cache_misses = 0
+        # Optional profile (see enable_profile): cumulative wall time in seconds per normalization step
+        # ('TIME-<group_name>'), for the line type vector prescan ('TIME-PRESCAN'), for norm_clean_string
+        # ('TIME-NORMALIZATION') and for reading/writing lines ('TIME-IO').
+        self.profile_dict: Optional[dict] = None
+
+    def windows1252_to_utf8_char(self, index: int) -> str:
+        """ Typical input: 0x80       Typical output: '€' """
+        s = chr(index)
+        if s in self.spec_windows1252_to_utf8_dict:
+            return self.spec_windows1252_to_utf8_dict[s]
+        else:
+            return s
+
+    def set_mapping_dict(self, key: str, value: str, index: int, byte_string: Optional[bytes], loc: str,
+                         verbose: bool = False) -> None:
+        self.mapping_dict[key] = value
+        if verbose:
+            log.info(f'map-{loc} {index} {key} -> {value}   byte_string:{byte_string}')
+
+    def range_init_char_type_vector_dict(self) -> None:
+        # Deletable control characters
+        for code_point in chain(range(0x0000, 0x0009), range(0x000B, 0x000D), range(0x000E, 0x0020), [0x007F],  # C0
+                                range(0x0080, 0x00A0),     # C1 block of control characters
+                                [0x0640],                  # Arabic tatweel
+                                range(0x200B, 0x2010),     # zero width space/non-joiner/joiner, direction marks
+                                range(0xFE00, 0xFE10),     # variation selectors 1-16
+                                [0xFEFF],                  # byte order mark, zero width no-break space
+                                range(0xE0100, 0xE01F0)):  # variation selectors 17-256
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_deletable_control_character
+        # Surrogate
+        for code_point in range(0xDC80, 0xDD00):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_surrogate
+        # Decomposable ligatures (partial list)
+        for code_point in [0x0E33, 0x0EB3, 0x0EDC, 0x0EDD, 0x1E9B]:
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_decomposable_ligature
+        # Decomposable dash
+        for code_point in chain([0x00AD],
+                                range(0x2010, 0x2016),
+                                [0x2212, 0x2500, 0x2501, 0x2E3A, 0x2E3B, 0xFE31, 0xFE32, 0xFE58, 0xFE63, 0xFF0D]):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_decomposable_dash
+        # Decomposable non-zero space
+        for code_point in chain(range(0x2000, 0x200B), [0x00A0, 0x202F, 0x205F, 0x3000]):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_decomposable_non_zero_space
+        # Detachable from token
+        for char in ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9', '-', '_', '+', '*', '|', '%']:
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_detachable_from_token
+        # XML, URL escapes
+        self.char_type_vector_dict['&'] = self.char_type_vector_dict.get('&', 0) | self.char_is_ampersand
+        self.char_type_vector_dict[';'] = self.char_type_vector_dict.get(';', 0) | self.char_is_semicolon
+        self.char_type_vector_dict['%'] = self.char_type_vector_dict.get('%', 0) | self.char_is_percent_sign
+        # Fullwidth, halfwidth
+        for code_point in range(0xFF01, 0xFFEF):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_fullwidth_or_halfwidth
+        # Latin
+        for code_point in chain(range(0x0041, 0x005B), range(0x0061, 0x007B), range(0x00C0, 0x00D7),
+                                range(0x00D8, 0x00F7), range(0x00F8, 0x02B0), range(0x2C60, 0x2080),
+                                range(0xA720, 0xA800), range(0xAB30, 0xAB70)):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_latin
+        # Greek
+        for code_point in chain(range(0x0370, 0x0400), range(0x1F00, 0x2000)):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_greek
+        # Cyrillic
+        for code_point in chain(range(0x0400, 0x0530), range(0x1C80, 0x1C90), range(0x2DE0, 0x2E00),
+                                range(0xA640, 0xA6A0)):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_cyrillic
+        # Hebrew
+        for code_point in chain(range(0x0590, 0x0600), range(0xFB1D, 0xFB50)):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_hebrew
+        for code_point in chain(range(0x05B0, 0x05BE), [0x05BF, 0x05C1, 0x05C2, 0x05C7]):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_deletable_hebrew_diacritic
+        # Arabic
+        for code_point in chain(range(0x0600, 0x0700), range(0x0750, 0x0780), range(0x08A0, 0x0900)):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_arabic
+        for code_point in chain(range(0xFB50, 0xFE00), range(0xFE70, 0xFEFF)):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_arabic | self.char_is_arabic_presentation_form
+        for code_point in range(0x064B, 0x0653):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_deletable_arabic_diacritic
+        for code_point in [0x06A9, 0x06CC, 0x0675, 0x0676, 0x0678, 0x067C, 0x0689, 0x0693, 0x06AB, 0x06BC, 0x06CD]:
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_mappable_in_arabic
+        for code_point in [0x064A, 0x0649, 0x06CD, 0x0643, 0x06AB, 0x067C, 0x0689, 0x0693, 0x06BC, 0x06CD]:
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_mappable_in_farsi
+        for code_point in [0x0649, 0x06CD, 0x0643]:
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_mappable_in_pashto
+        # Georgian
+        for code_point in chain(range(0x10A0, 0x10FF), range(0x1C90, 0x1CBF), range(0x2D00, 0x2D2F)):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_georgian
+        # Thaana+
+        for code_point in range(0x0780, 0x08A0):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_thaana_plus
+        # Devanagari
+        for code_point in chain(range(0x0900, 0x0980), range(0xA8E0, 0xA900)):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_devanagari
+        # Bengali+
+        for code_point in range(0x0980, 0x0E00):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_bengali_plus
+        # Nukta
+        for code_point in [0x093C, 0x09BC, 0x0A3C, 0x0ABC, 0x0B3C, 0x0CBC, 0x1C37, 0x110BA, 0x11173, 0x111CA, 0x11236,
+                           0x112E9, 0x1133C, 0x11446, 0x114C3, 0x115C0, 0x116B7, 0x1183A, 0x11943, 0x11D42, 0x1E94A]:
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_nukta
+            if code_point >= 0x10000:
+                self.char_type_vector_dict[char] \
+                    = self.char_type_vector_dict.get(char, 0) | self.char_is_100_plus_block_of_interest
+        # Thai+
+        for code_point in range(0x0E00, 0x1100):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_thai_plus
+        # Korean
+        for code_point in range(0x1161, 0x1176):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_mappable_hangul
+        # Khmer+
+        for code_point in chain(range(0x1780, 0x1AB0), range(0x1B00, 0x1C80), range(0x1CC0, 0x1CD0)):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_khmer_plus
+        # Lisu+
+        for code_point in chain(range(0xA4D0, 0xA630), range(0xA6A0, 0xA700), range(0xA800, 0xA830),
+                                range(0xA840, 0xA8E0), range(0xA900, 0xA960), range(0xA980, 0xA9E0),
+                                range(0xAA00, 0xAA60), range(0xAA80, 0xAB00)):
+            char = chr(code_point)
+            self.char_type_vector_dict[char] \
+                = self.char_type_vector_dict.get(char, 0) | self.char_is_lisu_plus
+
+    @staticmethod
+    def table_artifact_filename() -> str:
+        src_dir_path = os.path.dirname(os.path.realpath(__file__))
+        return os.path.join(src_dir_path, 'data', TABLE_ARTIFACT_FILENAME)
+
+    @staticmethod
+    def table_artifact_source_signature() -> list:
+        """
+        Size and modification time of the files that the tables of a Wildebeest are built from, i.e. the mapping
+        files, the look-alike file and this module itself. A table artifact with a different signature is stale.
+        """
+        src_dir_path = os.path.dirname(os.path.realpath(__file__))
+        data_dir_path = os.path.join(src_dir_path, 'data')
+        filenames = [os.path.realpath(__file__), os.path.join(data_dir_path, 'look-alikes.txt')]
+        filenames += sorted(os.path.join(data_dir_path, filename) for filename in os.listdir(data_dir_path)
+                            if re.match(r'.*Mapping(?:Annotated)?\.tsv$', filename))
+        signature = []
+        for filename in filenames:
+            stat = os.stat(filename)
+            signature.append((os.path.basename(filename), stat.st_size, stat.st_mtime_ns))
+        return signature
+
+    def table_artifact_dict(self) -> dict:
+        """
+        Returns the finished character type vectors, mapping table and look-alike table, as written to table
+        artifacts (see write_table_artifact).
+        """
+        if self.skip_steps:
+            raise ValueError('Table artifacts must be written by a Wildebeest without skip_steps')
+        if self.prebuilt_look_alike_dict is not None:
+            look_alike_dict = self.prebuilt_look_alike_dict
+        else:
+            look_alike_wb = Wildebeest(use_table_artifact=False)
+            look_alike_wb.load_look_alike_file(verbose=False)
+            look_alike_dict = look_alike_wb.look_alike_dict
+        return {'format': TABLE_ARTIFACT_FORMAT_VERSION,
+                'version': __version__,
+                'source_signature': self.table_artifact_source_signature(),
+                'char_type_block_index': self.char_type_table.block_index,
+                'char_type_values': self.char_type_table.values,
+                'mapping_dict': self.mapping_dict,
+                'look_alike_dict': look_alike_dict}
+
+    def write_table_artifact(self, filename: Optional[str] = None) -> None:
+        """
+        Writes the finished character type vectors, mapping table and look-alike table to a versioned artifact,
+        from which later Wildebeest instances can load their tables much faster than from the data files.
+        Typically called by wildebeest_build_data.py (build-table-artifact) on a Wildebeest built without artifact.
+        """
+        table_artifact = self.table_artifact_dict()
+        if filename is None:
+            filename = self.table_artifact_filename()
+        with open(filename, 'wb') as f:
+            pickle.dump(table_artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+        log.info(f'Wrote table artifact {filename} ({len(self.char_type_table)} character types, '
+                 f"{len(self.mapping_dict)} mappings, {len(table_artifact['look_alike_dict'])} look-alikes)")
+
+    @staticmethod
+    def read_table_artifact(filename: str) -> dict:
+        """
+        Returns the tables of an artifact written by write_table_artifact, also if it is stale, e.g. a copy kept
+        from before a rebuild of the mapping files (see renorm_file_since_tables). Raises ValueError for bad artifacts.
+        """
+        try:
+            with open(filename, 'rb') as f:
+                table_artifact = pickle.load(f)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as error:
+            raise ValueError(f'Unreadable table artifact {filename} ({error})')
+        if not isinstance(table_artifact, dict) or table_artifact.get('format') != TABLE_ARTIFACT_FORMAT_VERSION:
+            raise ValueError(f'Table artifact {filename} is not of format {TABLE_ARTIFACT_FORMAT_VERSION}')
+        return table_artifact
+
+    def load_table_artifact(self, filename: Optional[str] = None) -> bool:
+        """
+        Loads tables from an artifact written by write_table_artifact.
+        Returns False (and loads nothing) if the artifact is missing, unreadable, of another format or stale.
+        """
+        if filename is None:
+            filename = self.table_artifact_filename()
+        try:
+            with open(filename, 'rb') as f:
+                table_artifact = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError) as error:
+            log.warning(f'Ignoring unreadable table artifact {filename} ({error})')
+            return False
+        if (not isinstance(table_artifact, dict)
+                or table_artifact.get('format') != TABLE_ARTIFACT_FORMAT_VERSION
+                or table_artifact.get('version') != __version__
+                or table_artifact.get('source_signature') != self.table_artifact_source_signature()):
+            log.debug(f'Ignoring stale table artifact {filename}')
+            return False
+        self.char_type_table = CodePointTable(table_artifact['char_type_block_index'],
+                                              table_artifact['char_type_values'])
+        self.mapping_dict = table_artifact['mapping_dict']
+        self.prebuilt_look_alike_dict = table_artifact['look_alike_dict']
+        return True
+
+    def load_look_alike_file(self, verbose: bool = True) -> None:
+        src_dir_path = os.path.dirname(os.path.realpath(__file__))
+        data_dir_path = os.path.join(src_dir_path, "data")
+        look_alike_filename = os.path.join(data_dir_path, 'look-alikes.txt')
+        self.look_alike_translation_table_dict = None
+        self.look_alike_token_cache = {}
+        if self.prebuilt_look_alike_dict is not None:
+            self.look_alike_dict.update(self.prebuilt_look_alike_dict)
+            self.look_alike_loaded = True
+            if verbose:
+                log.info(f'Loaded {len(self.prebuilt_look_alike_dict)} look-alike mappings of {look_alike_filename}'
+                         f' from table artifact')
+            return
+        line_number = 0
+        n_entries = 0
+        look_alike_category = None
+        with open(look_alike_filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                line_number += 1
+                line_contains_entry = False
+                script_dict = {}  # local mapping from script (e.g. Latin|Greek|Cyrillic) to character (e.g. w|θ|ж)
+                if re.search('::section', line):
+                    if re.search('Identical-looking characters', line):
+                        look_alike_category = 'identical'
+                    elif re.search('Similar-looking characters', line):
+                        look_alike_category = 'similar'
+                    else:
+                        look_alike_category = None
+                else:
+                    char_list = re.split(r'\s+', line.rstrip())
+                    if look_alike_category == 'identical':
+                        for char in char_list:
+                            script = self.char_script(char)
+                            if script and script_dict.get(script, None) is None:
+                                script_dict[script] = char
+                        for script1 in self.look_alike_scripts:
+                            char1 = script_dict.get(script1, None)
+                            if char1:
+                                for script2 in self.look_alike_scripts:
+                                    if script1 != script2:
+                                        char2 = script_dict.get(script2, None)
+                                        if char2:
+                                            self.look_alike_dict[f'{script1} {script2} {char1}'] = char2
+                                            line_contains_entry = True
+                if line_contains_entry:
+                    n_entries += 1
+            self.look_alike_loaded = True
+            if verbose:
+                log.info(f'Loaded {n_entries} entries from {look_alike_filename}')
+
+    def update_char_type_vector_dict(self, source: str, target: str, filename_core: str) -> None:
+        if filename_core == 'Digit':
+            self.char_type_vector_dict[source] \
+                = self.char_type_vector_dict.get(source, 0) | self.char_is_mappable_decimal_digit
+            if len(source) >= 1 and ord(source[0]) >= 0x10000:
+                self.char_type_vector_dict[source] \
+                    = self.char_type_vector_dict.get(source, 0) | self.char_is_100_plus_block_of_interest
+        elif filename_core == 'FontSmallVertical':
+            self.char_type_vector_dict[source] \
+                = self.char_type_vector_dict.get(source, 0) | self.char_is_font_small_vertical
+        elif filename_core == 'CoreCompatibility':
+            self.char_type_vector_dict[source] \
+                = self.char_type_vector_dict.get(source, 0) | self.char_is_core_compatibility
+        elif filename_core == 'CJKCompatibility':
+            self.char_type_vector_dict[source] \
+                = self.char_type_vector_dict.get(source, 0) | self.char_is_decomposable_cjk
+        elif filename_core == 'PythonWildebeest':
+            if len(source) == 1:
+                code_point = ord(source)
+                if (0x0132 <= code_point <= 0x01F3) or (0xFB00 <= code_point <= 0xFB4F):
+                    self.char_type_vector_dict[source] \
+                        = self.char_type_vector_dict.get(source, 0) | self.char_is_decomposable_ligature
+                elif (code_point == 0x00B5) or (0x03D0 <= code_point <= 0x03F9) or (0x20A8 <= code_point <= 0x213B):
+                    self.char_type_vector_dict[source] \
+                        = self.char_type_vector_dict.get(source, 0) | self.char_is_decomposable_sign_symbol
+                elif 0x0340 <= code_point <= 0x0387:
+                    self.char_type_vector_dict[source] \
+                        = self.char_type_vector_dict.get(source, 0) | self.char_is_decomposable_greek_punctuation
+                elif 0x060C <= code_point <= 0x06D4:
+                    self.char_type_vector_dict[source] \
+                        = self.char_type_vector_dict.get(source, 0) | self.char_is_decomposable_arabic_punctuation
+                elif ((0x3008 <= code_point <= 0x3011) or (0x3014 <= code_point <= 0x301B)  # Chinese brackets
+                        or (0xFF61 <= code_point <= 0xFF64)  # Chinese halfwidth punctuation
+                        or (code_point in [0x3001, 0x3002, 0xFE11, 0xFE12, 0xFE51])):  # periods, commas
+                    self.char_type_vector_dict[source] \
+                        = self.char_type_vector_dict.get(source, 0) | self.char_is_decomposable_cjk_punctuation
+                elif code_point == 0x0F0C:
+                    self.char_type_vector_dict[source] \
+                        = self.char_type_vector_dict.get(source, 0) | self.char_is_decomposable_misc_f_punctuation
+        elif filename_core == 'Enclosure':
+            if len(source) >= 1:
+                char = source[0]
+                self.char_type_vector_dict[char] \
+                    = self.char_type_vector_dict.get(char, 0) | self.char_is_decomposable_enclosure
+        elif filename_core == 'EncodingRepair':
+            if len(source) >= 1:
+                char = source[0]
+                self.char_type_vector_dict[char] \
+                    = self.char_type_vector_dict.get(char, 0) | self.char_is_encoding_repair_anchor
+        elif filename_core == 'CombiningModifier':
+            if len(source) == 1:
+                self.char_type_vector_dict[source] \
+                    = self.char_type_vector_dict.get(source, 0) | self.char_is_decomposable_with_combining
+            elif (len(source) >= 2) and (len(target) == 1):
+                self.char_type_vector_dict[source[0]] \
+                    = self.char_type_vector_dict.get(source[0], 0) | self.char_is_composable_anchor_with_combining
+                self.char_type_vector_dict[source[1]] \
+                    = self.char_type_vector_dict.get(source[1], 0) | self.char_is_composable_combining_diacritic
+            else:
+                log.info('Unexpected CombiningModifier entry {source}/{target}')
+
+    def required_mapping_filenames(self) -> Optional[List[str]]:
+        """Mapping files needed by the steps that are not in skip_steps (None for all)."""
+        if not self.skip_steps:
+            return None
+        needed_filenames = set()
+        for step, filenames in self.mapping_filenames_by_step.items():
+            if step not in self.skip_steps:
+                needed_filenames.update(filenames)
+        return [filename for filename in self.mapping_filenames if filename in needed_filenames]
+
+    # noinspection SpellCheckingInspection
+    def init_mapping_dict(self, undef_default: str = '', mapping_filenames: Optional[Collection[str]] = None) -> None:
+        """
+        Initialize mapping_dict that maps from various misencodings to proper UTF8.
+        mapping_filenames: mapping files to be loaded (default: all)
+        """
+        # Misencodings that resulted from missing conversion from Windows1252/Latin1 to UTF8.
+        # Control characters section in surrogate code block
+        for index in range(0x80, 0xA0):
+            spec_windows1252_char = chr(index)
+            surrogate_char = chr(index + 0xDC00)
+            if spec_windows1252_char in self.spec_windows1252_to_utf8_dict:
+                self.set_mapping_dict(surrogate_char, self.spec_windows1252_to_utf8_dict[spec_windows1252_char],
+                                      index, None, 's1')
+            else:  # x81,x8D,x8F,x90,x9D
+                self.set_mapping_dict(surrogate_char, undef_default, index, None, 's2')
+        # Other characters in surrogate code block
+        for index in range(0xA0, 0x100):
+            latin1_char = chr(index)
+            surrogate_char = chr(index + 0xDC00)
+            self.set_mapping_dict(surrogate_char, latin1_char, index, None, 's3')
+        src_dir_path = os.path.dirname(os.path.realpath(__file__))
+        data_dir_path = os.path.join(src_dir_path, "data")
+        if mapping_filenames is None:
+            mapping_filenames = self.mapping_filenames
+        for tsv_filename in mapping_filenames:
+            filename_core = tsv_filename.replace('Mapping.tsv', '')
+            full_tsv_filename = os.path.join(data_dir_path, tsv_filename)
+            filenames_considered = [full_tsv_filename]
+            if not Path(full_tsv_filename).is_file():
+                full_tsv_filename = os.path.join(data_dir_path, tsv_filename.replace('.tsv', 'Annotated.tsv'))
+                filenames_considered += [full_tsv_filename]
+            try:
+                with open(full_tsv_filename, 'r', encoding='utf-8', errors='ignore') as f:
+                    line_number = 0
+                    for line in f:
+                        line_number += 1
+                        tsv_list = re.split(r'\t', line.rstrip())
+                        if (len(tsv_list) >= 2) and (line_number >= 2):
+                            self.mapping_dict[tsv_list[0]] = tsv_list[1]
+                            self.update_char_type_vector_dict(tsv_list[0], tsv_list[1], filename_core)
+            except FileNotFoundError:
+                log.error(f"Could not open {' or '.join(filenames_considered)}")
+
+    def apply_mapping_dict(self, match: Match[str]) -> str:
+        """Maps substring resulting from misencoding to repaired UTF8."""
+        s = match.group()
+        if s in self.mapping_dict:
+            return self.mapping_dict[s]
+        else:
+            return s
+
+    # noinspection SpellCheckingInspection
+    def init_encoding_repair(self) -> None:
+        """
+        Initialize the single-pass encoding repair (see repair_encoding_errors): a translate table for surrogates,
+        a regex that matches, left to right, the segments that the multi-pass method repairs
+        (anchor + double-encoded triple, anchor + next character, double-encoded triple, C1 control character),
+        and a lazily filled table of repaired segments.
+        A segment can be repaired in isolation, as long as the repairs of double-encoded triples (\u00E2..)
+        are not empty and contain no anchor (\u00C2\u00C3\u00C5\u00C6\u00CB), as in EncodingRepairMapping.tsv.
+        Otherwise, repair_encoding_errors falls back to the multi-pass method.
+        """
+        self.surrogate_repair_table = {code_point: self.mapping_dict.get(chr(code_point), chr(code_point))
+                                       for code_point in range(0xDC80, 0xDD00)}
+        self.surrogate_re = re.compile(r'[\uDC80-\uDCFF]')
+        encoding_error_re = re.compile(r'([\u00C2\u00C3\u00C5\u00C6\u00CB]'
+                                       r'(?:\u00E2[\u0080-\u00BF][\u0080-\u00BF]|[\u0080-\u02FF\u2000-\u21FF])'
+                                       r'|\u00E2[\u0080-\u00BF][\u0080-\u00BF]|[\u0080-\u009F])')
+        for source, target in self.mapping_dict.items():
+            if re.fullmatch(r'\u00E2[\u0080-\u00BF][\u0080-\u00BF]', source) \
+                    and (target == '' or re.search(r'[\u00C2\u00C3\u00C5\u00C6\u00CB]', target)):
+                encoding_error_re = None
+                break
+        self.encoding_error_re = encoding_error_re
+        # Set last, as other threads take it as sign that initialization is complete.
+        self.encoding_repair_table = EncodingRepairTable(self.repair_encoding_errors_multi_pass)
+
+    def repair_encoding_errors(self, s: str) -> str:
+        """
+        Interpret non-UTF8 characters (standalone \x80-\xFF, read in as surrogate characters \uDC80-\uDCFF])
+        as one-byte Windows-1252/Latin-1 (ISO-8859-1) characters. Please note that ASCII characters (\u0000-\u007F)
+        are encoded identically in UTF-8, Latin-1, and Windows-1252, so no conversion is necessary in that case.
+        Same result as repair_encoding_errors_multi_pass, but in a single left-to-right pass (after translating
+        surrogates), with repaired segments looked up in a table rather than computed by a callback per match.
+        """
+        if self.encoding_repair_table is None:
+            self.init_encoding_repair()
+        if self.encoding_error_re is None:
+            return self.repair_encoding_errors_multi_pass(s)
+        if self.surrogate_re.search(s):
+            s = s.translate(self.surrogate_repair_table)
+        parts = self.encoding_error_re.split(s)
+        if len(parts) == 1:
+            return s
+        parts[1::2] = map(self.encoding_repair_table.__getitem__, parts[1::2])
+        return ''.join(parts)
+
+    def repair_encoding_errors_multi_pass(self, s: str) -> str:
+        """Original version of repair_encoding_errors, with a regex pass per type of encoding error."""
+        # Correct missing conversion to UTF8
+        s = re.sub(r'[\uDC80-\uDCFF]', self.apply_mapping_dict, s)
+        # Correct UTF8 misencodings due to wrong or double application of Windows1252/Latin1-to-UTF converter
+        s = re.sub(r'\u00E2[\u0080-\u00BF][\u0080-\u00BF]', self.apply_mapping_dict, s)
+        s = re.sub(r'[\u00C2-\u00C3\u00C5\u00C6\u00CB][\u0080-\u02FF\u2000-\u21FF]', self.apply_mapping_dict, s)
+        s = re.sub(r'[\u0080-\u009F]', self.apply_mapping_dict, s)
+        return s
+
+    # noinspection SpellCheckingInspection
+    @staticmethod
+    def delete_surrogates(s: str, default: str = '') -> str:
+        """As an alternative or backup to windows1252_to_utf8, delete all surrogate characters \uDC80-\uDCFF])."""
+        return re.sub(r"[\uDC80-\uDCFF]", default, s)
+
+    @staticmethod
+    def delete_control_characters(s: str) -> str:
+        """Deletes control characters (except tab and linefeed), zero-width characters, byte order mark,
+           directional marks, join marks, variation selectors, Arabic tatweel"""
+        s = s.replace('\u00AD', '')  # U+00AD soft hyphen
+        s = re.sub(r'[\u0000-\u0008]', '', s)  # control characters C0 code block (except tab \x09, linefeed \x0A)
+        s = re.sub(r'[\u000B-\u000C]', '', s)  # control characters C0 code block (continued, except CR \x0D)
+        s = re.sub(r'[\u000E-\u001F]', '', s)  # control characters C0 code block (continued)
+        s = re.sub(r'[\u007F-\u009F]', '', s)  # control characters 'DELETE' and C1 code block
+        s = s.replace('\u0640', '')  # Arabic tatweel
+        s = re.sub(r'[\u200B-\u200F]', '', s)  # zero width space/non-joiner/joiner, direction marks
+        s = re.sub(r'[\uFE00-\uFE0F]', '', s)  # variation selectors 1-16
+        # noinspection SpellCheckingInspection
+        s = s.replace('\uFEFF', '')  # byte order mark, zero width no-break space
+        s = re.sub(r'[\U000E0100-\U000E01EF]', '', s)  # variation selectors 17-256
+        return s
+
+    @staticmethod
+    def delete_arabic_diacritics(s: str) -> str:
+        s = s.replace('\u064B', '')  # delete Arabic fathatan
+        s = s.replace('\u064C', '')  # delete Arabic dammatan
+        s = s.replace('\u064D', '')  # delete Arabic kasratan
+        s = s.replace('\u064E', '')  # delete Arabic fatha
+        s = s.replace('\u064F', '')  # delete Arabic damma
+        s = s.replace('\u0650', '')  # delete Arabic kasra
+        s = s.replace('\u0651', '')  # delete Arabic shadda
+        s = s.replace('\u0652', '')  # delete Arabic sukun
+        return s
+
+    @staticmethod
+    def delete_hebrew_diacritics(s: str) -> str:
+        s = s.replace('\u05B0', '')  # HEBREW POINT SHEVA
+        s = s.replace('\u05B1', '')  # HEBREW POINT HATAF SEGOL
+        s = s.replace('\u05B2', '')  # HEBREW POINT HATAF PATAH
+        s = s.replace('\u05B3', '')  # HEBREW POINT HATAF QAMATS
+        s = s.replace('\u05B4', '')  # HEBREW POINT HIRIQ
+        s = s.replace('\u05B5', '')  # HEBREW POINT TSERE
+        s = s.replace('\u05B6', '')  # HEBREW POINT SEGOL
+        s = s.replace('\u05B7', '')  # HEBREW POINT PATAH
+        s = s.replace('\u05B8', '')  # HEBREW POINT QAMATS
+        s = s.replace('\u05B9', '')  # HEBREW POINT HOLAM
+        s = s.replace('\u05BA', '')  # HEBREW POINT HOLAM HASER FOR VAV
+        s = s.replace('\u05BB', '')  # HEBREW POINT QUBUTS
+        s = s.replace('\u05BC', '')  # HEBREW POINT DAGESH OR MAPIQ
+        s = s.replace('\u05BD', '')  # HEBREW POINT METEG
+        s = s.replace('\u05BF', '')  # HEBREW POINT RAFE
+        s = s.replace('\u05C1', '')  # HEBREW POINT SHIN DOT
+        s = s.replace('\u05C2', '')  # HEBREW POINT SIN DOT
+        s = s.replace('\u05C7', '')  # HEBREW POINT QAMATS QATAN
+        return s
+
+    # noinspection SpellCheckingInspection
+    @staticmethod
+    def normalize_arabic_characters(s: str) -> str:
+        # For any additions below, also update setting of char_is_mappable_in_arabic
+        # Some of the below, particularly the alef maksura, might be too aggressive. Too be verified.
+        #    More conservative: keep alef maksura and map final/isolated Farsi yeh to alef maksura.
+        # s = s.replace('\u0649', '\u064A')  # alef maksura to yeh
+        s = s.replace('\u06A9', '\u0643')  # Farsi kaf/keheh to (Arabic) kaf
+        s = s.replace('\u06CC', '\u064A')  # Farsi yeh to (Arabic) yeh
+        s = s.replace('\u0675', '\u0623')  # (Kazakh) high hamza alef to alef with hamza above
+        s = s.replace('\u0676', '\u0624')  # (Kazakh) high hamza waw to waw with hamza above
+        s = s.replace('\u0678', '\u0626')  # (Kazakh) high hamza yeh to yeh with hamza above
+        s = s.replace('\u067C', '\u062A')  # (Pashto) teh with ring to teh
+        s = s.replace('\u0689', '\u062F')  # (Pashto) dal with ring to dal
+        s = s.replace('\u0693', '\u0631')  # (Pashto) reh with ring to reh
+        s = s.replace('\u06AB', '\u06AF')  # (Pashto) kaf with ring to gaf
+        s = s.replace('\u06BC', '\u0646')  # (Pashto) noon with ring to noon
+        s = s.replace('\u06CD', '\u064A')  # (Pashto) yeh with tail to yeh
+        # Not necessarily complete.
+        return s
+
+    # noinspection SpellCheckingInspection
+    @staticmethod
+    def normalize_farsi_characters(s: str) -> str:
+        # For any additions below, also update setting of char_is_mappable_in_farsi
+        s = s.replace('\u064A', '\u06CC')  # Arabic to Farsi yeh
+        s = s.replace('\u0649', '\u06CC')  # Arabic alef maksura to Farsi yeh
+        s = s.replace('\u06CD', '\u06CC')  # Arabic yeh with tail to Farsi yeh
+        s = s.replace('\u0643', '\u06A9')  # Arabic kaf to keheh
+        s = s.replace('\u06AB', '\u06AF')  # (Pashto) kaf with ring to gaf
+        s = s.replace('\u067C', '\u062A')  # (Pashto) teh with ring to Arabic teh
+        s = s.replace('\u0689', '\u062F')  # (Pashto) dal with ring to Arabic dal
+        s = s.replace('\u0693', '\u0631')  # (Pashto) reh with ring to Arabic reh
+        s = s.replace('\u06BC', '\u0646')  # (Pashto) noon with ring to noon
+        s = s.replace('\u06CD', '\u064A')  # (Pashto) yeh with tail to yeh
+        return s
+
+    @staticmethod
+    def normalize_pashto_characters(s: str) -> str:
+        # For any additions below, also update setting of char_is_mappable_in_pashto
+        s = s.replace('\u0649', '\u06CC')  # Arabic alef maksura to Farsi yeh
+        s = s.replace('\u06CD', '\u06CC')  # Arabic yeh with tail to Farsi yeh
+        s = s.replace('\u0643', '\u06A9')  # Arabic kaf to keheh
+        return s
+
+    def normalize_georgian_characters(self, s: str) -> str:
+        s = s.translate(self.georgian_trantab)
+        s = s.replace('ჱ', 'ე')   # archaic Georgian letter he
+        s = s.replace('ჲ', 'ი')   # archaic Georgian letter hie
+        s = s.replace('ჳ', 'ვი')  # archaic Georgian letter we
+        s = s.replace('ჴ', 'ხე')  # archaic Georgian letter har
+        s = s.replace('ჵ', 'ჰოი') # archaic Georgian letter hoe
+        return s
+
+    # noinspection SpellCheckingInspection
+    def normalize_arabic_pres_form_characters(self, s: str) -> str:
+        """This includes some Arabic ligatures."""
+        s = re.sub(r'[\uFB50-\uFDFF\uFE70-\uFEFC]', self.apply_mapping_dict, s)
+        return s
+
+    # noinspection SpellCheckingInspection
+    @staticmethod
+    def normalize_ligatures(s: str) -> str:
+        """Arabic ligatures are already covered by function normalize_arabic_pres_form_characters."""
+        s = s.replace('\u0132', '\u0049\u004A')  # U+0132 LATIN CAPITAL LIGATURE IJ Ĳ -> IJ
+        s = s.replace('\u0133', '\u0069\u006A')  # U+0133 LATIN SMALL LIGATURE IJ ĳ -> ij
+        s = s.replace('\u013F', '\u004C\u00B7')  # U+013F LATIN CAPITAL LETTER L WITH MIDDLE DOT Ŀ -> L·
+        s = s.replace('\u0140', '\u006C\u00B7')  # U+0140 LATIN SMALL LETTER L WITH MIDDLE DOT ŀ -> l·
+        s = s.replace('\u0149', '\u02BC\u006E')  # U+0149 LATIN SMALL LETTER N PRECEDED BY APOSTROPHE ŉ -> ʼn \
+        s = s.replace('\u017F', '\u0073')        # U+017F LATIN SMALL LETTER LONG S ſ -> s
+        s = s.replace('\u01C4', '\u0044\u017D')  # U+01C4 LATIN CAPITAL LETTER DZ WITH CARON Ǆ -> DŽ
+        s = s.replace('\u01C5', '\u0044\u017E')  # U+01C5 LATIN CAPITAL D WITH SMALL Z WITH CARON ǅ -> Dž
+        s = s.replace('\u01C6', '\u0064\u017E')  # U+01C6 LATIN SMALL LETTER DZ WITH CARON ǆ -> dž
+        s = s.replace('\u01C7', '\u004C\u004A')  # U+01C7 LATIN CAPITAL LETTER LJ Ǉ -> LJ
+        s = s.replace('\u01C8', '\u004C\u006A')  # U+01C8 LATIN CAPITAL LETTER L WITH SMALL LETTER J ǈ -> Lj
+        s = s.replace('\u01C9', '\u006C\u006A')  # U+01C9 LATIN SMALL LETTER LJ ǉ -> lj
+        s = s.replace('\u01CA', '\u004E\u004A')  # U+01CA LATIN CAPITAL LETTER NJ Ǌ -> NJ
+        s = s.replace('\u01CB', '\u004E\u006A')  # U+01CB LATIN CAPITAL LETTER N WITH SMALL LETTER J ǋ -> Nj
+        s = s.replace('\u01CC', '\u006E\u006A')  # U+01CC LATIN SMALL LETTER NJ ǌ -> nj
+        s = s.replace('\u01F1', '\u0044\u005A')  # U+01F1 LATIN CAPITAL LETTER DZ Ǳ -> DZ
+        s = s.replace('\u01F2', '\u0044\u007A')  # U+01F2 LATIN CAPITAL LETTER D WITH SMALL LETTER Z ǲ -> Dz
+        s = s.replace('\u01F3', '\u0064\u007A')  # U+01F3 LATIN SMALL LETTER DZ ǳ -> dz
+        s = s.replace('\u1E9B', '\u1E61')        # U+1E9B LATIN SMALL LETTER LONG S WITH DOT ABOV ẛ -> ṡ
+        s = s.replace('\uFB00', '\u0066\u0066')  # U+FB00 LATIN SMALL LIGATURE FF ﬀ -> ff
+        s = s.replace('\uFB01', '\u0066\u0069')  # U+FB01 LATIN SMALL LIGATURE FI ﬁ -> fi
+        s = s.replace('\uFB02', '\u0066\u006C')  # U+FB02 LATIN SMALL LIGATURE FL ﬂ -> fl
+        s = s.replace('\uFB03', '\u0066\u0066\u0069')  # U+FB03 LATIN SMALL LIGATURE FFI ﬃ -> ffi
+        s = s.replace('\uFB04', '\u0066\u0066\u006C')  # U+FB04 LATIN SMALL LIGATURE FFL ﬄ -> ffl
+        s = s.replace('\uFB05', '\u0073\u0074')  # U+FB05 LATIN SMALL LIGATURE LONG S T ﬅ -> ſt
+        s = s.replace('\uFB06', '\u0073\u0074')  # U+FB06 LATIN SMALL LIGATURE ST ﬆ -> st
+        s = s.replace('\uFB13', '\u0574\u0576')  # U+FB13 ARMENIAN SMALL LIGATURE MEN NOW ﬓ -> մն
+        s = s.replace('\uFB14', '\u0574\u0565')  # U+FB14 ARMENIAN SMALL LIGATURE MEN ECH ﬔ -> մե
+        s = s.replace('\uFB15', '\u0574\u056B')  # U+FB15 ARMENIAN SMALL LIGATURE MEN INI ﬕ -> մի
+        s = s.replace('\uFB16', '\u057E\u0576')  # U+FB16 ARMENIAN SMALL LIGATURE VEW NOW ﬖ -> վն
+        s = s.replace('\uFB17', '\u0574\u056D')  # U+FB17 ARMENIAN SMALL LIGATURE MEN XEH ﬗ -> մխ
+        s = s.replace('\uFB49', '\u05E9\u05BC')  # U+FB49 HEBREW LETTER SHIN WITH DAGESH שּ -> שּ
+        s = s.replace('\uFB4F', '\u05D0\u05DC')  # U+FB4F HEBREW LIGATURE ALEF LAMED ﭏ -> אל
+        return s
+
+    @staticmethod
+    def normalize_signs_and_symbols(s: str) -> str:
+        s = s.replace('\u00B5', '\u03BC')        # U+00B5 MICRO SIGN µ -> μ (GREEK SMALL LETTER MU)
+        s = s.replace('\u03D0', '\u03B2')        # U+03D0 GREEK BETA SYMBOL ϐ -> β
+        s = s.replace('\u03D1', '\u03B8')        # U+03D1 GREEK THETA SYMBOL ϑ -> θ
+        s = s.replace('\u03D2', '\u03A5')        # U+03D2 GREEK UPSILON WITH HOOK SYMBOL ϒ -> Υ
+        s = s.replace('\u03D3', '\u038E')        # U+03D3 GREEK UPSILON WITH ACUTE AND HOOK SYMBOL ϓ -> Ύ
+        s = s.replace('\u03D4', '\u03AB')        # U+03D4 GREEK UPSILON WITH DIAERESIS AND HOOK SYMBOL ϔ -> Ϋ
+        s = s.replace('\u03D5', '\u03C6')        # U+03D5 GREEK PHI SYMBOL ϕ -> φ
+        s = s.replace('\u03D6', '\u03C0')        # U+03D6 GREEK PI SYMBOL ϖ -> π
+        s = s.replace('\u03F0', '\u03BA')        # U+03F0 GREEK KAPPA SYMBOL ϰ -> κ
+        s = s.replace('\u03F1', '\u03C1')        # U+03F1 GREEK RHO SYMBOL ϱ -> ρ
+        s = s.replace('\u03F2', '\u03C2')        # U+03F2 GREEK LUNATE SIGMA SYMBOL ϲ -> ς
+        s = s.replace('\u03F4', '\u0398')        # U+03F4 GREEK CAPITAL THETA SYMBOL ϴ -> Θ
+        s = s.replace('\u03F5', '\u03B5')        # U+03F5 GREEK LUNATE EPSILON SYMBOL ϵ -> ε
+        s = s.replace('\u03F9', '\u03A3')        # U+03F9 GREEK CAPITAL LUNATE SIGMA SYMBOL Ϲ -> Σ
+        s = s.replace('\u20A8', 'Rs')            # U+20A8 RUPEE SIGN ₨ -> Rs
+        s = s.replace('\u2103', '\u00B0C')       # U+2103 DEGREE CELIUS ℃ -> °C
+        s = s.replace('\u2107', '\u0190')        # U+2107 EULER CONSTANT ℇ -> Ɛ
+        s = s.replace('\u2109', '\u00B0F')       # U+2109 DEGREE FAHRENHEIT ℉ -> °F
+        s = s.replace('\u2116', 'No.')           # U+2116 NUMERO SIGN № -> No.
+        s = s.replace('\u2126', '\u03A9')        # U+2126 OHM SIGN Ω -> Ω (GREEK CAPITAL LETTER OMEGA)
+        s = s.replace('\u212A', '\u004B')        # U+212A KELVIN SIGN K -> K (LATIN CAPITAL LETTER K)
+        s = s.replace('\u212B', '\u00C5')        # U+212B ANGSTROM SIGN Å -> Å (LATIN CAP. LETTER A WITH RING ABOVE)
+        s = s.replace('\u2135', '\u05D0')        # U+2135 ALEF SYMBOL ℵ -> א
+        s = s.replace('\u2136', '\u05D1')        # U+2136 BET SYMBOL ℶ -> ב
+        s = s.replace('\u2137', '\u05D2')        # U+2137 GIMEL SYMBOL ℷ -> ג
+        s = s.replace('\u2138', '\u05D3')        # U+2138 DALET SYMBOL ℸ -> ד
+        s = s.replace('\u213B', 'FAX')           # U+213B FACSIMILE SIGN ℻ -> FAX
+        return s
+
+    def normalize_cjk(self, s: str) -> str:
+        # CJK Compatibility (e.g. ㋀ ㌀ ㍰ ㎢ ㏾ ㏿)
+        s = re.sub(r'[\u2F00-\u2FDF\u3038-\u303A\u3250\u32C0-\u33FF\uF900-\uFAFF]', self.apply_mapping_dict, s)
+        s = re.sub(r'[\U0001F190\U0001F200\U0002F800-\U0002FA1F]', self.apply_mapping_dict, s)
+        return s
+
+    def apply_combining_modifiers_compose(self, s: str) -> str:
+        """
+        Combines 2 Unicode characters (incl. combining modifier) into one Unicode character, e.g. ö (o +  ̈) -> ö
+        Must be applied after normalize_ligatures and normalize_signs_and_symbols.
+        """
+        # U+0300 - U+036F general combining modifier block
+        # U+0653 - U+0655 Arabic modifiers: madda above, hamza above, hamza below
+        # U+3099 COMBINING KATAKANA-HIRAGANA VOICED SOUND MARK  ゙(e.g. ka -> ga)
+        # U+309A COMBINING KATAKANA-HIRAGANA SEMI-VOICED SOUND MARK  ゚(e.g. ha -> pa)
+        if re.search(r'[\u0300-\u036F\u0653-\u0655\u3099\u309A]', s):
+            s = re.sub(r'.[\u0300-\u036F\u0653-\u0655\u3099\u309A]', self.apply_mapping_dict, s)
+        # U+093C Devanagari sign nukta, other South Asian
+        if re.search(r'[\u093C\u09BE-\u102E\u1B35\U00011000-\U000115FF]', s):
+            s = re.sub(r'.[\u093C\u09BE-\u102E\u1B35\U00011000-\U000115FF]', self.apply_mapping_dict, s)
+        # Armenian
+        # Hrayr Harutyunyan confirmed that և U+0587 is (1) considered a single letter in the Armenian alphabet,
+        # (2) is included on Armenian keyboards and that (3) the decomposition եւ (U+0565 U+0582) should always
+        # be re-composed back to և. (This is at variance with NFKC).
+        s = s.replace('\u0565\u0582', '\u0587')  # U+0587 ARMENIAN SMALL LIGATURE ECH YIWN եւ -> և
+        return s
+
+    def apply_combining_modifiers_decompose(self, s: str) -> str:
+        """Decompose character, splitting off combining/modifying character."""
+        # Indic, Tibetan, Hebrew, 'forking'
+        if re.search(r'[\u0344\u0958-\u095F\u09DC-\u0B5D\u0F43-\u0FB9\u2ADC\uFB1D-\uFB4E]', s):
+            s = re.sub(r'[\u0344\u0958-\u095F\u09DC-\u0B5D\u0F43-\u0FB9\u2ADC\uFB1D-\uFB4E]', self.apply_mapping_dict,
+                       s)
+        # Musical symbols
+        if re.search(r'[\U0001D100-\U0001D1FF]', s):
+            s = re.sub(r'[\U0001D100-\U0001D1FF]', self.apply_mapping_dict, s)
+        return s
+
+    @staticmethod
+    def hangul_jamo_triple_to_syllable(leading_jamo: str, vowel_jamo: str, trailing_jamo: str) -> str:
+        """
+        Convert triple of Hangul jamos to Hangul syllable
+        (1) one of U+1100-U+1112: the 19 modern Hangul leading consonant jamos           (19 alternatives)
+        (2) one of U+1161-U+1175: the 21 modern Hangul vowel jamos                       (21 alternatives)
+        (3) none, or one of U+11A8-U+11C2: the 27 modern Hangul trailing consonant jamos (28 alternatives)
+        """
+        assert len(leading_jamo) == 1 and ord(leading_jamo) in range(0x1100, 0x1113)
+        assert len(vowel_jamo) == 1 and ord(vowel_jamo) in range(0x1161, 0x1176)
+        assert (trailing_jamo == '') or (len(trailing_jamo) == 1 and ord(trailing_jamo) in range(0x11A8, 0x11C3))
+        leading_index = ord(leading_jamo) - 0x1100
+        vowel_index = ord(vowel_jamo) - 0x1161
+        trailing_index = 0 if trailing_jamo == '' else ord(trailing_jamo) - 0x11A7   # first trailing jamo maps to 1
+        # Notes for below:  (1) 588 = 21 * 28  (2) 0xAC00 is the start of standard Hangul syllable code block
+        result = chr((leading_index * 588) + (vowel_index * 28) + trailing_index + 0xAC00)
+        return result
+
+    def hangul_jamo_triple_match_to_syllable(self, m: Match[str]) -> str:
+        return self.hangul_jamo_triple_to_syllable(m.group(1), m.group(2), m.group(3))
+
+    def normalize_hangul(self, s: str) -> str:
+        """Convert all Hangul jamo triples/doubles in string to Hangul syllables."""
+        if re.search(r'[\u1161-\u1175]', s):  # string includes a Hangul vowel jamo
+            s = re.sub(r'([\u1100-\u1112])([\u1161-\u1175])([\u11A8-\u11C2]|)',  # trailing jamo can be ''
+                       self.hangul_jamo_triple_match_to_syllable, s)
+        return s
+
+    def swap_vowel_sign_nukta_match(self, m: Match[str]) -> str:
+        pair = m.group(0)
+        return pair[::-1] if pair in self.vowel_sign_nukta_pairs else pair
+
+    def repair_combining_modifiers_with_nukta(self, s: str) -> str:
+        """This function repairs the order of combining modifiers."""
+        # If an Indic vowel-sign (incl. virama) is followed by a nukta, reverse the order of the two diacritics.
+        # Devanagari, Bengali, Gurmukhi, Gujarati, Oriya, Kannada, Lepcha, Kaithi, Sharada, Khojki, Khudawadi,
+        # Grantha, Newa, Tirhuta, Siddham, Takri, Dogra, Dives Akuru, Masaram Gondi in a single scan
+        # (see vowel_signs_and_nukta_list). Any match includes a nukta, which sets the script bits of the line
+        # type vector, so no script-specific line type check is needed.
+        return self.vowel_sign_nukta_match.sub(self.swap_vowel_sign_nukta_match, s)
+
+    # noinspection SpellCheckingInspection
+    @staticmethod
+    def normalize_devanagari_diacritics(s: str) -> str:
+        """
+        NOTE: This function is no longer used in wildebeest.
+        It has been subsumed by functions repair_combining_modifiers_with_nukta and the more general
+        apply_combining_modifiers.
+        This function normalizes strings in the Devanagari script (used in Hindi etc.) by
+         - mapping letters to the canonical composed or decomposed form and
+         - putting diacritics in the canonical order (nukta before vowel sign).
+        """
+        if '\u093C' in s:  # Devanagari nukta
+            # If a vowel-sign (incl. virama) is followed by a nukta, reverse the order of the two diacritics.
+            # For 3 Devanagari letters, used to transcribe Dravidian letters, use the composed form,
+            # also if the nukta follows a vowel sign of the letter. Both in a single scan.
+            s = re.sub(r"([\u0928\u0930\u0933]?)([\u093E-\u094D]?)\u093C",
+                       Wildebeest.repair_devanagari_nukta_match, s)
+        if re.search(r"[\u0958-\u095F]", s):
+            # On the other hand, for 8 Devanagari letters, use the decomposed form.
+            s = s.translate(Wildebeest.devanagari_nukta_decomposition_table)
+        return s
+
+    # For normalize_devanagari_diacritics
+    devanagari_nukta_composition_dict = {  # letter (followed by nukta) -> composed letter
+        '\u0928': '\u0929',  # U+0929 DEVANAGARI LETTER NNNA ऩ -> ऩ
+        '\u0930': '\u0931',  # U+0931 DEVANAGARI LETTER RRA ऱ -> ऱ
+        '\u0933': '\u0934',  # U+0934 DEVANAGARI LETTER LLLA ऴ -> ऴ
+    }
+    devanagari_nukta_decomposition_table = str.maketrans({
+        '\u0958': '\u0915\u093C',  # U+0958 DEVANAGARI LETTER QA क़ -> क़
+        '\u0959': '\u0916\u093C',  # U+0959 DEVANAGARI LETTER KHHA ख़ -> ख़
+        '\u095A': '\u0917\u093C',  # U+095A DEVANAGARI LETTER GHHA ग़ -> ग़
+        '\u095B': '\u091C\u093C',  # U+095B DEVANAGARI LETTER ZA ज़ -> ज़
+        '\u095C': '\u0921\u093C',  # U+095C DEVANAGARI LETTER DDDHA ड़ -> ड़
+        '\u095D': '\u0922\u093C',  # U+095D DEVANAGARI LETTER RHA ढ़ -> ढ़
+        '\u095E': '\u092B\u093C',  # U+095E DEVANAGARI LETTER FA फ़ -> फ़
+        '\u095F': '\u092F\u093C',  # U+095F DEVANAGARI LETTER YYA य़ -> य़
+    })
+
+    @staticmethod
+    def repair_devanagari_nukta_match(m: Match[str]) -> str:
+        letter, vowel_sign = m.group(1), m.group(2)
+        if letter:
+            return Wildebeest.devanagari_nukta_composition_dict[letter] + vowel_sign
+        return '\u093C' + vowel_sign
+
+    @staticmethod
+    def normalize_arabic_punctuation(s: str) -> str:
+        s = s.replace('\u0640', '')         # U+0640 Arabic tatweel (always to be deleted)
+        s = s.replace('\u060C', ',')        # U+060C Arabic comma
+        s = s.replace('\u060D', '/')        # U+060C Arabic date separator
+        s = s.replace('\u061B', ';')        # U+061B Arabic semicolon
+        s = s.replace('\u061F', '?')        # U+061F Arabic question mark
+        s = s.replace('\u066A', '%')        # U+066A Arabic percent sign
+        s = s.replace('\u066B', '.')        # U+066B Arabic decimal separator
+        s = s.replace('\u066C', ',')        # U+066C Arabic thousands separator
+        s = s.replace('\u066D', '*')        # U+066D Arabic five pointed star
+        s = s.replace('\u06D4', '.')        # U+06D4 Arabic full stop
+        return s
+
+    @staticmethod
+    def normalize_greek_punctuation(s: str) -> str:
+        s = s.replace('\u0340', '\u0300')   # U+0340 combining grave tone mark -> combining grave accent
+        s = s.replace('\u0341', '\u0301')   # U+0341 combining acute tone mark -> combining acute accent
+        s = s.replace('\u0343', '\u0313')   # U+0342 combining Greek koronis -> combining comma above
+        s = s.replace('\u0374', '\u02B9')   # U+0374 Greek numeral sign -> modifier letter prime
+        s = s.replace('\u037E', ';')        # U+037E Greek question mark
+        s = s.replace('\u0387', '\u00B7')   # U+0387 Greek ano teleia -> middle dot
+        return s
+
+    @staticmethod
+    def normalize_cjk_punctuation(s: str) -> str:
+        s = s.replace('\u3001', ',')        # U+3001 ideographic comma
+        s = s.replace('\u3002', '.')        # U+3002 ideographic full stop
+        s = s.replace('\u3008', '<')        # U+3008 left angle bracket
+        s = s.replace('\u3009', '>')        # U+3009 right angle bracket
+        s = s.replace('\u300A', '\u201C')   # U+300A left double angle bracket -> left double quotation mark
+        s = s.replace('\u300B', '\u201D')   # U+300B right double angle bracket -> right double quotation mark
+        s = s.replace('\u300C', '\u201C')   # U+300C left corner bracket -> left double quotation mark
+        s = s.replace('\u300D', '\u201D')   # U+300D right corner bracket -> right double quotation mark
+        s = s.replace('\u300E', '\u201C')   # U+300E left white corner bracket -> left double quotation mark
+        s = s.replace('\u300F', '\u201D')   # U+300F right white corner bracket -> right double quotation mark
+        s = s.replace('\u3010', '[')        # U+3010 left black lenticular bracket
+        s = s.replace('\u3011', ']')        # U+3011 right black lenticular bracket
+        s = s.replace('\u3014', '[')        # U+3014 left tortoise shell bracket
+        s = s.replace('\u3015', ']')        # U+3015 right tortoise shell bracket
+        s = s.replace('\u3016', '[')        # U+3016 left white lenticular bracket
+        s = s.replace('\u3017', ']')        # U+3017 right white lenticular bracket
+        s = s.replace('\u3018', '[')        # U+3018 left white tortoise shell bracket
+        s = s.replace('\u3019', ']')        # U+3019 right white tortoise shell bracket
+        s = s.replace('\u301A', '[')        # U+301A left white square bracket
+        s = s.replace('\u301B', ']')        # U+301B right white square bracket
+        return s
+
+    @staticmethod
+    def normalize_misc_f_punctuation(s: str) -> str:
+        # Tibetan
+        s = s.replace('\u0F0C', '\u0F0B')   # U+0F0C Tibetan no-break morpheme delimiter
+        return s
+
+    def normalize_punctuation(self, s: str) -> str:
+        # Excludes cases in normalize_dashes.
+        # punctuation
+        s = s.replace('\u00AB', '\u201C')  # U+201E left double-angle quotation mark -> left double quotation mark
+        s = s.replace('\u00BB', '\u201D')  # U+201F right double-angle quotation mark -> right double quotation mark
+        s = s.replace('\u201A', '\u2018')  # U+201A single low-9 quotation mark -> left single quotation mark
+        s = s.replace('\u201B', '\u2018')  # U+201B single high-reversed-9 quotation mark -> left single quotation mark
+        s = s.replace('\u201E', '\u201C')  # U+201E double low-9 quotation mark -> left double quotation mark
+        s = s.replace('\u201F', '\u201C')  # U+201F double high-reversed-9 quotation mark -> left double quotation mark
+        s = s.replace('\u2039', '\u2018')  # U+2039 left single-angle quotation mark -> left single quotation mark
+        s = s.replace('\u203A', '\u2019')  # U+203A right single-angle quotation mark -> right single quotation mark
+        s = re.sub(r'[\u2011\u2024-\u2026\u2033-\u203C\u2047-\u2057]', self.apply_mapping_dict, s)  # e.g. …
+        s = re.sub(r'[\u2329-\u232A\u2A74-\u2A76]',  self.apply_mapping_dict, s)                    # e.g. 〈〉
+        # math symbols
+        s = s.replace('\u2212', '-')       # U+2212 minus sign
+        s = s.replace('\u2215', '/')       # U+2215 division slash
+        s = s.replace('\u2216', '\\')      # U+2216 set minus
+        s = s.replace('\u2217', '*')       # U+2217 asterisk operator
+        s = s.replace('\u2218', '\u25E6')  # U+2218 ring operator -> white bullet
+        s = s.replace('\u2219', '\u2022')  # U+2219 bullet operator -> bullet
+        s = s.replace('\u2223', '|')       # U+2223 divides
+        s = s.replace('\u2236', ':')       # U+2236 ratio
+        s = s.replace('\u2254', ':=')      # U+2254 colon equals
+        s = s.replace('\u2255', '=:')      # U+2255 equals colon
+        s = s.replace('\u22C5', '\u00B7')  # U+22C5 dot operator -> middle dot
+        s = re.sub(r'[\u222C-\u2230\u2A0C]', self.apply_mapping_dict, s)  # e.g. ∭
+        # integer plus period or comma ⒛ 🄆
+        s = re.sub(r'[\u2488-\u249B\U0001F100-\U0001F10A]', self.apply_mapping_dict, s)
+        return s
+
+    @staticmethod
+    def normalize_dash_punctuation(s: str) -> str:
+        # hyphen, non-breaking hyphen, figure dash, en dash, em dash, horizontal bar
+        s = re.sub(r'[\u2010-\u2015]', '-', s)
+        s = s.replace('\u2212', '-')  # U+2212 minus sign
+        s = s.replace('\u2500', '-')  # U+2500 box drawings light horizontal
+        s = s.replace('\u2501', '-')  # U+2501 box drawings heavy horizontal,
+        s = s.replace('\u2E3A', '-')  # U+2E3A two-em dash
+        s = s.replace('\u2E3B', '-')  # U+2E3B three-em dash
+        return s
+
+    @staticmethod
+    def normalize_non_zero_spaces(s: str) -> str:
+        """
+        Map NO-BREAK SPACE, EN QUAD, EM QUAD, EN SPACE, EM SPACE, THREE-PER-EM SPACE, FOUR-PER-EM SPACE,
+        SIX-PER-EM SPACE, FIGURE SPACE, PUNCTUATION SPACE, THIN SPACE, HAIR SPACE, NARROW NO-BREAK SPACE,
+        MEDIUM MATHEMATICAL SPACE, IDEOGRAPHIC SPACE
+        to regular SPACE.
+        **Not** included: tab (= horizontal tabulation/character tabulation)
+        """
+        s = s.replace('\u00A0', ' ')  # U+00A0 NO-BREAK SPACE
+        s = re.sub(r'[\u2000-\u200A]', ' ', s)
+        s = s.replace('\u202F', ' ')  # U+00A0 NARROW NO-BREAK SPACE
+        s = s.replace('\u205F', ' ')  # U+00A0 MEDIUM MATHEMATICAL SPACE
+        s = s.replace('\u3000', ' ')  # U+3000 IDEOGRAPHIC SPACE
+        return s
+
+    # noinspection SpellCheckingInspection
+    def normalize_half_and_full_width_characters(self, s: str) -> str:
+        """Replace fullwidth and halfwidth characters such as Ａ with regular Latin letters such as A."""
+        if re.search(r'[\uFF01-\uFFEE]', s):
+            s = re.sub(r'[\uFF01-\uFFEE]', self.apply_mapping_dict, s)
+        return s
+
+    def normalize_font_characters(self, s: str) -> str:
+        # Replace font-variation characters such as ℂℹ𝒜 to CiA.
+        s = re.sub(r'[\u2102-\u2149\uFB20-\uFB29\U0001D400-\U0001D7FF\U0001EE00-\U0001EEBB\U0001FBF0-\U0001FBF9]',
+                   self.apply_mapping_dict, s)
+        return s
+
+    def normalize_small_characters(self, s: str) -> str:
+        """Replace small version of characters with normal version, such as small ampersand ﹠ to regular &"""
+        s = re.sub(r'[\uFE50-\uFE6F]', self.apply_mapping_dict, s)
+        return s
+
+    def normalize_vertical_characters(self, s: str) -> str:
+        """
+        Replace vertical version of punctuation characters with normal horizontal version,
+        such as vertical em-dash ︱ to horizontal em-dash —
+        """
+        s = re.sub(r'[\u309F\u30FF\uFE10-\uFE19\uFE30-\uFE48]', self.apply_mapping_dict, s)
+        return s
+
+    def normalize_enclosure_characters(self, s: str) -> str:
+        """
+        Decompose enclosed (circled, squared, parenthesized) characters, e.g. 🄐 to (A).
+        """
+        s = re.sub(r'[\u2460-\u2488\u249C-\u2500\u3036\u3200-\u3250\u3251-\u32C0\u32D0-\u32FF]',
+                   self.apply_mapping_dict, s)
+        s = re.sub(r'[\U0001F110-\U0001F16A\U0001F201-\U0001F260]', self.apply_mapping_dict, s)
+        return s
+
+    def normalize_core_compat_characters(self, s: str) -> str:
+        # Replace Roman numeral characters to ASCII.
+        s = re.sub(r'[\u2160-\u217F]', self.apply_mapping_dict, s)
+        # Replace Hangul Compatibility characters with Unicode standard Hangul versions, e.g. ㄱ to ᄀ.
+        s = re.sub(r'[\u3131-\u318E]', self.apply_mapping_dict, s)
+        # Thai, Lao
+        s = re.sub(r'[\u0E33\u0EB3\u0EDC\u0EDD]', self.apply_mapping_dict, s)
+        return s
+
+    # noinspection SpellCheckingInspection
+    def map_digits_to_ascii(self, s: str, lv: Optional[int] = None) -> str:
+        """
+        This function replaces non-ASCII decimal digits by ASCII digits, e.g.
+            ۱۲۳ (Arabic) -> 123
+            ൯൦ (Mayalayam) -> 90
+        This function does not map any numbers from non-decimal systems such as
+            Roman numerals (MDCCLXXVI = 1776),
+            Chinese/Japanese (二百 = 200) or
+            Ethiopic languages (፱፻ = 900),
+        as the characters of those numbers do not match one-to-one onto ASCII digits.
+        lv: line type vector of the line of s (default: that of s)
+        """
+        if lv is None:
+            lv = self.char_type_table.or_reduce(s)
+        if lv & self.char_is_arabic:
+            s = re.sub(r'[\u0660-\u0669]', self.apply_mapping_dict, s)  # ARABIC-INDIC digits
+            s = re.sub(r'[\u06F0-\u06F9]', self.apply_mapping_dict, s)  # EXTENDED ARABIC-INDIC digits
+        if lv & self.char_is_thaana_plus:
+            s = re.sub(r'[\u07C0-\u07C9]', self.apply_mapping_dict, s)  # NKO digits
+        if lv & self.char_is_devanagari:
+            s = re.sub(r'[\u0966-\u096F]', self.apply_mapping_dict, s)  # DEVANAGARI digits
+        if lv & self.char_is_bengali_plus:
+            s = re.sub(r'[\u09E6-\u09EF]', self.apply_mapping_dict, s)  # BENGALI digits
+            s = re.sub(r'[\u0A66-\u0A6F]', self.apply_mapping_dict, s)  # GURMUKHI digits
+            s = re.sub(r'[\u0AE6-\u0AEF]', self.apply_mapping_dict, s)  # GUJARATI digits
+            s = re.sub(r'[\u0B66-\u0B6F]', self.apply_mapping_dict, s)  # ORIYA digits
+            s = re.sub(r'[\u0BE6-\u0BEF]', self.apply_mapping_dict, s)  # TAMIL digits
+            s = re.sub(r'[\u0C66-\u0C6F]', self.apply_mapping_dict, s)  # TELUGU digits
+            s = re.sub(r'[\u0CE6-\u0CEF]', self.apply_mapping_dict, s)  # KANNADA digits
+            s = re.sub(r'[\u0D66-\u0D6F]', self.apply_mapping_dict, s)  # MALAYALAM digits
+            s = re.sub(r'[\u0DE6-\u0DEF]', self.apply_mapping_dict, s)  # SINHALA LITH digits
+        if lv & self.char_is_thai_plus:
+            s = re.sub(r'[\u0E50-\u0E59]', self.apply_mapping_dict, s)  # THAI digits
+            s = re.sub(r'[\u0ED0-\u0ED9]', self.apply_mapping_dict, s)  # LAO digits
+            s = re.sub(r'[\u0F20-\u0F29]', self.apply_mapping_dict, s)  # TIBETAN digits
+            s = re.sub(r'[\u1040-\u1049]', self.apply_mapping_dict, s)  # MYANMAR digits
+            s = re.sub(r'[\u1090-\u1099]', self.apply_mapping_dict, s)  # MYANMAR SHAN digits
+        if lv & self.char_is_khmer_plus:
+            s = re.sub(r'[\u17E0-\u17E9]', self.apply_mapping_dict, s)  # KHMER digits
+            s = re.sub(r'[\u1810-\u1819]', self.apply_mapping_dict, s)  # MONGOLIAN digits
+            s = re.sub(r'[\u1946-\u194F]', self.apply_mapping_dict, s)  # LIMBU digits
+            s = re.sub(r'[\u19D0-\u19DA]', self.apply_mapping_dict, s)  # NEW TAI LUE digits
+            s = re.sub(r'[\u1A80-\u1A89]', self.apply_mapping_dict, s)  # TAI THAM HORA digits
+            s = re.sub(r'[\u1A90-\u1A99]', self.apply_mapping_dict, s)  # TAI THAM THAM digits
+            s = re.sub(r'[\u1B50-\u1B59]', self.apply_mapping_dict, s)  # BALINESE digits
+            s = re.sub(r'[\u1BB0-\u1BB9]', self.apply_mapping_dict, s)  # SUNDANESE digits
+            s = re.sub(r'[\u1C40-\u1C49]', self.apply_mapping_dict, s)  # LEPCHA digits
+            s = re.sub(r'[\u1C50-\u1C59]', self.apply_mapping_dict, s)  # OL CHIKI digits
+        if lv & self.char_is_lisu_plus:
+            s = re.sub(r'[\uA620-\uA629]', self.apply_mapping_dict, s)  # VAI digits
+            s = re.sub(r'[\uA8D0-\uA8D9]', self.apply_mapping_dict, s)  # SAURASHTRA digits
+            s = re.sub(r'[\uA900-\uA909]', self.apply_mapping_dict, s)  # KAYAH LI digits
+            s = re.sub(r'[\uA9D0-\uA9D9]', self.apply_mapping_dict, s)  # JAVANESE digits
+            s = re.sub(r'[\uA9F0-\uA9F9]', self.apply_mapping_dict, s)  # MYANMAR TAI LAING digits
+            s = re.sub(r'[\uAA50-\uAA59]', self.apply_mapping_dict, s)  # CHAM digits
+            s = re.sub(r'[\uABF0-\uABF9]', self.apply_mapping_dict, s)  # MEETEI MAYEK digits
+        if lv & self.char_is_100_plus_block_of_interest:
+            s = re.sub(r'[\U000104A0-\U000104A9]', self.apply_mapping_dict, s)  # OSMANYA digits
+            s = re.sub(r'[\U00010D30-\U00010D39]', self.apply_mapping_dict, s)  # HANIFI ROHINGYA digits
+            s = re.sub(r'[\U00011066-\U0001106F]', self.apply_mapping_dict, s)  # BRAHMI digits
+            s = re.sub(r'[\U000110F0-\U000110F9]', self.apply_mapping_dict, s)  # SORA SOMPENG digits
+            s = re.sub(r'[\U00011136-\U0001113F]', self.apply_mapping_dict, s)  # CHAKMA digits
+            s = re.sub(r'[\U000111D0-\U000111D9]', self.apply_mapping_dict, s)  # SHARADA digits
+            s = re.sub(r'[\U000112F0-\U000112F9]', self.apply_mapping_dict, s)  # KHUDAWADI digits
+            s = re.sub(r'[\U00011450-\U00011459]', self.apply_mapping_dict, s)  # NEWA digits
+            s = re.sub(r'[\U000114D0-\U000114D9]', self.apply_mapping_dict, s)  # TIRHUTA digits
+            s = re.sub(r'[\U00011650-\U00011659]', self.apply_mapping_dict, s)  # MODI digits
+            s = re.sub(r'[\U000116C0-\U000116C9]', self.apply_mapping_dict, s)  # TAKRI digits
+            s = re.sub(r'[\U00011730-\U00011739]', self.apply_mapping_dict, s)  # AHOM digits
+            s = re.sub(r'[\U000118E0-\U000118E9]', self.apply_mapping_dict, s)  # WARANG CITI digits
+            s = re.sub(r'[\U00011C50-\U00011C59]', self.apply_mapping_dict, s)  # BHAIKSUKI digits
+            s = re.sub(r'[\U00011D50-\U00011D59]', self.apply_mapping_dict, s)  # MASARAM GONDI digits
+            s = re.sub(r'[\U00011DA0-\U00011DA9]', self.apply_mapping_dict, s)  # GUNJALA GONDI digits
+            s = re.sub(r'[\U00016A60-\U00016A69]', self.apply_mapping_dict, s)  # MRO digits
+            s = re.sub(r'[\U00016B50-\U00016B59]', self.apply_mapping_dict, s)  # PAHAWH HMONG digits
+            s = re.sub(r'[\U0001E950-\U0001E959]', self.apply_mapping_dict, s)  # ADLAM digits
+        return s
+
+    # noinspection SpellCheckingInspection
+    @staticmethod
+    def repair_xml(s: str) -> str:
+        # Repair multi-level xml-escapes such as &amp;amp;quot; to &quot;
+        s = re.sub(r'(?<=&)(?:amp;)+(?=(?:amp|apos|gt|lt|nbsp|quot|#\d{1,6}|#x[0-9A-F]{1,5});)',
+                   '', s, flags=re.IGNORECASE)
+        return s
+
+    # noinspection SpellCheckingInspection
+    @staticmethod
+    def repair_url_escapes(s: str) -> str:
+        # Repair double url-escapes such as https://en.wikipedia.org/wiki/Jo%25C3%25ABlle_Aubron
+        s = re.sub(r"(%)25([CD][0-9A-F]%)25([89AB][0-9A-F])", r"\1\2\3", s)
+        s = re.sub(r'(%)25(E[0-9A-F]%)25([89AB][0-9A-F]%)25([89AB][0-9A-F])', r"\1\2\3\4", s)
+        return s
+
+    def repair_arabic_tokenization(self, s: str) -> str:
+        """Detach certain punctuation -_+*|% and ASCII digits from Arabic characters."""
+        # s = re.sub(r"([-_+*|%0-9]+)([\u0600-\u06FF])", r"\1 \2", s)
+        # s = re.sub(r"([\u0600-\u06FF])([-_+*|%0-9]+)", r"\1 \2", s)
+        s = self.repair_tok_punct_arabic_match.sub(r"\1 \2", s)
+        s = self.repair_tok_arabic_punct_match.sub(r"\1 \2", s)
+        return s
+
+    def char_script(self, char: str) -> Optional[str]:
+        char_type_vector = self.char_type_table.get(char)
+        if char_type_vector & self.char_is_latin:
+            return 'Latin'
+        elif char_type_vector & self.char_is_greek:
+            return 'Greek'
+        elif char_type_vector & self.char_is_cyrillic:
+            return 'Cyrillic'
+        else:
+            return None
+
+    def tokenize_mixed_script_tokens(self, orig_token: str) -> str:
+        token = []
+        script = None
+        script_start = 0
+        position = -1
+        orig_token_len = len(orig_token)
+        last_char_is_punctuation = False
+        for char in orig_token:
+            position += 1
+            if char in './_-':
+                last_char_is_punctuation = True
+            else:
+                new_script = self.char_script(char)
+                if new_script != script:
+                    if (position - script_start >= 3
+                            and orig_token_len - position >= 3
+                            and not last_char_is_punctuation
+                            and script in self.look_alike_scripts
+                            and new_script in self.look_alike_scripts)\
+                            and new_script == self.char_script(orig_token[position+1]):
+                        token.append(' ')
+                    script = new_script
+                    script_start = position
+                last_char_is_punctuation = False
+            token.append(char)
+        return ''.join(token)
+
+    @staticmethod
+    def is_mixed_script_url(s: str) -> bool:
+        return bool(re.match(r'(?:https?://)?[a-zA-Z][-_./0-9a-zA-Z]*\.(?:bg|by|me|mk|kg|kz|rs|ru|tj|tm|ua|uz|'
+                             r'com|info)/[-_./#0-9\u0400-\u04FF]+$', s, flags=re.IGNORECASE)
+                    or re.match(r'(?:https?://)?[\u0400-\u04FF][-_./0-9\u0400-\u04FF]*'
+                                r'\.(bg|by|me|mk|kg|kz|rs|ru|tj|tm|ua|uz|com|info)$', s))
+
+    def look_alike_translation_table(self, source_script: str, target_script: str) -> dict:
+        """
+        Translation table (for str.translate) of the look-alike mappings from source_script to target_script,
+        e.g. for 'Cyrillic' and 'Latin': {ord('а'): 'a', ...}. Tables are built from look_alike_dict on first use.
+        """
+        if self.look_alike_translation_table_dict is None:
+            table_dict = {(script1, script2): {} for script1 in self.look_alike_scripts
+                          for script2 in self.look_alike_scripts if script1 != script2}
+            with self.look_alike_stats_lock:  # look-alike counts are added to look_alike_dict under this lock
+                for key, value in self.look_alike_dict.items():
+                    elems = key.split(' ')
+                    if len(elems) == 3 and (elems[0], elems[1]) in table_dict and len(elems[2]) == 1:
+                        table_dict[(elems[0], elems[1])][ord(elems[2])] = value
+            self.look_alike_translation_table_dict = table_dict
+        return self.look_alike_translation_table_dict.get((source_script, target_script), {})
+
+    def map_look_alikes_to_script(self, s: str, source_script: str, target_script: str) -> str:
+        return s.translate(self.look_alike_translation_table(source_script, target_script))
+
+    def look_alike_token_decision(self, orig_token: str) -> Tuple[str, Optional[str], Optional[str]]:
+        """
+        Decides how correct_look_alikes handles a token. Returns a tuple (token, count_key, mixed_unchanged_type):
+          token: the corrected token
+          count_key: look_alike_dict counter to be incremented, e.g. 'n-to-Latin' (or None)
+          mixed_unchanged_type: 'url' or 'unchanged' for a mixed-script token that remains unchanged (or None)
+        """
+        script_bits = self.char_type_table.or_reduce(orig_token) & self.look_alike_script_bits
+        if not (script_bits & (script_bits - 1)):
+            # Tokens with characters of at most one of the look-alike scripts remain unchanged.
+            return orig_token, None, None
+        stat_dict = {}
+        for char in orig_token:
+            script = self.char_script(char)
+            if script:
+                stat_dict[script] = stat_dict.get(script, 0) + 1
+                for target_script in self.look_alike_scripts:
+                    if script != target_script:
+                        if ord(char) in self.look_alike_translation_table(script, target_script):
+                            key = f'{script} {target_script}'
+                            stat_dict[key] = stat_dict.get(key, 0) + 1
+        target_script = None
+        mixed_token = False
+        n_scripts = 0
+        for script in ['Latin', 'Greek', "Cyrillic"]:
+            if stat_dict.get(script, 0) >= 1:
+                n_scripts += 1
+        if n_scripts >= 2:
+            mixed_token = True
+            if (stat_dict.get('Cyrillic Latin', 0) == stat_dict.get('Cyrillic', 0)
+                    and stat_dict.get('Latin Cyrillic', 0) < stat_dict.get('Latin', 0)):
+                target_script = 'Latin'
+            elif (stat_dict.get('Latin Cyrillic', 0) == stat_dict.get('Latin', 0)
+                  and stat_dict.get('Cyrillic Latin', 0) < stat_dict.get('Cyrillic', 0)):
+                target_script = 'Cyrillic'
+            elif (stat_dict.get('Cyrillic', 0) == 1 and stat_dict.get('Cyrillic Latin', 0) == 1
+                  and stat_dict.get('Latin', 0) >= 3):
+                target_script = 'Latin'
+            elif (stat_dict.get('Latin', 0) == 1 and stat_dict.get('Latin Cyrillic', 0) == 1
+                  and stat_dict.get('Cyrillic', 0) >= 3):
+                target_script = 'Cyrillic'
+            else:
+                lat_token = self.map_look_alikes_to_script(orig_token, 'Cyrillic', 'Latin')
+                if (lat_token in ['SpA', 'USA']
+                    or (len(orig_token) >= 2
+                        and re.match(r'(?:X|XX|XXX|XL|L|LX|LXX|LXXX|XC|)(?:I|II|III|IV|V|VI|VII|VIII|IX|)$',
+                                     lat_token))):
+                    target_script = 'Latin'
+                cyr_token = self.map_look_alikes_to_script(orig_token, 'Latin', 'Cyrillic')
+                if cyr_token in ['әр', 'Әр', 'әрі', 'сі', 'Сі', 'іс', 'Іс', 'ісі', 'ірі']:
+                    target_script = 'Cyrillic'
+        count_key = None
+        if target_script:
+            token = ''.join([self.look_alike_translation_table(self.char_script(char), target_script).get(ord(char),
+                                                                                                          char)
+                             for char in orig_token])
+            count_key = 'n-to-' + target_script
+        else:
+            retok_orig_token = self.tokenize_mixed_script_tokens(orig_token)
+            if retok_orig_token != orig_token:
+                token = retok_orig_token
+                count_key = 'n-split'
+            else:
+                token = orig_token
+                if mixed_token:
+                    count_key = 'n-unchanged'
+        mixed_unchanged_type = None
+        if mixed_token and token == orig_token:
+            mixed_unchanged_type = 'url' if self.is_mixed_script_url(orig_token) else 'unchanged'
+        return token, count_key, mixed_unchanged_type
+
+    def correct_look_alikes(self, s: str, look_alike_stats: Optional[dict] = None) -> str:
+        """
+        look_alike_stats: stats (see new_look_alike_stats) to which the corrections are added
+        (default: this Wildebeest's own look-alike stats, to which the corrections of a call are added under a lock,
+        so that concurrent threads can use the default as well)
+        """
+        if not self.look_alike_loaded:
+            with self.look_alike_lock:
+                if not self.look_alike_loaded:
+                    self.load_look_alike_file(verbose=False)
+        if look_alike_stats is None:
+            call_look_alike_stats = self.new_look_alike_stats()
+            s = self.correct_look_alikes(s, call_look_alike_stats)
+            if call_look_alike_stats['counts']:
+                self.merge_look_alike_stats(call_look_alike_stats)
+            return s
+        counts, unchanged_dict = look_alike_stats['counts'], look_alike_stats['unchanged']
+        split_dict, url_dict = look_alike_stats['split'], look_alike_stats['url']
+        if '\n' in s:
+            # Keep legacy behavior for strings with newlines: strings with a newline after the start of the
+            # first token (other than a final newline) remain unchanged; otherwise a final newline is dropped.
+            first_token_position = len(s) - len(s.lstrip())
+            if first_token_position == len(s) or s.rfind('\n', 0, len(s) - 1) >= first_token_position:
+                return s
+            if s.endswith('\n'):
+                s = s[:-1]
+        elems = self.look_alike_token_re.split(s)  # whitespace, token, whitespace, token, ..., whitespace
+        token_cache = self.look_alike_token_cache
+        for i in range(1, len(elems), 2):
+            orig_token = elems[i]
+            decision = token_cache.get(orig_token)
+            if decision is None:
+                decision = self.look_alike_token_decision(orig_token)
+                if len(token_cache) >= self.look_alike_token_cache_size:
+                    token_cache.clear()
+                token_cache[orig_token] = decision
+            token, count_key, mixed_unchanged_type = decision
+            if count_key is None:
+                continue
+            counts[count_key] = counts.get(count_key, 0) + 1
+            if count_key == 'n-split':
+                if split_dict.get(orig_token, None) is None:
+                    log.debug(f'   correct-look-alike split {orig_token} -> {token}')
+                    split_dict[orig_token] = token
+            if mixed_unchanged_type == 'url':
+                if url_dict.get(orig_token, None) is None:
+                    log.debug(f'mixed-script-URL: {orig_token}')
+                    url_dict[orig_token] = True
+            elif mixed_unchanged_type == 'unchanged':
+                unchanged_dict[token] = unchanged_dict.get(token, 0) + 1
+            elems[i] = token
+        return ''.join(elems)
+
+    @staticmethod
+    def increment_dict_count(ht: dict, key: str, increment=1) -> int:
+        """For example ht['NUMBER-OF-LINES']"""
+        ht[key] = ht.get(key, 0) + increment
+        return ht[key]
+
+    @staticmethod
+    def record_ncs_group_change(ht: dict, group_name: str, loc_id: str) -> None:
+        """Count a line changed by a normalization/cleaning group and keep the location of the first 20 changes."""
+        count_key = f'COUNT-{group_name}'
+        count = Wildebeest.increment_dict_count(ht, count_key)
+        if loc_id and (count <= 20):
+            loc_key = f'{count_key}-{count}'
+            ht[loc_key] = loc_id
+
+    def ncs_group(self, s: str, ht: dict, group_name: str, group_function: Callable[[str], str],
+                  loc_id: str) -> str:
+        """
+        ncs_group: normalize and clean string group.
+        For a given normalization/cleaning group, call appropriate function and update stats.
+        """
+        if f'SKIP-{group_name}' not in ht:
+            self.increment_dict_count(ht, f'CALL-{group_name}')  # keep track of how often norm-group is called
+            orig_s = s
+            s = group_function(s)
+            if s != orig_s:
+                self.record_ncs_group_change(ht, group_name, loc_id)
+        return s
+
+    def ncs_steps(self, lang_code: str = '') -> list:
+        """
+        Returns the ordered list of normalization/cleaning steps for a language code.
+        Each step is a tuple (group_name, group_function, gate, char_map, lv_mask):
+          gate: tuple of bit vectors; the step applies to a line only if its line type vector (lv)
+                shares at least one bit with each of them.
+          char_map: True if group_function maps each character independently of its context,
+                    i.e. group_function(s1 + s2) == group_function(s1) + group_function(s2).
+          lv_mask: line type vector bits that group_function itself consults (besides the gate);
+                   if not 0, group_function takes the line type vector as keyword argument lv.
+        The group_function of 'look-alike' takes per-call look-alike stats as keyword argument look_alike_stats.
+        """
+        steps = self.ncs_step_dict.get(lang_code)
+        if steps is not None:
+            return steps
+        if lang_code == 'fas':
+            arabic_char_step = ('farsi-char', self.normalize_farsi_characters,
+                                (self.char_is_arabic,
+                                 self.char_is_mappable_in_farsi | self.char_is_arabic_presentation_form), True, 0)
+        elif lang_code == 'pas':
+            arabic_char_step = ('pashto-char', self.normalize_pashto_characters,
+                                (self.char_is_arabic,
+                                 self.char_is_mappable_in_pashto | self.char_is_arabic_presentation_form), True, 0)
+        else:
+            arabic_char_step = ('arabic-char', self.normalize_arabic_characters,
+                                (self.char_is_arabic,
+                                 self.char_is_mappable_in_arabic | self.char_is_arabic_presentation_form), True, 0)
+        # Script blocks that map_digits_to_ascii checks before mapping the digits of a script.
+        digit_lv_mask = (self.char_is_arabic | self.char_is_thaana_plus | self.char_is_devanagari
+                         | self.char_is_bengali_plus | self.char_is_thai_plus | self.char_is_khmer_plus
+                         | self.char_is_lisu_plus | self.char_is_100_plus_block_of_interest)
+        latin, greek, cyrillic = self.char_is_latin, self.char_is_greek, self.char_is_cyrillic
+        steps = [
+            ('repair-encodings-errors', self.repair_encoding_errors, (self.char_is_encoding_repair_anchor,), False, 0),
+            # Cleaning step 'del-surrogate' is an alternative/backup to windows-1252.
+            # It should not be skipped because surrogates are not printable.
+            ('del-surrogate', self.delete_surrogates, (self.char_is_surrogate,), True, 0),
+            ('del-ctrl-char', self.delete_control_characters, (self.char_is_deletable_control_character,), True, 0),
+            ('del-arabic-diacr', self.delete_arabic_diacritics, (self.char_is_deletable_arabic_diacritic,), True, 0),
+            ('del-hebrew-diacr', self.delete_hebrew_diacritics, (self.char_is_deletable_hebrew_diacritic,), True, 0),
+            ('core-compat', self.normalize_core_compat_characters, (self.char_is_core_compatibility,), True, 0),
+            ('pres-form', self.normalize_arabic_pres_form_characters, (self.char_is_arabic_presentation_form,),
+             True, 0),
+            ('ligatures', self.normalize_ligatures, (self.char_is_decomposable_ligature,), True, 0),
+            ('signs-and-symbols', self.normalize_signs_and_symbols, (self.char_is_decomposable_sign_symbol,), True, 0),
+            ('cjk', self.normalize_cjk, (self.char_is_decomposable_cjk,), True, 0),
+            ('width', self.normalize_half_and_full_width_characters, (self.char_is_fullwidth_or_halfwidth,), True, 0),
+            ('font', self.normalize_font_characters, (self.char_is_font_small_vertical,), True, 0),
+            ('small', self.normalize_small_characters, (self.char_is_font_small_vertical,), True, 0),
+            ('vertical', self.normalize_vertical_characters, (self.char_is_font_small_vertical,), True, 0),
+            ('enclosure', self.normalize_enclosure_characters, (self.char_is_decomposable_enclosure,), True, 0),
+            ('hangul', self.normalize_hangul, (self.char_is_mappable_hangul,), False, 0),
+            ('repair-combining', self.repair_combining_modifiers_with_nukta, (self.char_is_nukta,), False, 0),
+            ('combining-compose', self.apply_combining_modifiers_compose,
+             (self.char_is_composable_anchor_with_combining, self.char_is_composable_combining_diacritic), False, 0),
+            ('combining-decompose', self.apply_combining_modifiers_decompose,
+             (self.char_is_decomposable_with_combining,), True, 0),
+            ('punct', self.normalize_punctuation, (self.char_is_core_compatibility,), True, 0),
+            ('punct-arabic', self.normalize_arabic_punctuation, (self.char_is_decomposable_arabic_punctuation,),
+             True, 0),
+            ('punct-cjk', self.normalize_cjk_punctuation, (self.char_is_decomposable_cjk_punctuation,), True, 0),
+            ('punct-greek', self.normalize_greek_punctuation, (self.char_is_decomposable_greek_punctuation,),
+             True, 0),
+            ('punct-misc-f', self.normalize_misc_f_punctuation, (self.char_is_decomposable_misc_f_punctuation,),
+             True, 0),
+            ('punct-dash', self.normalize_dash_punctuation, (self.char_is_decomposable_dash,), True, 0),
+            ('space', self.normalize_non_zero_spaces, (self.char_is_decomposable_non_zero_space,), True, 0),
+            ('digit', self.map_digits_to_ascii, (self.char_is_mappable_decimal_digit,), True, digit_lv_mask),
+            arabic_char_step,
+            ('georgian-char', self.normalize_georgian_characters, (self.char_is_georgian,), True, 0),
+            # at least 2 of the 3 scripts Latin, Greek, Cyrillic
+            ('look-alike', self.correct_look_alikes, (latin | greek, latin | cyrillic, greek | cyrillic), False, 0),
+            ('repair-xml', self.repair_xml, (self.char_is_ampersand, self.char_is_semicolon), False, 0),
+            ('repair-url-espaces', self.repair_url_escapes, (self.char_is_percent_sign,), False, 0),
+            ('repair-token', self.repair_arabic_tokenization,
+             (self.char_is_arabic, self.char_is_detachable_from_token | self.char_is_mappable_decimal_digit),
+             False, 0),
+        ]
+        if self.skip_steps:
+            steps = [step for step in steps if step[0] not in self.skip_steps]
+        self.ncs_step_dict[lang_code] = steps
+        return steps
+
+    def ncs_plan(self, lang_code: str = '', skip_steps: Iterable[str] = ()) -> NormCleanPlan:
+        """Returns the (memoized) plan of normalization/cleaning steps for a language code and skipped steps."""
+        key = (lang_code, frozenset(skip_steps))
+        plan = self.ncs_plan_dict.get(key)
+        if plan is None:
+            plan = NormCleanPlan([step for step in self.ncs_steps(lang_code) if step[0] not in key[1]],
+                                 compiled=self.compiled)
+            self.ncs_plan_dict[key] = plan
+        return plan
+
+    def ht_ncs_plan(self, ht: dict, lang_code: str) -> NormCleanPlan:
+        """Returns the plan for lang_code and the steps skipped by SKIP- entries in ht."""
+        # Keyed on the SKIP- entries present in ht (through ncs_plan), as they can change between calls on the same ht.
+        skip_keys_and_plan = self.ncs_skip_key_set_dict.get(lang_code)
+        if skip_keys_and_plan is None:
+            skip_keys_and_plan = (frozenset([f'SKIP-{step[0]}' for step in self.ncs_steps(lang_code)]),
+                                  self.ncs_plan(lang_code))
+            self.ncs_skip_key_set_dict[lang_code] = skip_keys_and_plan
+        skip_key_set, full_plan = skip_keys_and_plan
+        if ht.keys().isdisjoint(skip_key_set):
+            return full_plan
+        return self.ncs_plan(lang_code, [skip_key[5:] for skip_key in ht.keys() & skip_key_set])
+
+    def input_encoding_for_sniff(self, sniff: dict) -> Tuple[InputEncoding, str]:
+        """
+        Picks a fast path for an input file according to its sniff_encoding result.
+        Returns the input encoding to be passed to the file-level methods for that file, and a description.
+        Windows-1252 files are decoded as such (rather than as UTF-8 with surrogates for most non-ASCII bytes).
+        In double-encoded files, the double encoding of lines is undone (see undo_double_encoding).
+        For clean UTF-8 files, lines that do not need any normalization/cleaning are passed through without
+        prescan (see norm_clean_plan_sparse_batch), with the same results as without sniffing.
+        """
+        encoding = sniff['encoding']
+        if encoding == 'windows-1252':
+            return InputEncoding('cp1252', 'ignore'), 'Windows-1252: input is decoded as Windows-1252'
+        if encoding == 'utf-8':
+            return (InputEncoding(errors=self.decode_errors, sparse_batches=True),
+                    'clean UTF-8: chunks of lines to which no step applies are passed through')
+        if encoding == 'double-encoded':
+            return (InputEncoding(errors=self.decode_errors, undo_double_encoding=True),
+                    'double-encoded UTF-8: double encoding of lines is undone')
+        return self.default_input_encoding, 'mixed encodings: regular pipeline'
+
+    def char_map_run_table(self, steps: tuple, lv: int) -> CharMapTable:
+        """Translation table for a run of consecutive character-mapping steps applicable to lines of type vector lv."""
+        # Some step functions also consult the line type vector (see lv_mask in ncs_steps).
+        key = tuple([(step[0], lv & step[4]) for step in steps])
+        table = self.char_map_run_table_dict.get(key)
+        if table is None:
+            table = CharMapTable([functools.partial(step[1], lv=lv) if step[4] else step[1] for step in steps])
+            self.char_map_run_table_dict[key] = table
+        return table
+
+    def apply_ncs_stage(self, s: str, stage: tuple, lv: int,
+                        look_alike_stats: Optional[dict] = None) -> Tuple[str, int]:
+        """
+        Applies a stage (see NormCleanPlan.stages) to a string of line type vector lv.
+        Returns the resulting string and a change mask, in which bit i is set if step i of the stage changed the string.
+        A run of character-mapping steps is applied with a single str.translate. Since these steps map characters
+        independently, a step changes the string if it changes any of its characters.
+        look_alike_stats: per-call stats for the look-alike step (see correct_look_alikes)
+        """
+        if len(stage) == 1 and not (stage[0][3] and self.compiled):
+            step = stage[0]
+            if step[4]:
+                result = step[1](s, lv=lv)
+            elif look_alike_stats is not None and step[0] == 'look-alike':
+                result = step[1](s, look_alike_stats=look_alike_stats)
+            else:
+                result = step[1](s)
+            return result, int(result != s)
+        table = self.char_map_run_table(stage, lv)
+        result = s.translate(table)
+        change_mask = 0
+        if (result != s) or table.has_round_trip:
+            change_mask_dict = table.change_mask_dict
+            for char in set(s):
+                change_mask |= change_mask_dict.get(char, 0)
+        return result, change_mask
+
+    def line_cache_get(self, s: str, plan: NormCleanPlan) -> Tuple[tuple, Optional[tuple]]:
+        """
+        Looks up a line in the line cache. Returns the cache key and the cache entry (None for a cache miss).
+        A cache entry is a tuple (result, lv, call_slots, changed_slots), see norm_clean_plan_entry.
+        """
+        cache_key = (s, plan)
+        with self.line_cache_lock:
+            cache_entry = self.line_cache.get(cache_key)
+            if cache_entry is None:
+                self.line_cache_misses += 1
+            else:
+                self.line_cache.move_to_end(cache_key)
+                self.line_cache_hits += 1
+        return cache_key, cache_entry
+
+    def line_cache_put(self, cache_key: tuple, cache_entry: tuple) -> None:
+        """Adds an entry to the line cache, evicting the least recently used entry if the cache is full."""
+        # Lines to which the look-alike step was applied are not cached, as that step also collects per-token stats.
+        if cache_key[1].look_alike_slot in cache_entry[2]:
+            return
+        with self.line_cache_lock:
+            self.line_cache[cache_key] = cache_entry
+            if len(self.line_cache) > self.line_cache_size:
+                self.line_cache.popitem(last=False)
+
+    def enable_profile(self) -> None:
+        """Starts collecting the wall time of normalization steps, prescan and I/O in profile_dict."""
+        self.profile_dict = {}
+
+    @staticmethod
+    def add_profile_time(profile_dict: dict, key: str, start_time: float) -> None:
+        profile_dict[key] = profile_dict.get(key, 0.0) + time.perf_counter() - start_time
+
+    @staticmethod
+    def add_profile_stage_time(profile_dict: dict, stage: list, start_time: float) -> None:
+        """The time of a run of character-mapping steps (applied with one str.translate) is split among its steps."""
+        step_time = (time.perf_counter() - start_time) / len(stage)
+        for step in stage:
+            key = f'TIME-{step[0]}'
+            profile_dict[key] = profile_dict.get(key, 0.0) + step_time
+
+    @staticmethod
+    def merge_profile(profile_dict: dict, chunk_profile_dict: dict) -> None:
+        for key, value in chunk_profile_dict.items():
+            profile_dict[key] = profile_dict.get(key, 0.0) + value
+
+    def profile_report(self, ht: dict, elapsed_time: Optional[float] = None) -> dict:
+        """Returns the profile (see enable_profile) together with the change stats in ht, in a JSON-friendly dict."""
+        profile_dict = self.profile_dict or {}
+        steps = []
+        for key, step_time in profile_dict.items():
+            if key.startswith('TIME-') and key not in ('TIME-PRESCAN', 'TIME-NORMALIZATION', 'TIME-IO'):
+                group_name = key[5:]
+                n_calls = ht.get(f'CALL-{group_name}', 0)
+                n_changed_lines = ht.get(f'COUNT-{group_name}', 0)
+                steps.append({'step': group_name,
+                              'calls': n_calls,
+                              'changed-lines': n_changed_lines,
+                              'time': round(step_time, 6),
+                              'time-per-call': round(step_time / n_calls, 9) if n_calls else None,
+                              'time-per-changed-line': round(step_time / n_changed_lines, 9)
+                              if n_changed_lines else None})
+        steps.sort(key=lambda step: step['time'], reverse=True)
+        report = {'wildebeest-version': __version__,
+                  'number-of-lines': ht.get('NUMBER-OF-LINES', 0),
+                  'changed-lines': ht.get('COUNT-ALL', 0),
+                  'time-prescan': round(profile_dict.get('TIME-PRESCAN', 0.0), 6),
+                  'time-steps': round(sum(step['time'] for step in steps), 6),
+                  'time-normalization': round(profile_dict.get('TIME-NORMALIZATION', 0.0), 6),
+                  'time-io': round(profile_dict.get('TIME-IO', 0.0), 6)}
+        if elapsed_time is not None:
+            report['time-total'] = round(elapsed_time, 6)
+        if self.line_cache_size:
+            report['line-cache'] = {'hits': self.line_cache_hits, 'misses': self.line_cache_misses}
+        report['steps'] = steps
+        return report
+
+    def norm_clean_plan_entry(self, s: str, plan: NormCleanPlan, look_alike_stats: Optional[dict] = None) -> tuple:
+        """
+        Applies the normalization/cleaning steps of a plan to a string.
+        Returns a tuple (result, lv, call_slots, changed_slots) with the line type vector of s and the counter slots
+        of the steps that were applied to s and of those that changed it (to be recorded in stats or ht).
+        look_alike_stats: see correct_look_alikes
+        """
+        cache_key = None
+        if self.line_cache_size:
+            cache_key, cache_entry = self.line_cache_get(s, plan)
+            if cache_entry is not None:
+                return cache_entry
+        # line_char_type_vector: each bit in this vector is to capture character type info, e.g. char_is_arabic
+        # A set bit in the lv means that the bit has been set by at least one char.
+        # So we will easily know whether e.g. a line contains an Arabic character.
+        # If not, some Arabic-specific normalization steps can be skipped to improve run-time.
+        profile_dict = self.profile_dict
+        if profile_dict is not None:
+            start_time = time.perf_counter()
+        lv = self.char_type_table.or_reduce(s)
+        if profile_dict is not None:
+            self.add_profile_time(profile_dict, 'TIME-PRESCAN', start_time)
+        stages, call_slots = plan.stages(lv)
+        changed_slots = []
+        for stage in stages:
+            if profile_dict is not None:
+                start_time = time.perf_counter()
+            s, change_mask = self.apply_ncs_stage(s, stage, lv, look_alike_stats)
+            if profile_dict is not None:
+                self.add_profile_stage_time(profile_dict, stage, start_time)
+            if change_mask:
+                for i, step in enumerate(stage):
+                    if change_mask & (1 << i):
+                        changed_slots.append(step[5])
+        cache_entry = (s, lv, call_slots, tuple(changed_slots))
+        if cache_key is not None:
+            self.line_cache_put(cache_key, cache_entry)
+        return cache_entry
+
+    def norm_clean_plan_string(self, s: str, plan: NormCleanPlan, stats: NormCleanStats, loc_id: str = '',
+                               look_alike_stats: Optional[dict] = None) -> str:
+        """
+        Like norm_clean_string, for a precompiled plan (see ncs_plan) and stats (see NormCleanPlan.new_stats).
+        With per-call stats and look_alike_stats (see correct_look_alikes), it can be called by concurrent threads.
+        """
+        result, _, call_slots, changed_slots = self.norm_clean_plan_entry(s, plan, look_alike_stats)
+        stats.record_line(result != s, call_slots, changed_slots, loc_id)
+        return result
+
+    # noinspection SpellCheckingInspection,SpellCheckingInspection
+    def norm_clean_string(self, s: str, ht: dict, lang_code: Optional[str] = None, loc_id: str = '') -> str:
+        """Go through a list of applicable normalization/cleaning steps and keep track of the number of changes."""
+        if lang_code is None:
+            lang_code = self.lang_code
+        plan = self.ht_ncs_plan(ht, lang_code)
+        result, _, call_slots, changed_slots = self.norm_clean_plan_entry(s, plan)
+        plan.add_line_to_ht(ht, result != s, call_slots, changed_slots, loc_id)
+        return result
+
+    def norm_clean_plan_batch(self, lines: List[str], plan: NormCleanPlan, stats: NormCleanStats,
+                              loc_ids: Optional[List[str]] = None,
+                              look_alike_stats: Optional[dict] = None) -> List[str]:
+        """
+        Normalizes a list of lines with the same results and change stats as calling norm_clean_plan_string
+        on each line. Lines are grouped by line type vector, so that the applicable steps are determined once
+        per group, and each stage of steps is applied to all lines of a group in one go.
+        """
+        result_lines = list(lines)
+        line_entries = [None] * len(lines)  # line index -> (call_slots, changed_slots)
+        line_indices_by_lv = defaultdict(list)
+        cache_keys = {}  # line index -> line cache key (for cache misses)
+        or_reduce = self.char_type_table.or_reduce
+        profile_dict = self.profile_dict
+        if profile_dict is not None:
+            start_time = time.perf_counter()
+        for line_index, s in enumerate(lines):
+            if self.line_cache_size:
+                cache_key, cache_entry = self.line_cache_get(s, plan)
+                if cache_entry is not None:
+                    result_lines[line_index] = cache_entry[0]
+                    line_entries[line_index] = cache_entry[2:]
+                    continue
+                cache_keys[line_index] = cache_key
+            line_indices_by_lv[or_reduce(s)].append(line_index)
+        if profile_dict is not None:
+            self.add_profile_time(profile_dict, 'TIME-PRESCAN', start_time)
+        for lv, line_indices in line_indices_by_lv.items():
+            stages, call_slots = plan.stages(lv)
+            changed_slots_by_line = defaultdict(list)
+            for stage in stages:
+                if profile_dict is not None:
+                    start_time = time.perf_counter()
+                for line_index in line_indices:
+                    s, change_mask = self.apply_ncs_stage(result_lines[line_index], stage, lv, look_alike_stats)
+                    if change_mask:
+                        result_lines[line_index] = s
+                        for i, step in enumerate(stage):
+                            if change_mask & (1 << i):
+                                changed_slots_by_line[line_index].append(step[5])
+                if profile_dict is not None:
+                    self.add_profile_stage_time(profile_dict, stage, start_time)
+            for line_index in line_indices:
+                line_entries[line_index] = (call_slots, tuple(changed_slots_by_line.get(line_index, ())))
+                if cache_keys:
+                    self.line_cache_put(cache_keys[line_index],
+                                        (result_lines[line_index], lv) + line_entries[line_index])
+        # Record lines in line order, as norm_clean_plan_string would (locations of first 20 changes per step).
+        record_line = stats.record_line
+        for line_index, (s, orig_s, (call_slots, changed_slots)) in enumerate(zip(result_lines, lines, line_entries)):
+            record_line(s != orig_s, call_slots, changed_slots, loc_ids[line_index] if loc_ids else '')
+        return result_lines
+
+    def ncs_applicable_line_indices(self, lines: List[str], plan: NormCleanPlan, chunk_size: int = 16) -> List[int]:
+        """
+        Returns the indices of the lines of all chunks of chunk_size lines to which any step of plan applies,
+        i.e. of a superset of the lines to which steps apply (see norm_clean_plan_sparse_batch).
+        """
+        or_reduce = self.char_type_table.or_reduce
+        stages = plan.stages
+        line_indices = []
+        n_tested_chunks, n_applicable_chunks = 0, 0
+        for start in range(0, len(lines), chunk_size):
+            if n_tested_chunks == 64 and n_applicable_chunks >= 48:
+                line_indices.extend(range(start, len(lines)))
+                break
+            chunk = lines[start:start + chunk_size]
+            n_tested_chunks += 1
+            if stages(or_reduce('\n'.join(chunk)))[1]:
+                n_applicable_chunks += 1
+                line_indices.extend(range(start, start + len(chunk)))
+        return line_indices
+
+    def norm_clean_plan_sparse_batch(self, lines: List[str], plan: NormCleanPlan, stats: NormCleanStats,
+                                     loc_ids: Optional[List[str]] = None, chunk_size: int = 16,
+                                     look_alike_stats: Optional[dict] = None) -> List[str]:
+        """
+        Like norm_clean_plan_batch, with the same results and change stats, for text in which most lines do not
+        need any normalization/cleaning, e.g. clean UTF-8 (see sniff_encoding).
+        The line type vector is computed per chunk of chunk_size lines. As the line type vector of a chunk includes
+        those of its lines, no step applies to any line of a chunk if no step applies to the chunk.
+        Only the lines of the other chunks are normalized by norm_clean_plan_batch.
+        If steps apply to most of the first 64 chunks, as for text in many non-Latin scripts,
+        the remaining chunks are not tested.
+        """
+        profile_dict = self.profile_dict
+        if profile_dict is not None:
+            start_time = time.perf_counter()
+        line_indices = self.ncs_applicable_line_indices(lines, plan, chunk_size)
+        if profile_dict is not None:
+            self.add_profile_time(profile_dict, 'TIME-PRESCAN', start_time)
+        if len(line_indices) == len(lines):
+            return self.norm_clean_plan_batch(lines, plan, stats, loc_ids=loc_ids, look_alike_stats=look_alike_stats)
+        result_lines = list(lines)
+        if line_indices:
+            triggered_loc_ids = [loc_ids[i] for i in line_indices] if loc_ids else None
+            triggered_lines = self.norm_clean_plan_batch([lines[i] for i in line_indices], plan, stats,
+                                                         loc_ids=triggered_loc_ids, look_alike_stats=look_alike_stats)
+            for line_index, s in zip(line_indices, triggered_lines):
+                result_lines[line_index] = s
+        stats.record_unchanged_lines(len(lines) - len(line_indices))
+        return result_lines
+
+    def norm_clean_batch(self, lines: List[str], ht: dict, lang_code: Optional[str] = None,
+                         loc_ids: Optional[List[str]] = None) -> List[str]:
+        """Normalizes a list of lines with the same results and change stats as norm_clean_string on each line."""
+        if lang_code is None:
+            lang_code = self.lang_code
+        plan = self.ht_ncs_plan(ht, lang_code)
+        stats = plan.new_stats()
+        result_lines = self.norm_clean_plan_batch(lines, plan, stats, loc_ids=loc_ids)
+        stats.add_to_ht(ht)
+        return result_lines
+
+    def norm_clean_stream_batch(self, lines: list, plan: NormCleanPlan, stats: NormCleanStats,
+                                start_line_number: int = 0, look_alike_stats: Optional[dict] = None) -> List[str]:
+        """
+        Normalizes a batch of streamed lines (see iter_normalize): str, or bytes that are decoded like binary input
+        files. As in norm_clean_lines, trailing whitespace (including line ends) is stripped.
+        """
+        input_encoding = self.default_input_encoding
+        lines = [(line.decode(input_encoding.encoding, errors=input_encoding.errors) if isinstance(line, bytes)
+                  else line).rstrip() for line in lines]
+        loc_ids = list(map(str, range(start_line_number + 1, start_line_number + len(lines) + 1)))
+        return self.norm_clean_plan_batch(lines, plan, stats, loc_ids=loc_ids, look_alike_stats=look_alike_stats)
+
+    def iter_normalize(self, lines: Iterable, ht: Optional[dict] = None, lang_code: Optional[str] = None,
+                       batch_size: int = 256, look_alike_stats: Optional[dict] = None) -> Iterator[str]:
+        """
+        Generator of the normalized lines of an iterable of lines (see norm_clean_stream_batch), for Python pipelines
+        that normalize in-process, e.g. tag(wb.iter_normalize(parse(tmx_file)), without a subprocess pipe.
+        Lines are read lazily in batches of up to batch_size lines (see norm_clean_plan_batch); the next batch
+        is read only after the results of the previous batch have been consumed.
+        ht: 'SKIP-' entries select steps to be skipped;
+            change stats are added once the generator is exhausted or closed.
+        look_alike_stats: see correct_look_alikes, e.g. for generators in concurrent threads that share this Wildebeest
+        """
+        if lang_code is None:
+            lang_code = self.lang_code
+        plan = self.ht_ncs_plan({} if ht is None else ht, lang_code)
+        stats = plan.new_stats()
+        lines = iter(lines)
+        line_number = 0
+        try:
+            while True:
+                batch = list(islice(lines, batch_size))
+                if not batch:
+                    break
+                yield from self.norm_clean_stream_batch(batch, plan, stats, line_number, look_alike_stats)
+                line_number += len(batch)
+        finally:
+            if ht is not None:
+                stats.add_to_ht(ht)
+
+    async def aiter_normalize(self, lines: Union[AsyncIterable, Iterable], ht: Optional[dict] = None,
+                              lang_code: Optional[str] = None, batch_size: int = 256,
+                              look_alike_stats: Optional[dict] = None, executor=None) -> AsyncIterator[str]:
+        """
+        Async variant of iter_normalize for asyncio pipelines, for an async iterable of lines, e.g. an
+        asyncio.StreamReader (bytes) or an async generator, or a plain iterable.
+        A reader task queues up to 2 * batch_size lines ahead, and then waits for the consumer (backpressure).
+        A batch holds the lines queued by the time the previous batch is done (at least one, at most batch_size),
+        so that slow streams are not held back to fill a batch.
+        Batches are normalized in executor (default: the event loop's default thread pool), so that the event loop
+        is not blocked, while the reader task keeps reading.
+        """
+        import asyncio  # only needed here; importing asyncio at module level slows down script startup
+        if lang_code is None:
+            lang_code = self.lang_code
+        plan = self.ht_ncs_plan({} if ht is None else ht, lang_code)
+        stats = plan.new_stats()
+        loop = asyncio.get_running_loop()
+        line_queue = asyncio.Queue(maxsize=2 * batch_size)
+        end_of_lines = object()
+        reader_errors = []
+
+        async def read_lines():
+            try:
+                if hasattr(lines, '__aiter__'):
+                    async for line in lines:
+                        await line_queue.put(line)
+                else:
+                    for line in lines:
+                        await line_queue.put(line)
+            except Exception as error:  # raised by the lines iterator (cancellation is not an Exception)
+                reader_errors.append(error)
+            await line_queue.put(end_of_lines)
+
+        reader = asyncio.ensure_future(read_lines())
+        line_number = 0
+        try:
+            while True:
+                batch = [await line_queue.get()]
+                while len(batch) < batch_size and not line_queue.empty():
+                    batch.append(line_queue.get_nowait())
+                end_reached = batch[-1] is end_of_lines
+                if end_reached:
+                    batch.pop()
+                if batch:
+                    results = await loop.run_in_executor(executor, self.norm_clean_stream_batch, batch, plan, stats,
+                                                         line_number, look_alike_stats)
+                    line_number += len(batch)
+                    for result in results:
+                        yield result
+                if end_reached:
+                    break
+            if reader_errors:
+                raise reader_errors[0]
+        finally:
+            reader.cancel()
+            if ht is not None:
+                stats.add_to_ht(ht)
+
+    def norm_clean_lines(self, ht: dict, input_file: TextIO, output_file: TextIO, lang_code: Optional[str] = None,
+                         look_alike_stats: Optional[dict] = None, tsv_columns: Optional[dict] = None):
+        """
+        Apply normalization/cleaning to a file (or STDIN/STDOUT).
+        look_alike_stats: see correct_look_alikes
+        tsv_columns: TSV mode, see norm_clean_tsv_line_batches (lines are normalized in batches of 10000 lines)
+        """
+        if lang_code is None:
+            lang_code = self.lang_code
+        if tsv_columns:
+            line_batches = iter(lambda: list(islice(input_file, 10000)), [])
+            output_batches = self.iter_norm_clean_tsv_line_batches(ht, line_batches, tsv_columns, lang_code=lang_code,
+                                                                   look_alike_stats=look_alike_stats)
+            try:
+                for output in output_batches:
+                    output_file.write(output)
+            finally:
+                output_batches.close()
+            return
+        plan = self.ht_ncs_plan(ht, lang_code)
+        stats = plan.new_stats()
+        norm_clean_plan_entry = self.norm_clean_plan_entry
+        record_line = stats.record_line
+        line_number = 0
+        profile_dict = self.profile_dict
+        try:
+            if profile_dict is None:
+                for line in input_file:
+                    line_number += 1
+                    s = line.rstrip()
+                    result, _, call_slots, changed_slots = norm_clean_plan_entry(s, plan, look_alike_stats)
+                    record_line(result != s, call_slots, changed_slots, str(line_number))
+                    output_file.write(result + "\n")
+                return
+            # Profile: time outside of normalization is attributed to I/O (reading/writing lines).
+            io_time, normalization_time = 0.0, 0.0
+            end_time = time.perf_counter()
+            for line in input_file:
+                start_time = time.perf_counter()
+                io_time += start_time - end_time
+                line_number += 1
+                s = self.norm_clean_plan_string(line.rstrip(), plan, stats, loc_id=str(line_number),
+                                                look_alike_stats=look_alike_stats)
+                end_time = time.perf_counter()
+                normalization_time += end_time - start_time
+                output_file.write(s + "\n")
+            io_time += time.perf_counter() - end_time
+            profile_dict['TIME-IO'] = profile_dict.get('TIME-IO', 0.0) + io_time
+            profile_dict['TIME-NORMALIZATION'] = profile_dict.get('TIME-NORMALIZATION', 0.0) + normalization_time
+        finally:
+            stats.add_to_ht(ht)
+
+    def norm_clean_line_batches(self, ht: dict, line_batches: Iterable[List[str]], output_file: BinaryIO,
+                                lang_code: Optional[str] = None, start_line_number: int = 0,
+                                look_alike_stats: Optional[dict] = None,
+                                input_encoding: Optional[InputEncoding] = None, tsv_columns: Optional[dict] = None):
+        """
+        Normalizes batches of lines (see iter_line_batches) with the same output and stats as norm_clean_lines.
+        Each batch of lines is normalized with norm_clean_plan_batch, and written to output_file with a single write.
+        start_line_number: number of preceding lines (for change locations), e.g. when resuming
+        look_alike_stats: see correct_look_alikes
+        input_encoding: of the file of the lines (default: default_input_encoding), see InputEncoding
+        tsv_columns: TSV mode (see parse_tsv_columns), in which lines are normalized by norm_clean_tsv_line_batches
+        """
+        if lang_code is None:
+            lang_code = self.lang_code
+        if tsv_columns:
+            self.norm_clean_tsv_line_batches(ht, line_batches, output_file, tsv_columns, lang_code=lang_code,
+                                             start_line_number=start_line_number, look_alike_stats=look_alike_stats,
+                                             input_encoding=input_encoding)
+            return
+        if input_encoding is None:
+            input_encoding = self.default_input_encoding
+        plan = self.ht_ncs_plan(ht, lang_code)
+        stats = plan.new_stats()
+        line_number = start_line_number
+        norm_clean_plan_batch = self.norm_clean_plan_sparse_batch if input_encoding.sparse_batches \
+            else self.norm_clean_plan_batch
+        profile_dict = self.profile_dict
+        if profile_dict is not None:
+            start_time = time.perf_counter()
+        try:
+            for lines in line_batches:
+                if input_encoding.undo_double_encoding:
+                    lines = list(map(undo_double_encoding, lines))
+                if profile_dict is not None:
+                    self.add_profile_time(profile_dict, 'TIME-IO', start_time)
+                    start_time = time.perf_counter()
+                loc_ids = list(map(str, range(line_number + 1, line_number + len(lines) + 1)))
+                line_number += len(lines)
+                output_lines = norm_clean_plan_batch([line.rstrip() for line in lines], plan, stats, loc_ids=loc_ids,
+                                                     look_alike_stats=look_alike_stats)
+                output_lines.append('')
+                if profile_dict is not None:
+                    self.add_profile_time(profile_dict, 'TIME-NORMALIZATION', start_time)
+                    start_time = time.perf_counter()
+                # Same as text output files of wildebeest_normalize.py, opened with errors='ignore'
+                output_file.write('\n'.join(output_lines).encode('utf-8', errors='ignore'))
+            if profile_dict is not None:
+                self.add_profile_time(profile_dict, 'TIME-IO', start_time)
+        finally:
+            stats.add_to_ht(ht)
+
+    def norm_clean_tsv_line_batches(self, ht: dict, line_batches: Iterable[List[str]], output_file: BinaryIO,
+                                    tsv_columns: dict, lang_code: Optional[str] = None, start_line_number: int = 0,
+                                    look_alike_stats: Optional[dict] = None,
+                                    input_encoding: Optional[InputEncoding] = None):
+        """
+        Like norm_clean_line_batches, for lines of tab-separated fields, of which only the fields of tsv_columns
+        (0-based column index -> language code, None for lang_code) are normalized; other fields (e.g. IDs) are
+        copied unchanged. Each line is split once, and the fields of a column in a batch of lines are normalized
+        together (see norm_clean_plan_batch). Lines without a column keep their other fields.
+        Change stats count lines, as for untabbed lines: a step is counted once for a line if it was applied to
+        (or changed) any of its fields.
+        """
+        output_batches = self.iter_norm_clean_tsv_line_batches(ht, line_batches, tsv_columns, lang_code=lang_code,
+                                                               start_line_number=start_line_number,
+                                                               look_alike_stats=look_alike_stats,
+                                                               input_encoding=input_encoding)
+        try:
+            for output in output_batches:
+                # Same as text output files of wildebeest_normalize.py, opened with errors='ignore'
+                output_file.write(output.encode('utf-8', errors='ignore'))
+        finally:
+            output_batches.close()
+
+    def iter_norm_clean_tsv_line_batches(self, ht: dict, line_batches: Iterable[List[str]], tsv_columns: dict,
+                                         lang_code: Optional[str] = None, start_line_number: int = 0,
+                                         look_alike_stats: Optional[dict] = None,
+                                         input_encoding: Optional[InputEncoding] = None) -> Iterator[str]:
+        """
+        Generator of the output of norm_clean_tsv_line_batches, one string of normalized lines per batch of lines.
+        Change stats are added to ht once the generator is exhausted or closed.
+        """
+        if lang_code is None:
+            lang_code = self.lang_code
+        if input_encoding is None:
+            input_encoding = self.default_input_encoding
+        column_plans = [(column, self.ht_ncs_plan(ht, column_lang_code or lang_code))
+                        for column, column_lang_code in sorted(tsv_columns.items())]
+        # Stats for the steps of all column plans, which differ only for columns with different language codes.
+        step_names = tuple(dict.fromkeys(chain.from_iterable(plan.step_names for _, plan in column_plans)))
+        stats = NormCleanStats(step_names)
+        column_slots = [[step_names.index(step_name) for step_name in plan.step_names] for _, plan in column_plans]
+        line_number = start_line_number
+        norm_clean_plan_batch = self.norm_clean_plan_sparse_batch if input_encoding.sparse_batches \
+            else self.norm_clean_plan_batch
+        try:
+            for lines in line_batches:
+                if input_encoding.undo_double_encoding:
+                    lines = list(map(undo_double_encoding, lines))
+                # Only line ends are stripped, as trailing tabs separate empty fields.
+                rows = [line.rstrip('\r\n').split('\t') for line in lines]
+                changed_rows = bytearray(len(rows))
+                row_slots = defaultdict(lambda: (set(), set()))  # row index -> (call slots, changed slots)
+                for (column, plan), slots in zip(column_plans, column_slots):
+                    row_indices = [i for i, fields in enumerate(rows) if len(fields) > column]
+                    fields = [rows[i][column] for i in row_indices]
+                    recorder = NormCleanRowRecorder()
+                    for i, field, result in zip(row_indices, fields,
+                                                norm_clean_plan_batch(fields, plan, recorder, loc_ids=row_indices,
+                                                                      look_alike_stats=look_alike_stats)):
+                        if result != field:
+                            rows[i][column] = result
+                            changed_rows[i] = 1
+                    for i, (call_slots, changed_slots) in recorder.row_entries.items():
+                        row_call_slots, row_changed_slots = row_slots[i]
+                        row_call_slots.update(slots[slot] for slot in call_slots)
+                        row_changed_slots.update(slots[slot] for slot in changed_slots)
+                for i in range(len(rows)):
+                    if i in row_slots:
+                        call_slots, changed_slots = row_slots[i]
+                        stats.record_line(changed_rows[i], tuple(sorted(call_slots)), tuple(sorted(changed_slots)),
+                                          str(line_number + i + 1))
+                    else:
+                        stats.record_line(changed_rows[i], (), (), str(line_number + i + 1))
+                line_number += len(rows)
+                rows.append([''])
+                yield '\n'.join(['\t'.join(fields) for fields in rows])
+        finally:
+            stats.add_to_ht(ht)
+
+    def norm_clean_binary_lines(self, ht: dict, input_file: BinaryIO, output_file: BinaryIO,
+                                lang_code: Optional[str] = None, block_size: int = 1 << 20,
+                                look_alike_stats: Optional[dict] = None,
+                                input_encoding: Optional[InputEncoding] = None, tsv_columns: Optional[dict] = None):
+        """
+        Like norm_clean_lines, but for binary files (or sys.stdin.buffer/sys.stdout.buffer), with the same output.
+        Input is read in blocks of block_size bytes (see iter_line_batches), each block of lines is normalized
+        as a batch (see norm_clean_plan_batch), and the output lines of a block are written with a single write.
+        """
+        if input_encoding is None:
+            input_encoding = self.default_input_encoding
+        line_batches = iter_line_batches(input_file, block_size, input_encoding.errors, input_encoding.encoding)
+        self.norm_clean_line_batches(ht, line_batches, output_file, lang_code=lang_code,
+                                     look_alike_stats=look_alike_stats, input_encoding=input_encoding,
+                                     tsv_columns=tsv_columns)
+
+    def norm_clean_mmap_file(self, ht: dict, input_filename: str, output_file: BinaryIO,
+                             lang_code: Optional[str] = None, byte_range: Optional[Tuple[int, int]] = None,
+                             block_size: int = 1 << 20, start_line_number: int = 0,
+                             look_alike_stats: Optional[dict] = None, input_encoding: Optional[InputEncoding] = None,
+                             tsv_columns: Optional[dict] = None):
+        """
+        Like norm_clean_binary_lines, but for an (uncompressed) input file that is memory-mapped.
+        byte_range (start, end) restricts normalization to a newline-aligned part of the file (see shard_byte_range).
+        Blocks are decoded directly from the memory map, without intermediate copies.
+        """
+        if input_encoding is None:
+            input_encoding = self.default_input_encoding
+        with open(input_filename, 'rb') as input_file:
+            size = os.fstat(input_file.fileno()).st_size
+            start, end = byte_range or (0, size)
+            if start >= end:
+                self.norm_clean_line_batches(ht, [], output_file, lang_code=lang_code,
+                                             look_alike_stats=look_alike_stats, input_encoding=input_encoding,
+                                             tsv_columns=tsv_columns)
+                return
+            with mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as mm_view:
+                    line_batches = iter_mmap_line_batches(mm, mm_view, start, end, block_size, input_encoding.errors,
+                                                          input_encoding.encoding)
+                    self.norm_clean_line_batches(ht, line_batches, output_file, lang_code=lang_code,
+                                                 start_line_number=start_line_number,
+                                                 look_alike_stats=look_alike_stats, input_encoding=input_encoding,
+                                                 tsv_columns=tsv_columns)
+
+    def analyze_plan_batch(self, lines: List[str], plan: NormCleanPlan, analysis: NormCleanAnalysis) -> None:
+        """
+        Adds the characters of lines to the code point histogram of analysis, and each line to the line counts of
+        the steps of plan that would be applied to it, without normalizing the lines.
+        Line type vectors are computed only for the lines of chunks to which steps apply (see
+        ncs_applicable_line_indices), once per distinct line type vector for their steps.
+        """
+        analysis.n_lines += len(lines)
+        if not lines:
+            return
+        char_counts = analysis.char_counts
+        char_counts.update('\n'.join(lines))
+        char_counts.pop('\n', None)
+        line_indices = self.ncs_applicable_line_indices(lines, plan)
+        or_reduce = self.char_type_table.or_reduce
+        lv_counts = Counter(map(or_reduce, [lines[i] for i in line_indices])
+                            if len(line_indices) < len(lines) else map(or_reduce, lines))
+        call_counts = analysis.call_counts
+        for lv, n_lines in lv_counts.items():
+            for slot in plan.stages(lv)[1]:
+                call_counts[slot] += n_lines
+
+    def analyze_line_batches(self, ht: dict, line_batches: Iterable[List[str]], lang_code: Optional[str] = None,
+                             analysis: Optional[NormCleanAnalysis] = None,
+                             input_encoding: Optional[InputEncoding] = None) -> NormCleanAnalysis:
+        """
+        Analyzes batches of lines (see iter_line_batches), for the steps that norm_clean_line_batches would apply
+        with the same ht, lang_code and input_encoding.
+        Returns the analysis (see NormCleanAnalysis), which may be given to be extended.
+        """
+        if lang_code is None:
+            lang_code = self.lang_code
+        if input_encoding is None:
+            input_encoding = self.default_input_encoding
+        plan = self.ht_ncs_plan(ht, lang_code)
+        if analysis is None:
+            analysis = plan.new_analysis()
+        for lines in line_batches:
+            if input_encoding.undo_double_encoding:
+                lines = list(map(undo_double_encoding, lines))
+            self.analyze_plan_batch([line.rstrip() for line in lines], plan, analysis)
+        return analysis
+
+    def analyze_file(self, ht: dict, input_filename: Optional[str], lang_code: Optional[str] = None,
+                     byte_range: Optional[Tuple[int, int]] = None, block_size: int = 1 << 20,
+                     input_encoding: Optional[InputEncoding] = None) -> NormCleanAnalysis:
+        """
+        Analyzes a file (see analyze_line_batches), or STDIN if input_filename is None.
+        Uncompressed files are memory-mapped; byte_range (start, end) restricts the analysis to a newline-aligned
+        part of such a file (see shard_byte_range).
+        """
+        if input_encoding is None:
+            input_encoding = self.default_input_encoding
+        if not (input_filename and os.path.isfile(input_filename)
+                and not strip_compression_extension(input_filename)[1]):
+            if byte_range:
+                raise ValueError('Byte ranges require an uncompressed input file')
+            with open_binary_file(input_filename, 'rb') as input_file:
+                line_batches = iter_line_batches(input_file, block_size, input_encoding.errors, input_encoding.encoding)
+                return self.analyze_line_batches(ht, line_batches, lang_code=lang_code, input_encoding=input_encoding)
+        with open(input_filename, 'rb') as input_file:
+            size = os.fstat(input_file.fileno()).st_size
+            start, end = byte_range or (0, size)
+            if start >= end:
+                return self.analyze_line_batches(ht, [], lang_code=lang_code, input_encoding=input_encoding)
+            with mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as mm_view:
+                    line_batches = iter_mmap_line_batches(mm, mm_view, start, end, block_size, input_encoding.errors,
+                                                          input_encoding.encoding)
+                    return self.analyze_line_batches(ht, line_batches, lang_code=lang_code,
+                                                     input_encoding=input_encoding)
+
+    def analyze_file_in_parallel(self, ht: dict, input_filename: str, lang_code: Optional[str] = None,
+                                 n_workers: int = 2,
+                                 input_encoding: Optional[InputEncoding] = None) -> NormCleanAnalysis:
+        """
+        Like analyze_file, but analyzes n_workers shards of an uncompressed input file (see shard_byte_range)
+        in a pool of n_workers processes, and merges their analyses.
+        """
+        if lang_code is None:
+            lang_code = self.lang_code
+        plan = self.ht_ncs_plan(ht, lang_code)
+        analysis = plan.new_analysis()
+        skip_steps = self.skip_steps.union(key[5:] for key in ht if key.startswith('SKIP-'))
+        if input_encoding is None:
+            input_encoding = self.default_input_encoding
+        byte_ranges = [shard_byte_range(input_filename, shard_index, n_workers)
+                       for shard_index in range(1, n_workers + 1)]
+        from concurrent.futures import ProcessPoolExecutor  # imported here for faster script startup
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=init_worker_wildebeest,
+                                 initargs=(0, False, skip_steps, lang_code)) as executor:
+            for shard_analysis in executor.map(analyze_shard, [input_filename] * n_workers, byte_ranges,
+                                               [input_encoding] * n_workers):
+                analysis.merge(shard_analysis)
+        return analysis
+
+    def analysis_report(self, analysis: NormCleanAnalysis, plan: NormCleanPlan, max_n_chars: int = 20) -> dict:
+        """
+        Returns an analysis in a JSON-friendly dict: for each step that would be applied to any line, the number of
+        such lines and the most frequent characters of the text with character types in the step's gate, i.e.
+        the characters that trigger it; the steps that would not be applied to any line; and the most frequent
+        non-ASCII characters.
+        """
+        def char_entry(char: str, count: int) -> dict:
+            return {'char': char, 'code-point': f'U+{ord(char):04X}', 'name': unicodedata.name(char, ''),
+                    'count': count}
+
+        char_type_table = self.char_type_table
+        char_values = {char: char_type_table.get(char) for char in analysis.char_counts}
+        frequent_chars = [char for char, count in analysis.char_counts.most_common()]
+        steps = []
+        idle_steps = []
+        for step in plan.steps:
+            step_name, gate, slot = step[0], step[2], step[5]
+            n_lines = analysis.call_counts[slot]
+            if not n_lines:
+                idle_steps.append(step_name)
+                continue
+            trigger_chars = []
+            for char in frequent_chars:
+                if any(char_values[char] & bits for bits in gate):
+                    trigger_chars.append(char_entry(char, analysis.char_counts[char]))
+                    if len(trigger_chars) >= max_n_chars:
+                        break
+            steps.append({'step': step_name, 'lines': n_lines, 'trigger-chars': trigger_chars})
+        non_ascii_chars = [char_entry(char, analysis.char_counts[char])
+                           for char in islice((char for char in frequent_chars if not char.isascii()), max_n_chars)]
+        return {'wildebeest-version': __version__,
+                'number-of-lines': analysis.n_lines,
+                'number-of-chars': sum(analysis.char_counts.values()),
+                'distinct-chars': len(analysis.char_counts),
+                'steps': steps,
+                'steps-not-applied': idle_steps,
+                'non-ascii-chars': non_ascii_chars}
+
+    def norm_clean_lines_in_parallel(self, ht: dict, input_file: TextIO, output_file: TextIO,
+                                     lang_code: Optional[str] = None, n_workers: int = 2, chunk_size: int = 10000,
+                                     look_alike_stats: Optional[dict] = None):
+        """
+        Like norm_clean_lines, but normalizes chunks of chunk_size lines in a pool of n_workers processes.
+        Output lines are written in their original order. Change stats of the workers are merged into ht and
+        into look_alike_stats (default: this Wildebeest's look-alike stats), so that they match those of
+        norm_clean_lines.
+        Worker Wildebeests are specialized for the skipped steps and language code.
+        """
+        if lang_code is None:
+            lang_code = self.lang_code
+        plan = self.ht_ncs_plan(ht, lang_code)
+        stats = plan.new_stats()
+        skip_steps = self.skip_steps.union(key[5:] for key in ht if key.startswith('SKIP-'))
+        line_number = 0
+        pending_chunks = deque()
+        profile_dict = self.profile_dict
+        from concurrent.futures import ProcessPoolExecutor  # imported here for faster script startup
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=init_worker_wildebeest,
+                                 initargs=(self.line_cache_size, profile_dict is not None,
+                                           skip_steps, lang_code)) as executor:
+            while True:
+                if profile_dict is not None:
+                    start_time = time.perf_counter()
+                lines = list(islice(input_file, chunk_size))
+                if profile_dict is not None:
+                    self.add_profile_time(profile_dict, 'TIME-IO', start_time)
+                if lines:
+                    pending_chunks.append(executor.submit(norm_clean_chunk, lines, start_line_number=line_number))
+                    line_number += len(lines)
+                # Keep a bounded number of chunks in flight; write finished chunks in order.
+                while pending_chunks and ((not lines) or (len(pending_chunks) > 2 * n_workers)):
+                    output, chunk_stats, chunk_look_alike_stats, worker_stats = pending_chunks.popleft().result()
+                    if profile_dict is not None:
+                        start_time = time.perf_counter()
+                    output_file.write(output)
+                    if profile_dict is not None:
+                        self.add_profile_time(profile_dict, 'TIME-IO', start_time)
+                        # Step times are summed over worker processes.
+                        self.merge_profile(profile_dict, worker_stats['profile'])
+                    stats.merge(chunk_stats)
+                    self.merge_look_alike_stats(chunk_look_alike_stats, into=look_alike_stats)
+                    self.line_cache_hits += worker_stats['line-cache-hits']
+                    self.line_cache_misses += worker_stats['line-cache-misses']
+                if not lines:
+                    break
+        stats.add_to_ht(ht)
+
+    def norm_clean_lines_threaded(self, ht: dict, input_file: TextIO, output_file: TextIO,
+                                  lang_code: Optional[str] = None, n_threads: int = 2, chunk_size: int = 10000,
+                                  look_alike_stats: Optional[dict] = None):
+        """
+        Like norm_clean_lines_in_parallel, but normalizes chunks of chunk_size lines in a pool of n_threads threads
+        that share this Wildebeest (and its tables and line cache), rather than in worker processes with their own
+        copies. Each chunk has its own change stats and look-alike stats, which are merged in the original order
+        (into ht and look_alike_stats, default: this Wildebeest's look-alike stats).
+        Step profiles are not supported (see norm_clean_lines_in_parallel).
+        """
+        if lang_code is None:
+            lang_code = self.lang_code
+        plan = self.ht_ncs_plan(ht, lang_code)
+        stats = plan.new_stats()
+
+        def norm_clean_thread_chunk(lines: List[str], start_line_number: int) -> Tuple[str, NormCleanStats, dict]:
+            chunk_stats = plan.new_stats()
+            chunk_look_alike_stats = self.new_look_alike_stats()
+            loc_ids = [str(line_number)
+                       for line_number in range(start_line_number + 1, start_line_number + len(lines) + 1)]
+            output_lines = self.norm_clean_plan_batch([line.rstrip() for line in lines], plan, chunk_stats,
+                                                      loc_ids=loc_ids, look_alike_stats=chunk_look_alike_stats)
+            output_lines.append('')
+            return '\n'.join(output_lines), chunk_stats, chunk_look_alike_stats
+
+        line_number = 0
+        pending_chunks = deque()
+        from concurrent.futures import ThreadPoolExecutor  # imported here for faster script startup
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            while True:
+                lines = list(islice(input_file, chunk_size))
+                if lines:
+                    pending_chunks.append(executor.submit(norm_clean_thread_chunk, lines, line_number))
+                    line_number += len(lines)
+                # Keep a bounded number of chunks in flight; write finished chunks in order.
+                while pending_chunks and ((not lines) or (len(pending_chunks) > 2 * n_threads)):
+                    output, chunk_stats, chunk_look_alike_stats = pending_chunks.popleft().result()
+                    output_file.write(output)
+                    stats.merge(chunk_stats)
+                    self.merge_look_alike_stats(chunk_look_alike_stats, into=look_alike_stats)
+                if not lines:
+                    break
+        stats.add_to_ht(ht)
+
+    @staticmethod
+    def merge_ht(ht: dict, chunk_ht: dict) -> None:
+        """
+        Adds the change stats of a later chunk of lines (chunk_ht) to those of the preceding lines (ht).
+        Counts are added up; locations of the first 20 changes per normalization/cleaning group are renumbered.
+        """
+        for key, value in chunk_ht.items():
+            if key.startswith('SKIP-') or not isinstance(value, int):
+                continue
+            if key.startswith('COUNT-') and key != 'COUNT-ALL':
+                prev_count = ht.get(key, 0)
+                for count in range(1, min(value, 20 - prev_count) + 1):
+                    loc_id = chunk_ht.get(f'{key}-{count}')
+                    if loc_id is not None:
+                        ht[f'{key}-{prev_count + count}'] = loc_id
+            ht[key] = ht.get(key, 0) + value
+
+    @staticmethod
+    def new_look_alike_stats() -> dict:
+        """Empty look-alike stats, e.g. for per-call stats of correct_look_alikes (see merge_look_alike_stats)."""
+        return {'counts': {}, 'unchanged': {}, 'split': {}, 'url': {}}
+
+    def pop_look_alike_stats(self) -> dict:
+        """Returns and resets the stats collected by correct_look_alikes (in this Wildebeest's own stats)."""
+        with self.look_alike_stats_lock:
+            counts = {}
+            for key in ['n-to-Latin', 'n-to-Cyrillic', 'n-to-Greek', 'n-split', 'n-unchanged']:
+                if key in self.look_alike_dict:
+                    counts[key] = self.look_alike_dict.pop(key)
+            look_alike_stats = {'counts': counts,
+                                'unchanged': self.look_alike_unchanged_dict,
+                                'split': self.look_alike_split_dict,
+                                'url': self.look_alike_url_dict}
+            self.look_alike_unchanged_dict = {}
+            self.look_alike_split_dict = {}
+            self.look_alike_url_dict = {}
+        return look_alike_stats
+
+    def merge_look_alike_stats(self, look_alike_stats: dict, into: Optional[dict] = None) -> None:
+        """
+        Adds look-alike stats (as returned by pop_look_alike_stats) to those of this Wildebeest,
+        or to other look-alike stats into (see new_look_alike_stats).
+        """
+        if into is None:
+            with self.look_alike_stats_lock:
+                self.merge_look_alike_stats(look_alike_stats,
+                                            into={'counts': self.look_alike_dict,
+                                                  'unchanged': self.look_alike_unchanged_dict,
+                                                  'split': self.look_alike_split_dict,
+                                                  'url': self.look_alike_url_dict})
+            return
+        counts, unchanged_dict = into['counts'], into['unchanged']
+        for key, value in look_alike_stats['counts'].items():
+            counts[key] = counts.get(key, 0) + value
+        for token, count in look_alike_stats['unchanged'].items():
+            unchanged_dict[token] = unchanged_dict.get(token, 0) + count
+        for token, split_token in look_alike_stats['split'].items():
+            into['split'].setdefault(token, split_token)
+        for token, value in look_alike_stats['url'].items():
+            into['url'].setdefault(token, value)
+
+
+def open_binary_file(filename: Optional[str], mode: str = 'rb') -> BinaryIO:
+    """
+    Opens a file for binary reading ('rb') or writing ('wb'). Files ending in .gz, .bz2, .xz or .zst are
+    decompressed/compressed on the fly (.zst requires Python 3.14+ or the zstandard package).
+    filename None or '-' stands for STDIN/STDOUT.
+    """
+    if filename in (None, '-'):
+        return sys.stdin.buffer if mode.startswith('r') else sys.stdout.buffer
+    if filename.endswith('.gz'):
+        return gzip.open(filename, mode)
+    if filename.endswith('.bz2'):
+        return bz2.open(filename, mode)
+    if filename.endswith('.xz'):
+        return lzma.open(filename, mode)
+    if filename.endswith('.zst'):
+        try:
+            from compression import zstd
+        except ImportError:
+            try:
+                import zstandard as zstd
+            except ImportError:
+                raise ValueError(f'Reading/writing {filename} requires Python 3.14+ or the zstandard package '
+                                 f'(pip install zstandard)')
+        return zstd.open(filename, mode)
+    return open(filename, mode)
+
+
+def repair_undecodable_bytes(error: UnicodeDecodeError) -> Tuple[str, int]:
+    """
+    Decoding error handler 'wildebeest-windows1252', a byte-level alternative to errors='surrogateescape':
+    decodes bytes that are not valid UTF-8 as Windows-1252/Latin-1 characters, the same as repair_encoding_errors
+    repairs their surrogates (bytes \\x81, \\x8D, \\x8F, \\x90, \\x9D, unassigned in Windows-1252, are deleted).
+    """
+    return error.object[error.start:error.end].decode('cp1252', errors='ignore'), error.end
+
+
+codecs.register_error('wildebeest-windows1252', repair_undecodable_bytes)
+
+
+def decode_lines(data: bytes, errors: str = 'surrogateescape', encoding: str = 'utf-8') -> List[str]:
+    """
+    Decodes UTF-8 bytes (or a memoryview) into lines (without line endings), the same as reading them from a text file
+    opened with encoding='utf-8', errors='surrogateescape' (and universal newlines: \\r\\n and \\r end lines as well).
+    errors='wildebeest-windows1252' repairs bytes that are not valid UTF-8 when decoding (see repair_undecodable_bytes).
+    encoding='cp1252' decodes Windows-1252 files (see sniff_encoding).
+    """
+    text = str(data, encoding, errors)
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    lines = text.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    return lines
+
+
+def iter_line_batches(input_file: BinaryIO, block_size: int = 1 << 20,
+                      errors: str = 'surrogateescape', encoding: str = 'utf-8') -> Iterator[List[str]]:
+    """
+    Reads a binary file in blocks of (about) block_size bytes and yields the lines of each block.
+    Blocks are cut after their last newline; the rest is carried over to the next block.
+    """
+    rest = b''
+    while True:
+        block = input_file.read(block_size)
+        if not block:
+            break
+        end = block.rfind(b'\n') + 1
+        if not end:
+            rest += block
+            continue
+        data = rest + block[:end] if rest else block[:end]
+        rest = block[end:]
+        yield decode_lines(data, errors, encoding)
+    if rest:
+        yield decode_lines(rest, errors, encoding)
+
+
+def iter_mmap_line_batches(mm: mmap.mmap, mm_view: memoryview, start: int, end: int,
+                           block_size: int = 1 << 20, errors: str = 'surrogateescape',
+                           encoding: str = 'utf-8') -> Iterator[List[str]]:
+    """
+    Yields the lines of byte range [start, end) of a memory-mapped file in blocks of (about) block_size bytes,
+    cut after newlines (see iter_mmap_block_ranges). Blocks are decoded from zero-copy memoryview slices.
+    """
+    for block_start, block_end in iter_mmap_block_ranges(mm, start, end, block_size):
+        yield decode_lines(mm_view[block_start:block_end], errors, encoding)
+
+
+def iter_mmap_block_ranges(mm: mmap.mmap, start: int, end: int,
+                           block_size: int = 1 << 20) -> Iterator[Tuple[int, int]]:
+    """Yields the byte ranges (start, end) of the blocks of (about) block_size bytes, cut after newlines."""
+    while start < end:
+        block_end = mm.rfind(b'\n', start, min(start + block_size, end)) + 1
+        if not block_end:  # line longer than block_size
+            block_end = mm.find(b'\n', start + block_size, end) + 1 or end
+        yield start, block_end
+        start = block_end
+
+
+# Double-encoded UTF-8: a UTF-8 lead byte followed by continuation bytes, each decoded as Windows-1252/Latin-1 character
+# and encoded again as UTF-8, e.g. 'Ã©' for 'é'.
+continuation_byte_chars = ''.join(sorted(set(bytes(range(0x80, 0xC0)).decode('latin-1')
+                                             + bytes(range(0x80, 0xC0)).decode('cp1252', errors='ignore'))))
+double_encoded_re = re.compile(f'[\u00C2-\u00DF][{continuation_byte_chars}]'
+                               f'|[\u00E0-\u00EF][{continuation_byte_chars}][{continuation_byte_chars}]')
+# Maps Windows-1252 and Latin-1 characters to the character with the code point of their byte, e.g. '€' -> '\x80'
+double_encoding_table = {ord(bytes([byte]).decode('cp1252', errors='ignore') or chr(byte)): chr(byte)
+                         for byte in range(0x80, 0x100)}
+double_encoding_table.update({byte: chr(byte) for byte in range(0x80, 0xA0)})
+
+
+def undo_double_encoding(line: str) -> str:
+    """
+    Undoes the double encoding of a line, e.g. 'cafÃ© â€œokâ€\\x9d' -> 'café “ok”', if the line is double-encoded
+    UTF-8 through Windows-1252 or Latin-1 as a whole; otherwise returns the line unchanged.
+    """
+    if line.isascii():
+        return line
+    try:
+        return line.translate(double_encoding_table).encode('latin-1').decode('utf-8')
+    except UnicodeError:
+        return line
+
+
+def sniff_encoding(filename: str, n_random_blocks: int = 6, block_size: int = 1 << 16) -> dict:
+    """
+    Classifies a file based on samples (head, tail and n_random_blocks random blocks of block_size bytes, cut at
+    newlines) as 'utf-8' (valid UTF-8), 'windows-1252' (mostly bytes that are not valid UTF-8),
+    'double-encoded' (valid UTF-8, but non-ASCII characters mostly in double-encoded sequences such as 'Ã©')
+    or 'mixed'. Returns a dictionary with the 'encoding' and the counts of the samples that it is based on.
+    The random blocks are the same for each call (fixed seed), so that results are reproducible.
+    """
+    with open(filename, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        samples = []
+        if size <= (n_random_blocks + 2) * block_size:
+            samples.append(f.read())
+        elif size:
+            rng = random.Random(0)
+            offsets = [0, size - block_size] + sorted(rng.randrange(block_size, size - 2 * block_size)
+                                                      for _ in range(n_random_blocks))
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offset in offsets:
+                    sample = mm[offset:offset + block_size]
+                    if offset:  # start after first newline
+                        sample = sample[sample.find(b'\n') + 1:]
+                    if offset + block_size < size:  # end after last newline
+                        sample = sample[:sample.rfind(b'\n') + 1]
+                    samples.append(sample)
+    n_sampled_bytes, n_invalid_bytes, n_non_ascii_chars, n_double_encoded_chars = 0, 0, 0, 0
+    for sample in samples:
+        text = sample.decode('utf-8', errors='surrogateescape')
+        n_sampled_bytes += len(sample)
+        if not text.isascii():
+            n_invalid = len(re.findall(r'[\uDC80-\uDCFF]', text))
+            n_invalid_bytes += n_invalid
+            n_non_ascii_chars += len(text) - len(text.encode('ascii', errors='ignore')) - n_invalid
+            n_double_encoded_chars += sum(map(len, double_encoded_re.findall(text)))
+    if n_invalid_bytes == 0:
+        encoding = 'double-encoded' if 2 * n_double_encoded_chars > n_non_ascii_chars else 'utf-8'
+    elif 20 * n_non_ascii_chars <= n_invalid_bytes:
+        encoding = 'windows-1252'
+    else:
+        encoding = 'mixed'
+    return {'encoding': encoding, 'sampled-bytes': n_sampled_bytes, 'invalid-bytes': n_invalid_bytes,
+            'non-ascii-chars': n_non_ascii_chars, 'double-encoded-chars': n_double_encoded_chars}
+
+
+def shard_byte_range(filename: str, shard_index: int, n_shards: int) -> Tuple[int, int]:
+    """
+    Returns the byte range (start, end) of shard shard_index (1 <= shard_index <= n_shards) of a file.
+    The file is split into n_shards parts of about the same size; shard boundaries are moved to the next line start.
+    """
+    with open(filename, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return 0, 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            boundaries = []
+            for i in (shard_index - 1, shard_index):
+                nominal_boundary = size * i // n_shards
+                if nominal_boundary == 0:
+                    boundaries.append(0)
+                elif i == n_shards:
+                    boundaries.append(size)
+                else:
+                    boundaries.append(mm.find(b'\n', nominal_boundary - 1) + 1 or size)
+    return boundaries[0], boundaries[1]
+
+
+def shard_filename(filename: str, shard_index: int, n_shards: int, suffix: str = '') -> str:
+    """
+    Filename of a shard output (or other shard file with suffix, e.g. '.stats.json'), e.g.
+    corpus.clean.txt.gz, 3, 16 -> corpus.clean.txt.shard-03-of-16.gz
+    """
+    base, extension = strip_compression_extension(filename)
+    if suffix:
+        extension = suffix
+    return f'{base}.shard-{shard_index:0{len(str(n_shards))}d}-of-{n_shards}{extension}'
+
+
+def strip_compression_extension(filename: str) -> Tuple[str, str]:
+    """corpus.txt.gz -> ('corpus.txt', '.gz'); corpus.txt -> ('corpus.txt', '')"""
+    for extension in ('.gz', '.bz2', '.xz', '.zst'):
+        if filename.endswith(extension):
+            return filename[:-len(extension)], extension
+    return filename, ''
+
+
+def write_json_file(filename: str, data: dict, ensure_ascii: bool = False) -> None:
+    """Writes a JSON file atomically (several shard processes may write the same manifest)."""
+    tmp_filename = f'{filename}.tmp{os.getpid()}'
+    with open(tmp_filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=ensure_ascii)
+        f.write('\n')
+    os.replace(tmp_filename, filename)
+
+
+def norm_clean_files(wb: Wildebeest, ht: dict, input_file: BinaryIO, output_file: BinaryIO,
+                     input_filename: Optional[str] = None, output_filename: Optional[str] = None,
+                     lang_code: str = '', n_workers: int = 1, n_threads: int = 1,
+                     look_alike_stats: Optional[dict] = None, input_encoding: Optional[InputEncoding] = None,
+                     tsv_columns: Optional[dict] = None) -> None:
+    """
+    Normalizes an input file into an output file, as opened by open_binary_file, and closes them (except STDIN/STDOUT).
+    Uncompressed input files are memory-mapped (see Wildebeest.norm_clean_mmap_file).
+    look_alike_stats: see Wildebeest.correct_look_alikes
+    input_encoding: of the input file (default: wb.default_input_encoding), e.g. by Wildebeest.input_encoding_for_sniff
+    tsv_columns: TSV mode (see Wildebeest.norm_clean_tsv_line_batches), not supported with workers or threads
+    """
+    if input_encoding is None:
+        input_encoding = wb.default_input_encoding
+    if tsv_columns and (n_workers > 1 or n_threads > 1):
+        raise ValueError('TSV columns cannot be combined with workers or threads')
+    try:
+        if n_workers > 1 or n_threads > 1:
+            input_text_file = io.TextIOWrapper(input_file, encoding=input_encoding.encoding,
+                                               errors=input_encoding.errors)
+            output_text_file = io.TextIOWrapper(output_file, encoding='utf-8', errors='ignore')
+            input_lines = map(undo_double_encoding, input_text_file) if input_encoding.undo_double_encoding \
+                else input_text_file
+            if n_workers > 1:
+                wb.norm_clean_lines_in_parallel(ht, input_file=input_lines, output_file=output_text_file,
+                                                lang_code=lang_code, n_workers=n_workers,
+                                                look_alike_stats=look_alike_stats)
+            else:
+                wb.norm_clean_lines_threaded(ht, input_file=input_lines, output_file=output_text_file,
+                                             lang_code=lang_code, n_threads=n_threads,
+                                             look_alike_stats=look_alike_stats)
+            output_text_file.flush()
+            input_text_file.detach()  # detached, so that they don't close STDIN/STDOUT
+            output_text_file.detach()
+        elif input_filename not in (None, '-') and os.path.isfile(input_filename) \
+                and not strip_compression_extension(input_filename)[1]:
+            wb.norm_clean_mmap_file(ht, input_filename, output_file, lang_code=lang_code,
+                                    look_alike_stats=look_alike_stats, input_encoding=input_encoding,
+                                    tsv_columns=tsv_columns)
+        else:
+            wb.norm_clean_binary_lines(ht, input_file=input_file, output_file=output_file, lang_code=lang_code,
+                                       look_alike_stats=look_alike_stats, input_encoding=input_encoding,
+                                       tsv_columns=tsv_columns)
+    finally:
+        output_file.flush()
+        if input_filename not in (None, '-'):
+            input_file.close()
+        if output_filename not in (None, '-'):
+            output_file.close()
+
+
+def byte_offset_after_lines(filename: str, start: int, end: int, n_lines: int) -> int:
+    """Returns the byte offset after the n_lines-th newline in byte range [start, end) of a file (or end)."""
+    with open(filename, 'rb') as f:
+        if start >= end:
+            return end
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            position = start
+            while position < end:
+                block_end = min(position + (1 << 20), end)
+                n_block_lines = mm[position:block_end].count(b'\n')
+                if n_block_lines >= n_lines:
+                    for _ in range(n_lines):
+                        position = mm.find(b'\n', position, block_end) + 1
+                    return position
+                n_lines -= n_block_lines
+                position = block_end
+    return end
+
+
+def norm_clean_file_with_checkpoints(wb: Wildebeest, ht: dict, input_filename: str, output_filename: str,
+                                     lang_code: str = '', checkpoint_every: int = 1000000, resume: bool = False,
+                                     byte_range: Optional[Tuple[int, int]] = None,
+                                     input_encoding: Optional[InputEncoding] = None,
+                                     tsv_columns: Optional[dict] = None) -> None:
+    """
+    Normalizes an (uncompressed) input file into an (uncompressed) output file, writing a checkpoint file
+    OUTPUT-FILENAME.checkpoint.json about every checkpoint_every lines. The checkpoint file records the input
+    byte offset, the output byte offset and the cumulative change stats (ht and look-alike stats) of a point
+    at which all output up to that point has been written to disk.
+    If resume is set and there is a checkpoint file, the output file is truncated to the output byte offset
+    of the checkpoint, and normalization continues from its input byte offset, with its stats, so that output and
+    final stats are the same as those of an uninterrupted run. The checkpoint file is removed at the end.
+    byte_range: (start, end) of input file (see shard_byte_range)
+    input_encoding, tsv_columns: see norm_clean_files
+    """
+    checkpoint_filename = f'{output_filename}.checkpoint.json'
+    if byte_range is None:
+        byte_range = (0, os.path.getsize(input_filename))
+    start, end = byte_range
+    input_position, output_position = start, 0
+    if resume and os.path.exists(checkpoint_filename):
+        with open(checkpoint_filename, encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        if (checkpoint['input'], checkpoint['input-size'], checkpoint['input-start'], checkpoint['input-end']) \
+                != (os.path.abspath(input_filename), os.path.getsize(input_filename), start, end):
+            raise ValueError(f'Checkpoint {checkpoint_filename} is for a different input (range): '
+                             f"{checkpoint['input']} [{checkpoint['input-start']}, {checkpoint['input-end']})")
+        if checkpoint['lang-code'] != lang_code \
+                or set(checkpoint['skip']) != {key for key in ht if key.startswith('SKIP-')}:
+            raise ValueError(f'Checkpoint {checkpoint_filename} is for a different language code or skip list')
+        input_position, output_position = checkpoint['input-offset'], checkpoint['output-offset']
+        ht.clear()
+        ht.update(checkpoint['ht'])
+        wb.merge_look_alike_stats(checkpoint['look-alike'])
+        log.info(f"Resuming from checkpoint {checkpoint_filename} after {ht.get('NUMBER-OF-LINES', 0)} lines "
+                 f'(input byte {input_position}, output byte {output_position})')
+    mode = 'r+b' if output_position and os.path.exists(output_filename) else 'wb'
+    with open(output_filename, mode) as output_file:
+        output_file.truncate(output_position)
+        output_file.seek(output_position)
+        while input_position < end:
+            segment_end = byte_offset_after_lines(input_filename, input_position, end, checkpoint_every)
+            wb.norm_clean_mmap_file(ht, input_filename, output_file, lang_code=lang_code,
+                                    byte_range=(input_position, segment_end),
+                                    start_line_number=ht.get('NUMBER-OF-LINES', 0), input_encoding=input_encoding,
+                                    tsv_columns=tsv_columns)
+            input_position = segment_end
+            output_file.flush()
+            os.fsync(output_file.fileno())
+            look_alike_stats = wb.pop_look_alike_stats()
+            wb.merge_look_alike_stats(look_alike_stats)
+            write_json_file(checkpoint_filename,
+                            {'input': os.path.abspath(input_filename),
+                             'input-size': os.path.getsize(input_filename),
+                             'input-start': start,
+                             'input-end': end,
+                             'lang-code': lang_code,
+                             'skip': sorted(key for key in ht if key.startswith('SKIP-')),
+                             'input-offset': input_position,
+                             'output-offset': output_file.tell(),
+                             'ht': ht,
+                             'look-alike': look_alike_stats})
+    if os.path.exists(checkpoint_filename):
+        os.remove(checkpoint_filename)
+
+
+def write_shard_files(wb: Wildebeest, ht: dict, input_filename: str, output_filename: str, shard_index: int,
+                      n_shards: int, lang_code: str = '', skip_list_csv: str = '', checkpoint_every: int = 0,
+                      resume: bool = False, input_encoding: Optional[InputEncoding] = None,
+                      tsv_columns: Optional[dict] = None) -> None:
+    """
+    Normalizes shard shard_index of n_shards of an input file into its shard output file (see shard_filename),
+    and writes the shard's stats file and the concat manifest of all shards.
+    checkpoint_every, resume: see norm_clean_file_with_checkpoints
+    input_encoding, tsv_columns: see norm_clean_files
+    """
+    manifest_filename = f'{strip_compression_extension(output_filename)[0]}.manifest.json'
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_filename))
+    shards = []
+    for i in range(1, n_shards + 1):
+        start, end = shard_byte_range(input_filename, i, n_shards)
+        shards.append({'shard': i,
+                       'input-start': start,
+                       'input-end': end,
+                       'output': os.path.relpath(shard_filename(output_filename, i, n_shards), manifest_dir),
+                       'stats': os.path.relpath(shard_filename(output_filename, i, n_shards, '.stats.json'),
+                                                manifest_dir)})
+    shard = shards[shard_index - 1]
+    if checkpoint_every:
+        norm_clean_file_with_checkpoints(wb, ht, input_filename, shard_filename(output_filename, shard_index, n_shards),
+                                         lang_code=lang_code, checkpoint_every=checkpoint_every, resume=resume,
+                                         byte_range=(shard['input-start'], shard['input-end']),
+                                         input_encoding=input_encoding, tsv_columns=tsv_columns)
+    else:
+        with open_binary_file(shard_filename(output_filename, shard_index, n_shards), 'wb') as output_file:
+            wb.norm_clean_mmap_file(ht, input_filename, output_file, lang_code=lang_code,
+                                    byte_range=(shard['input-start'], shard['input-end']),
+                                    input_encoding=input_encoding, tsv_columns=tsv_columns)
+    look_alike_stats = wb.pop_look_alike_stats()
+    wb.merge_look_alike_stats(look_alike_stats)  # keep them for the caller
+    # Change locations (e.g. COUNT-digit-1) in shard stats are line numbers within the shard.
+    write_json_file(shard_filename(output_filename, shard_index, n_shards, '.stats.json'),
+                    {'shard': shard_index,
+                     'n-shards': n_shards,
+                     'input-start': shard['input-start'],
+                     'input-end': shard['input-end'],
+                     'ht': ht,
+                     'look-alike': look_alike_stats})
+    write_json_file(manifest_filename,
+                    {'wildebeest-version': __version__,
+                     'input': os.path.abspath(input_filename),
+                     'input-size': os.path.getsize(input_filename),
+                     'output': os.path.relpath(output_filename, manifest_dir),
+                     'lang-code': lang_code,
+                     'skip': skip_list_csv,
+                     'n-shards': n_shards,
+                     'shards': shards})
+
+
+def concat_shard_files(wb: Wildebeest, manifest_filename: str, ht: dict) -> str:
+    """
+    Concatenates the shard outputs listed in a concat manifest (see write_shard_files) into the output file
+    of the manifest, and merges the shard stats into ht and into wb's look-alike stats, so that output and stats
+    match those of a single unsharded run. (Compressed shard outputs are concatenated as multi-stream files.)
+    Returns the output filename.
+    """
+    with open(manifest_filename, encoding='utf-8') as f:
+        manifest = json.load(f)
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_filename))
+    missing_stats_filenames = [shard['stats'] for shard in manifest['shards']
+                               if not os.path.exists(os.path.join(manifest_dir, shard['stats']))]
+    if missing_stats_filenames:
+        raise ValueError(f"Unfinished shards (no stats file): {', '.join(missing_stats_filenames)}")
+    output_filename = os.path.join(manifest_dir, manifest['output'])
+    with open(output_filename, 'wb') as output_file:
+        for shard in manifest['shards']:
+            with open(os.path.join(manifest_dir, shard['output']), 'rb') as shard_output_file:
+                shutil.copyfileobj(shard_output_file, output_file, 1 << 20)
+            with open(os.path.join(manifest_dir, shard['stats']), encoding='utf-8') as f:
+                shard_stats = json.load(f)
+            # Renumber change locations from line numbers within the shard to line numbers within the file.
+            shard_ht = shard_stats['ht']
+            n_prev_lines = ht.get('NUMBER-OF-LINES', 0)
+            for key, value in shard_ht.items():
+                if re.match(r'COUNT-.*-\d+$', key) and value.isdigit():
+                    shard_ht[key] = str(int(value) + n_prev_lines)
+            wb.merge_ht(ht, shard_ht)
+            wb.merge_look_alike_stats(shard_stats['look-alike'])
+    return output_filename
+
+
+def parse_tsv_columns(tsv_columns_spec: str) -> dict:
+    """
+    Parses a specification of TSV columns, e.g. '2,3:eng' (1-based column numbers, each with an optional language
+    code), into a dictionary of 0-based column indices and language codes (None for the default), e.g. {1: None,
+    2: 'eng'} (see Wildebeest.norm_clean_tsv_line_batches). Raises ValueError for bad specifications.
+    """
+    tsv_columns = {}
+    for column_spec in re.split(r',\s*', tsv_columns_spec.strip()):
+        column_match = re.match(r'(\d+)(?::([a-z]*))?$', column_spec)
+        if not (column_match and int(column_match.group(1)) >= 1):
+            raise ValueError(f"bad TSV column '{column_spec}' (expected N or N:LANGUAGE-CODE with N >= 1, e.g. 3:fas)")
+        column_lang_code = column_match.group(2) or None
+        if column_lang_code == 'fa':
+            column_lang_code = 'fas'
+        tsv_columns[int(column_match.group(1)) - 1] = column_lang_code
+    return tsv_columns
+
+
+def batch_file_pairs(inputs_pattern: Optional[str] = None, input_manifest_filename: Optional[str] = None,
+                     output_dir: Optional[str] = None) -> List[Tuple[str, str]]:
+    """
+    Returns the (input filename, output filename) pairs of a batch of files (see norm_clean_file_batch),
+    either for the files matching a glob pattern (e.g. 'packs/*/docs/**/*.txt'), written to output_dir
+    with their paths relative to the part of the pattern before the first wildcard,
+    or for the lines of an input manifest file, each with an input filename and optionally (after a tab)
+    an output filename (default: output_dir and the input's basename). Relative filenames in a manifest are
+    relative to the manifest's directory. Empty lines and lines starting with # are ignored.
+    """
+    file_pairs = []
+    if inputs_pattern is not None:
+        if output_dir is None:
+            raise ValueError('a glob pattern of input files requires an output directory')
+        root_dir_components = []
+        for component in inputs_pattern.split(os.sep)[:-1]:
+            if re.search(r'[*?\[]', component):
+                break
+            root_dir_components.append(component)
+        root_dir = os.sep.join(root_dir_components) or '.'
+        if inputs_pattern.startswith(os.sep) and not root_dir_components[1:]:
+            root_dir = os.sep
+        for input_filename in sorted(glob.glob(inputs_pattern, recursive=True)):
+            if os.path.isfile(input_filename):
+                file_pairs.append((input_filename,
+                                   os.path.join(output_dir, os.path.relpath(input_filename, root_dir))))
+    else:
+        manifest_dir = os.path.dirname(os.path.abspath(input_manifest_filename))
+        with open(input_manifest_filename, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.rstrip('\n')
+                if not line.strip() or line.startswith('#'):
+                    continue
+                input_filename, _, output_filename = line.partition('\t')
+                if output_filename:
+                    output_filename = os.path.join(manifest_dir, output_filename)
+                elif output_dir is None:
+                    raise ValueError(f'no output filename in line {line_number} of {input_manifest_filename} '
+                                     f'and no output directory')
+                else:
+                    output_filename = os.path.join(output_dir, os.path.basename(input_filename))
+                file_pairs.append((os.path.join(manifest_dir, input_filename), output_filename))
+    output_filenames = set()
+    for input_filename, output_filename in file_pairs:
+        if os.path.abspath(output_filename) == os.path.abspath(input_filename):
+            raise ValueError(f'output file would overwrite input file {input_filename}')
+        if output_filename in output_filenames:
+            raise ValueError(f'several input files would be written to {output_filename}')
+        output_filenames.add(output_filename)
+    return file_pairs
+
+
+def batch_stats_filename(output_filename: str) -> str:
+    """corpus.clean.txt.gz -> corpus.clean.txt.gz.stats.json (distinct from that of corpus.clean.txt)"""
+    return f'{output_filename}.stats.json'
+
+
+def batch_output_is_up_to_date(input_filename: str, output_filename: str, lang_code: str, skip_list_csv: str) -> bool:
+    """
+    True if an output file is newer than its input file and its stats file (written last, see
+    norm_clean_batch_file) shows that it was written by this version with the same language code and skipped steps.
+    """
+    try:
+        if os.path.getmtime(output_filename) < os.path.getmtime(input_filename):
+            return False
+        with open(batch_stats_filename(output_filename), encoding='utf-8') as f:
+            file_stats = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (file_stats.get('wildebeest-version'), file_stats.get('lang-code'), file_stats.get('skip')) \
+        == (__version__, lang_code, skip_list_csv)
+
+
+def norm_clean_batch_file(wb: Wildebeest, input_filename: str, output_filename: str, lang_code: str = '',
+                          skip_list_csv: str = '', tsv_columns: Optional[dict] = None) -> Tuple[dict, dict]:
+    """
+    Normalizes a file of a batch (see norm_clean_file_batch) and writes its stats file.
+    Returns the change stats (ht) and look-alike stats of the file.
+    """
+    ht = {}
+    if skip_list_csv != '':
+        for skip_elem in re.split(r',\s*', skip_list_csv):
+            ht[f'SKIP-{skip_elem}'] = 1
+    output_dir = os.path.dirname(output_filename)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    stats_filename = batch_stats_filename(output_filename)
+    if os.path.exists(stats_filename):
+        os.remove(stats_filename)  # an interrupted run must not leave an output that looks up to date
+    look_alike_stats = wb.new_look_alike_stats()  # of this file only, not wb's own look-alike stats
+    norm_clean_files(wb, ht, open_binary_file(input_filename, 'rb'), open_binary_file(output_filename, 'wb'),
+                     input_filename, output_filename, lang_code=lang_code, look_alike_stats=look_alike_stats,
+                     tsv_columns=tsv_columns)
+    write_json_file(stats_filename,
+                    {'wildebeest-version': __version__,
+                     'input': os.path.abspath(input_filename),
+                     'lang-code': lang_code,
+                     'skip': skip_list_csv,
+                     'ht': ht,
+                     'look-alike': look_alike_stats})
+    return ht, look_alike_stats
+
+
+def norm_clean_file_batch(wb: Wildebeest, ht: dict, file_pairs: List[Tuple[str, str]], lang_code: str = '',
+                          skip_list_csv: str = '', n_workers: int = 1, tsv_columns: Optional[dict] = None) -> dict:
+    """
+    Normalizes a batch of files (see batch_file_pairs) in a single process or in a pool of n_workers processes,
+    each with a Wildebeest that is built only once, rather than in one process per file.
+    Each output file gets a stats file (see batch_stats_filename). Output files that are up to date
+    (see batch_output_is_up_to_date) are skipped.
+    The stats of the normalized files are merged into ht and wb's look-alike stats, with change locations
+    as INPUT-FILENAME:LINE-NUMBER.
+    tsv_columns: TSV mode (see Wildebeest.norm_clean_tsv_line_batches)
+    Returns a summary with the number of files, and of those normalized and skipped.
+    """
+    pending_pairs = [(input_filename, output_filename) for input_filename, output_filename in file_pairs
+                     if not batch_output_is_up_to_date(input_filename, output_filename, lang_code, skip_list_csv)]
+    input_filenames = [file_pair[0] for file_pair in pending_pairs]
+    output_filenames = [file_pair[1] for file_pair in pending_pairs]
+    if n_workers > 1 and len(pending_pairs) > 1:
+        skip_steps = wb.skip_steps.union(key[5:] for key in ht if key.startswith('SKIP-'))
+        from concurrent.futures import ProcessPoolExecutor  # imported here for faster script startup
+        executor = ProcessPoolExecutor(max_workers=n_workers, initializer=init_worker_wildebeest,
+                                       initargs=(wb.line_cache_size, False, skip_steps, lang_code,
+                                                 wb.decode_errors == 'wildebeest-windows1252'))
+        # Many small files: hand them to the workers in groups.
+        chunk_size = max(1, min(64, len(pending_pairs) // (4 * n_workers)))
+        file_results = executor.map(norm_clean_worker_batch_file, input_filenames, output_filenames,
+                                    [lang_code] * len(pending_pairs), [skip_list_csv] * len(pending_pairs),
+                                    [tsv_columns] * len(pending_pairs), chunksize=chunk_size)
+    else:
+        executor = None
+        file_results = (norm_clean_batch_file(wb, input_filename, output_filename, lang_code=lang_code,
+                                              skip_list_csv=skip_list_csv, tsv_columns=tsv_columns)
+                        for input_filename, output_filename in pending_pairs)
+    try:
+        for input_filename, (file_ht, look_alike_stats) in zip(input_filenames, file_results):
+            for key, value in file_ht.items():
+                if re.match(r'COUNT-.*-\d+$', key) and isinstance(value, str):
+                    file_ht[key] = f'{input_filename}:{value}'
+            wb.merge_ht(ht, file_ht)
+            wb.merge_look_alike_stats(look_alike_stats)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return {'files': len(file_pairs),
+            'normalized': len(pending_pairs),
+            'up-to-date': len(file_pairs) - len(pending_pairs)}
+
+
+def table_fingerprint(tables: dict) -> str:
+    """
+    Returns a hash of the contents of the tables of a table artifact (see Wildebeest.table_artifact_dict),
+    independent of the layout of the character type table.
+    """
+    import hashlib  # imported here for faster script startup
+    block_index, values = tables['char_type_block_index'], tables['char_type_values']
+    char_type_blocks = [(block, values[block_index[block]:block_index[block] + 256].tobytes())
+                        for block in range(len(block_index)) if block_index[block]]
+    data = pickle.dumps((char_type_blocks, sorted(tables['mapping_dict'].items()),
+                         sorted(tables['look_alike_dict'].items())), protocol=4)
+    return hashlib.sha256(data).hexdigest()
+
+
+def table_changed_chars(old_tables: dict, new_tables: dict) -> set:
+    """
+    Returns the characters whose table entries differ between two table artifacts (see Wildebeest.table_artifact_dict):
+    characters with another character type vector, and the characters of mapping and look-alike entries that were
+    added, removed or changed. Characters that any (old or new) mapping maps to a string with such characters
+    are included as well, as the next step that is applied to that string may differ, and likewise the Hangul jamo
+    from which normalize_hangul computes Hangul syllables (rather than by table), if any such syllable changed.
+    """
+    changed_chars = set()
+    old_block_index, old_values = old_tables['char_type_block_index'], old_tables['char_type_values']
+    new_block_index, new_values = new_tables['char_type_block_index'], new_tables['char_type_values']
+    for block in range(len(new_block_index)):
+        old_offset, new_offset = old_block_index[block], new_block_index[block]
+        if old_offset or new_offset:
+            for code_point in range(256):
+                if old_values[old_offset + code_point] != new_values[new_offset + code_point]:
+                    changed_chars.add(chr((block << 8) + code_point))
+    mappings = set()  # (source, target) of mappings and look-alikes
+    for table_name in ('mapping_dict', 'look_alike_dict'):
+        old_dict, new_dict = old_tables[table_name], new_tables[table_name]
+        for key in old_dict.keys() | new_dict.keys():
+            # Look-alike keys are of the form 'Latin Cyrillic A'
+            source = key.split(' ')[-1] if table_name == 'look_alike_dict' else key
+            for value in (old_dict.get(key), new_dict.get(key)):
+                if value is not None:
+                    mappings.add((source, value))
+            if old_dict.get(key) != new_dict.get(key):
+                changed_chars.update(source)
+    hangul_jamo = set(chain(map(chr, range(0x1100, 0x1113)), map(chr, range(0x1161, 0x1176)),
+                            map(chr, range(0x11A8, 0x11C3))))
+    n_changed_chars = None
+    while n_changed_chars != len(changed_chars):
+        n_changed_chars = len(changed_chars)
+        for source, target in mappings:
+            if not changed_chars.isdisjoint(target):
+                changed_chars.update(source)
+        if not hangul_jamo <= changed_chars and any('\uAC00' <= char <= '\uD7A3' for char in changed_chars):
+            changed_chars.update(hangul_jamo)
+    return changed_chars
+
+
+def norm_clean_file_with_index(wb: Wildebeest, ht: dict, input_filename: str, output_filename: str,
+                               lang_code: str = '', block_size: int = 1 << 22,
+                               input_encoding: Optional[InputEncoding] = None) -> None:
+    """
+    Normalizes an (uncompressed) input file into an (uncompressed) output file, with the same output and stats as
+    Wildebeest.norm_clean_mmap_file, and writes a sidecar index OUTPUT-FILENAME.index.json for incremental
+    re-normalization after table changes (see renorm_file_since_tables). For each block of about block_size bytes,
+    the index records its input and output byte ranges, its number of lines and the distinct characters of its lines.
+    input_encoding: see norm_clean_files
+    """
+    if input_encoding is None:
+        input_encoding = wb.default_input_encoding
+    blocks = []
+    with open(input_filename, 'rb') as input_file, open(output_filename, 'wb') as output_file:
+        if os.fstat(input_file.fileno()).st_size:
+            with mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as mm_view:
+                for start, end in iter_mmap_block_ranges(mm, 0, len(mm), block_size):
+                    lines = decode_lines(mm_view[start:end], input_encoding.errors, input_encoding.encoding)
+                    output_start = output_file.tell()
+                    wb.norm_clean_line_batches(ht, [lines], output_file, lang_code=lang_code,
+                                               start_line_number=ht.get('NUMBER-OF-LINES', 0),
+                                               input_encoding=input_encoding)
+                    # Characters of the lines as normalized
+                    chars = set(''.join(map(undo_double_encoding, lines) if input_encoding.undo_double_encoding
+                                        else lines))
+                    blocks.append({'input-start': start,
+                                   'input-end': end,
+                                   'output-start': output_start,
+                                   'output-end': output_file.tell(),
+                                   'lines': len(lines),
+                                   'chars': ''.join(sorted(chars))})
+    write_table_index(f'{output_filename}.index.json', input_filename, ht, lang_code, input_encoding,
+                      table_fingerprint(wb.table_artifact_dict()), blocks)
+
+
+def write_table_index(index_filename: str, input_filename: str, ht: dict, lang_code: str,
+                      input_encoding: InputEncoding, tables: str, blocks: List[dict]) -> None:
+    """Writes the sidecar index of an output file (see norm_clean_file_with_index)."""
+    # Characters are written as JSON escapes, as they may include undecodable bytes (surrogates).
+    write_json_file(index_filename,
+                    {'wildebeest-version': __version__,
+                     'input': os.path.abspath(input_filename),
+                     'input-size': os.path.getsize(input_filename),
+                     'lang-code': lang_code,
+                     'skip': sorted(key for key in ht if key.startswith('SKIP-')),
+                     'decode-errors': input_encoding.errors,
+                     'input-encoding': input_encoding.encoding,
+                     'undo-double-encoding': input_encoding.undo_double_encoding,
+                     'tables': tables,
+                     'blocks': blocks},
+                    ensure_ascii=True)
+
+
+def copy_byte_range(input_file: BinaryIO, output_file: BinaryIO, start: int, end: int) -> None:
+    input_file.seek(start)
+    while start < end:
+        data = input_file.read(min(end - start, 1 << 20))
+        if not data:
+            raise ValueError(f'{input_file.name} ends before byte {end}')
+        output_file.write(data)
+        start += len(data)
+
+
+def renorm_file_since_tables(wb: Wildebeest, ht: dict, input_filename: str, output_filename: str,
+                             old_tables_filename: str, lang_code: str = '',
+                             patched_output_filename: Optional[str] = None) -> dict:
+    """
+    Brings an output file up to date with the current tables, i.e. to the output of normalizing the input file with
+    the current tables, where the output file and its index (see norm_clean_file_with_index) were written with the
+    tables of an older table artifact, e.g. a copy of the artifact kept before rebuilding the mapping files.
+    Only lines with characters whose table entries changed (see table_changed_chars) are normalized again;
+    all other output is copied from the output file, and blocks without such characters are not even decoded.
+    The result (with its index) replaces the output file, unless patched_output_filename is given.
+    Changes of this script itself are not covered, so the index must have been written by the same version.
+    Of the characters that steps compute by code rather than by table, only Hangul syllables are traced to the
+    characters they are computed from (see table_changed_chars).
+    ht receives the change stats of the re-normalized lines. Returns a summary.
+    """
+    index_filename = f'{output_filename}.index.json'
+    with open(index_filename, encoding='utf-8') as f:
+        index = json.load(f)
+    blocks = index['blocks']
+    if index['wildebeest-version'] != __version__:
+        raise ValueError(f"Index {index_filename} was written by wildebeest version {index['wildebeest-version']}, "
+                         f'not {__version__}; please normalize the whole input file again')
+    if (index['input'], index['input-size']) != (os.path.abspath(input_filename), os.path.getsize(input_filename)):
+        raise ValueError(f"Index {index_filename} is for a different input: {index['input']}")
+    if index['lang-code'] != lang_code or set(index['skip']) != {key for key in ht if key.startswith('SKIP-')}:
+        raise ValueError(f'Index {index_filename} is for a different language code or skip list')
+    if os.path.getsize(output_filename) != (blocks[-1]['output-end'] if blocks else 0):
+        raise ValueError(f'Output file {output_filename} does not match its index {index_filename}')
+    old_tables = Wildebeest.read_table_artifact(old_tables_filename)
+    if table_fingerprint(old_tables) != index['tables']:
+        raise ValueError(f'{output_filename} was not normalized with the tables of {old_tables_filename}')
+    new_tables = wb.table_artifact_dict()
+    changed_chars = table_changed_chars(old_tables, new_tables)
+    summary = {'changed-chars': len(changed_chars), 'blocks': len(blocks), 'renormalized-blocks': 0,
+               'lines': sum(block['lines'] for block in blocks), 'renormalized-lines': 0, 'changed-lines': 0}
+    if not changed_chars and patched_output_filename is None:
+        return summary
+    changed_char_re = re.compile(f"[{''.join(map(re.escape, sorted(changed_chars)))}]") if changed_chars else None
+    input_encoding = InputEncoding(index['input-encoding'], index['decode-errors'], index['undo-double-encoding'])
+    plan = wb.ht_ncs_plan(ht, lang_code)
+    stats = plan.new_stats()
+    new_output_filename = patched_output_filename or f'{output_filename}.tmp{os.getpid()}'
+    new_blocks = []
+    line_number = 0
+    with open(input_filename, 'rb') as input_file, open(output_filename, 'rb') as old_output_file, \
+            open(new_output_filename, 'wb') as new_output_file:
+        for block in blocks:
+            new_block = dict(block, **{'output-start': new_output_file.tell()})
+            if changed_chars.isdisjoint(block['chars']):
+                copy_byte_range(old_output_file, new_output_file, block['output-start'], block['output-end'])
+            else:
+                input_file.seek(block['input-start'])
+                lines = decode_lines(input_file.read(block['input-end'] - block['input-start']),
+                                     input_encoding.errors, input_encoding.encoding)
+                if input_encoding.undo_double_encoding:
+                    lines = list(map(undo_double_encoding, lines))
+                lines = [line.rstrip() for line in lines]
+                old_output_file.seek(block['output-start'])
+                old_output = old_output_file.read(block['output-end'] - block['output-start'])
+                output_lines = old_output.decode('utf-8', errors='surrogateescape').split('\n')[:-1]
+                if len(output_lines) == len(lines):
+                    line_indices = [i for i, line in enumerate(lines) if changed_char_re.search(line)]
+                else:  # normalization changed the number of lines of the block (line breaks), so redo all
+                    line_indices = list(range(len(lines)))
+                    output_lines = [None] * len(lines)
+                loc_ids = [str(line_number + i + 1) for i in line_indices]
+                renormalized_lines = wb.norm_clean_plan_batch([lines[i] for i in line_indices], plan, stats,
+                                                              loc_ids=loc_ids)
+                for line_index, s in zip(line_indices, renormalized_lines):
+                    if s != output_lines[line_index]:
+                        output_lines[line_index] = s
+                        summary['changed-lines'] += 1
+                output_lines.append('')
+                new_output_file.write('\n'.join(output_lines).encode('utf-8', errors='ignore'))
+                summary['renormalized-blocks'] += 1
+                summary['renormalized-lines'] += len(line_indices)
+            line_number += block['lines']
+            new_block['output-end'] = new_output_file.tell()
+            new_blocks.append(new_block)
+    stats.add_to_ht(ht)
+    if patched_output_filename is None:
+        os.replace(new_output_filename, output_filename)
+    write_table_index(f'{patched_output_filename or output_filename}.index.json', input_filename, ht, lang_code,
+                      input_encoding, table_fingerprint(new_tables), new_blocks)
+    return summary
+
+
+# Wildebeest instance of a worker process in norm_clean_lines_in_parallel, kept warm across chunks.
+worker_wb: Optional[Wildebeest] = None
+
+
+def init_worker_wildebeest(line_cache_size: int = 0, profile: bool = False,
+                           skip_steps: Iterable[str] = (), lang_code: str = '',
+                           repair_undecodable_bytes: bool = False) -> None:
+    global worker_wb
+    worker_wb = Wildebeest(line_cache_size=line_cache_size, skip_steps=skip_steps, lang_code=lang_code,
+                           repair_undecodable_bytes=repair_undecodable_bytes)
+    if profile:
+        worker_wb.enable_profile()
+
+
+def norm_clean_chunk(lines: List[str], start_line_number: int) -> Tuple[str, NormCleanStats, dict, dict]:
+    """
+    Worker function of norm_clean_lines_in_parallel.
+    Returns output text, change stats, look-alike stats and worker stats (line cache hits and misses, profile).
+    """
+    plan = worker_wb.ncs_plan(worker_wb.lang_code)
+    stats = plan.new_stats()
+    cache_hits, cache_misses = worker_wb.line_cache_hits, worker_wb.line_cache_misses
+    if worker_wb.profile_dict is not None:
+        worker_wb.enable_profile()  # restart profile for this chunk
+        start_time = time.perf_counter()
+    loc_ids = [str(line_number) for line_number in range(start_line_number + 1, start_line_number + len(lines) + 1)]
+    output_lines = worker_wb.norm_clean_plan_batch([line.rstrip() for line in lines], plan, stats, loc_ids=loc_ids)
+    if worker_wb.profile_dict is not None:
+        worker_wb.add_profile_time(worker_wb.profile_dict, 'TIME-NORMALIZATION', start_time)
+    output_lines.append('')
+    worker_stats = {'line-cache-hits': worker_wb.line_cache_hits - cache_hits,
+                    'line-cache-misses': worker_wb.line_cache_misses - cache_misses,
+                    'profile': worker_wb.profile_dict}
+    return '\n'.join(output_lines), stats, worker_wb.pop_look_alike_stats(), worker_stats
+
+
+def analyze_shard(input_filename: str, byte_range: Tuple[int, int], input_encoding: InputEncoding) -> NormCleanAnalysis:
+    """Worker function of Wildebeest.analyze_file_in_parallel."""
+    return worker_wb.analyze_file({}, input_filename, byte_range=byte_range, input_encoding=input_encoding)
+
+
+def norm_clean_worker_batch_file(input_filename: str, output_filename: str, lang_code: str,
+                                 skip_list_csv: str, tsv_columns: Optional[dict]) -> Tuple[dict, dict]:
+    """Worker function of norm_clean_file_batch."""
+    return norm_clean_batch_file(worker_wb, input_filename, output_filename, lang_code=lang_code,
+                                 skip_list_csv=skip_list_csv, tsv_columns=tsv_columns)
+
+
+def write_analysis_report(output_file: BinaryIO, report: dict) -> None:
+    # Undecodable bytes (surrogates) are written as JSON escapes, e.g. \udcc3
+    output_file.write(json.dumps(report, indent=2, ensure_ascii=False).encode('utf-8', errors='backslashreplace'))
+    output_file.write(b'\n')
+
+
+# noinspection SpellCheckingInspection
+def main(argv):
+    """Wrapper around normalization/cleaning that takes care of argument parsing and prints change stats to STDERR."""
+    # parse arguments
+    all_skip_elems = ['repair-encodings-errors', 'del-surrogate', 'del-ctrl-char', 'del-arabic-diacr',
+                      'del-hebrew-diacr', 'core-compat', 'pres-form', 'ligatures', 'signs-and-symbols', 'cjk',
+                      'width', 'font', 'small', 'vertical', 'enclosure', 'hangul',
+                      'repair-combining', 'combining-compose', 'combining-decompose',
+                      'punct', 'punct-dash', 'punct-arabic', 'punct-cjk', 'punct-greek', 'punct-misc-f',
+                      'space', 'digit', 'arabic-char', 'farsi-char', 'pashto-char', 'georgian-char',
+                      'look-alike', 'repair-xml', 'repair-url-escapes', 'repair-token']
+    skip_help = f"comma-separated list of normalization/cleaning steps to be skipped: {','.join(all_skip_elems)} \
+    (default: nothing skipped)"
+    parser = argparse.ArgumentParser(description='Normalizes and cleans a given text')
+    parser.add_argument('-i', '--input', type=str, default=None, metavar='INPUT-FILENAME',
+                        help='(default: STDIN; .gz, .bz2, .xz, .zst files are decompressed)')
+    parser.add_argument('-o', '--output', type=str, default=None, metavar='OUTPUT-FILENAME',
+                        help='(default: STDOUT; .gz, .bz2, .xz, .zst files are compressed)')
+    parser.add_argument('--lc', type=str, default='', metavar='LANGUAGE-CODE', help="ISO 639-3, e.g. 'fas' for Persian")
+    parser.add_argument('--skip', type=str, default='', metavar='NORM-STEPS', help=skip_help)
+    parser.add_argument('--sniff-encoding', action='store_true',
+                        help='classify the (uncompressed) input file as clean UTF-8, Windows-1252 or double-encoded '
+                             'based on samples, and pick a fast path accordingly (Windows-1252 files are decoded as '
+                             'such, double encoding is undone; the decision is logged with --verbose)')
+    parser.add_argument('--repair-undecodable-bytes', action='store_true',
+                        help='decode bytes that are not valid UTF-8 as Windows-1252/Latin-1 characters when reading '
+                             'the input (default: read them as surrogates, repaired by repair-encodings-errors '
+                             'only in lines with other encoding errors, otherwise deleted by del-surrogate)')
+    parser.add_argument('--analyze', action='store_true',
+                        help='instead of normalizing the input, write a JSON report (to OUTPUT-FILENAME) of the steps '
+                             'that would be applied, to how many lines, and the characters that trigger them, '
+                             'based on a code point histogram; with --workers, shards of an uncompressed input file '
+                             'are analyzed in parallel')
+    parser.add_argument('--tsv-columns', type=str, default=None, metavar='COLUMNS',
+                        help="normalize only the given tab-separated fields, e.g. '2,3:eng' for columns 2 and 3 "
+                             '(1-based), with the language code of --lc for column 2 and eng for column 3; '
+                             'other fields are copied unchanged')
+    parser.add_argument('--inputs', type=str, default=None, metavar='GLOB',
+                        help="normalize all files matching a (quoted) glob pattern, e.g. 'docs/**/*.txt', in a single "
+                             'process (or --workers processes) into --output-dir, each with a stats file '
+                             'OUTPUT-FILENAME.stats.json; outputs that are up to date are skipped')
+    parser.add_argument('--input-manifest', type=str, default=None, metavar='MANIFEST-FILENAME',
+                        help='like --inputs, for the files listed in a manifest file, one INPUT-FILENAME '
+                             '(optionally followed by a tab and OUTPUT-FILENAME) per line')
+    parser.add_argument('--output-dir', type=str, default=None, metavar='DIR',
+                        help='output directory for --inputs and --input-manifest')
+    parser.add_argument('--workers', type=int, default=1, metavar='N',
+                        help='number of worker processes (default: 1, i.e. no parallel processing)')
+    parser.add_argument('--threads', type=int, default=1, metavar='N',
+                        help='number of threads that share one Wildebeest and its tables, an alternative to '
+                             '--workers with less memory (default: 1, i.e. no threads)')
+    parser.add_argument('--line-cache-size', type=int, default=0, metavar='N',
+                        help='cache the results for up to N distinct lines, for corpora with many repeated lines '
+                             '(default: 0, i.e. no cache; with --workers, each worker has its own cache)')
+    parser.add_argument('--profile', type=str, default=None, metavar='PROFILE-FILENAME',
+                        help='record wall time per normalization step, prescan and I/O; write as JSON to file')
+    parser.add_argument('--shard', type=str, default=None, metavar='I/N',
+                        help='normalize only shard I of N (1 <= I <= N) of the (uncompressed) input file, '
+                             'i.e. a newline-aligned byte range; writes OUTPUT-FILENAME.shard-I-of-N, '
+                             'its stats file and a concat manifest OUTPUT-FILENAME.manifest.json')
+    parser.add_argument('--concat-manifest', type=str, default=None, metavar='MANIFEST-FILENAME',
+                        help='concatenate the outputs of all shards of a manifest (see --shard) into its output file '
+                             'and merge their stats')
+    parser.add_argument('--checkpoint-every', type=int, default=0, metavar='N',
+                        help='write a checkpoint (input/output byte offsets and stats) about every N lines to '
+                             'OUTPUT-FILENAME.checkpoint.json (uncompressed input and output files only)')
+    parser.add_argument('--resume', action='store_true',
+                        help='resume an interrupted run from its checkpoint (see --checkpoint-every)')
+    parser.add_argument('--write-index', action='store_true',
+                        help='write a sidecar index OUTPUT-FILENAME.index.json (characters per block of lines) '
+                             'for --since-tables (uncompressed input and output files only)')
+    parser.add_argument('--since-tables', type=str, default=None, metavar='OLD-TABLE-ARTIFACT',
+                        help='bring OUTPUT-FILENAME, written with --write-index and the tables of OLD-TABLE-ARTIFACT '
+                             '(e.g. a copy of data/wildebeest-tables.pickle from before rebuilding the mapping '
+                             'files), up to date with the current tables, re-normalizing only lines with characters '
+                             'whose table entries changed; OUTPUT-FILENAME is replaced unless --patched-output')
+    parser.add_argument('--patched-output', type=str, default=None, metavar='FILENAME',
+                        help='with --since-tables: write the result (and its index) to this file instead')
+    parser.add_argument('-v', '--verbose', action='count', default=0, help='write change log etc. to STDERR')
+    parser.add_argument('--version', action='version',
+                        version=f'%(prog)s {__version__} last modified: {last_mod_date}')
+    args = parser.parse_args(argv)
+    lang_code = args.lc
+    skip_list_csv = args.skip
+    shard_index, n_shards = None, None
+    if args.shard:
+        shard_match = re.match(r'(\d+)/(\d+)$', args.shard)
+        if not (shard_match and 1 <= int(shard_match.group(1)) <= int(shard_match.group(2))):
+            sys.exit(f"Error: bad --shard '{args.shard}' (expected I/N with 1 <= I <= N, e.g. 3/16)")
+        shard_index, n_shards = int(shard_match.group(1)), int(shard_match.group(2))
+        if not (args.input and os.path.isfile(args.input) and not strip_compression_extension(args.input)[1]):
+            sys.exit('Error: --shard requires an uncompressed input file (--input)')
+        if not args.output:
+            sys.exit('Error: --shard requires an output filename (--output)')
+        if args.workers > 1:
+            sys.exit('Error: --shard and --workers are mutually exclusive')
+    if args.analyze and (args.shard or args.concat_manifest or args.checkpoint_every or args.profile):
+        sys.exit('Error: --analyze cannot be combined with --shard, --concat-manifest, --checkpoint-every, --profile')
+    if args.write_index or args.since_tables:
+        if not (args.input and os.path.isfile(args.input) and not strip_compression_extension(args.input)[1]
+                and args.output and not strip_compression_extension(args.output)[1]):
+            sys.exit('Error: --write-index and --since-tables require uncompressed input and output files '
+                     '(--input, --output)')
+        if args.workers > 1 or args.shard or args.concat_manifest or args.checkpoint_every or args.analyze:
+            sys.exit('Error: --write-index and --since-tables cannot be combined with --workers, --shard, '
+                     '--concat-manifest, --checkpoint-every, --analyze')
+    if args.threads > 1 and (args.workers > 1 or args.shard or args.concat_manifest or args.checkpoint_every
+                             or args.write_index or args.since_tables or args.analyze or args.profile):
+        sys.exit('Error: --threads cannot be combined with --workers, --shard, --concat-manifest, --checkpoint-every, '
+                 '--write-index, --since-tables, --analyze, --profile')
+    tsv_columns = None
+    if args.tsv_columns:
+        try:
+            tsv_columns = parse_tsv_columns(args.tsv_columns)
+        except ValueError as error:
+            sys.exit(f'Error: {error}')
+        if args.workers > 1 or args.threads > 1 or args.analyze or args.profile or args.write_index \
+                or args.since_tables:
+            sys.exit('Error: --tsv-columns cannot be combined with --workers, --threads, --analyze, --profile, '
+                     '--write-index, --since-tables')
+    if args.inputs or args.input_manifest:
+        if args.inputs and args.input_manifest:
+            sys.exit('Error: --inputs and --input-manifest are mutually exclusive')
+        if args.input or args.output:
+            sys.exit('Error: --inputs and --input-manifest cannot be combined with --input, --output')
+        if args.shard or args.concat_manifest or args.checkpoint_every or args.write_index or args.since_tables \
+                or args.analyze or args.profile or args.threads > 1 or args.sniff_encoding:
+            sys.exit('Error: --inputs and --input-manifest cannot be combined with --shard, --concat-manifest, '
+                     '--checkpoint-every, --write-index, --since-tables, --analyze, --profile, --threads, '
+                     '--sniff-encoding')
+    elif args.output_dir:
+        sys.exit('Error: --output-dir requires --inputs or --input-manifest')
+    if args.patched_output and not args.since_tables:
+        sys.exit('Error: --patched-output requires --since-tables')
+    if args.resume and not args.checkpoint_every:
+        sys.exit('Error: --resume requires --checkpoint-every')
+    if args.checkpoint_every:
+        if not (args.input and os.path.isfile(args.input) and not strip_compression_extension(args.input)[1]
+                and args.output and not strip_compression_extension(args.output)[1]):
+            sys.exit('Error: --checkpoint-every requires uncompressed input and output files (--input, --output)')
+        if args.workers > 1:
+            sys.exit('Error: --checkpoint-every and --workers are mutually exclusive')
+
+    # Open any input or output files. Files are read and written as UTF-8 bytes, independent of PYTHONIOENCODING.
+    input_file, output_file = None, None
+    if not (args.shard or args.concat_manifest or args.checkpoint_every or args.write_index or args.since_tables
+            or args.inputs or args.input_manifest):
+        try:
+            if not args.analyze:  # analyzed files are opened (and memory-mapped) by Wildebeest.analyze_file
+                input_file = open_binary_file(args.input, 'rb')
+            output_file = open_binary_file(args.output, 'wb')
+        except (OSError, ValueError) as error:
+            sys.exit(f'Error: {error}')
+
+    ht = {}
+    if skip_list_csv != '':
+        for skip_elem in re.split(r',\s*', skip_list_csv):
+            ht[f'SKIP-{skip_elem}'] = 1
+    # Add a little language code robustness for Persian language code, more comprehensive solution to come
+    if lang_code == 'fa':
+        lang_code = 'fas'
+    # Only tables needed for the steps that are not skipped are loaded (all tables for table indexes).
+    skip_steps = [] if (args.write_index or args.since_tables) else [key[5:] for key in ht]
+    wb = Wildebeest(line_cache_size=args.line_cache_size, skip_steps=skip_steps, lang_code=lang_code,
+                    repair_undecodable_bytes=args.repair_undecodable_bytes)
+    start_time = datetime.datetime.now()
+    if args.verbose:
+        log.info(f'Start: {start_time}')
+        log.info('Script wildebeest_normalize.py')
+        if args.input:
+            log.info(f'Input: {args.input}')
+        if args.output:
+            log.info(f'Output: {args.output}')
+        if args.inputs or args.input_manifest:
+            log.info(f'Inputs: {args.inputs or args.input_manifest}')
+        if args.output_dir:
+            log.info(f'Output directory: {args.output_dir}')
+        if args.skip:
+            log.info(f'Skip: {args.skip}')
+        if lang_code:
+            log.info(f'ISO 639-3 language code: {lang_code}')
+        if args.tsv_columns:
+            log.info(f'TSV columns: {args.tsv_columns}')
+        if args.workers > 1:
+            log.info(f'Workers: {args.workers}')
+        if args.threads > 1:
+            log.info(f'Threads: {args.threads}')
+        if args.shard:
+            log.info(f'Shard: {shard_index} of {n_shards}')
+    input_encoding = wb.default_input_encoding
+    if args.sniff_encoding:
+        if args.input and os.path.isfile(args.input) and not strip_compression_extension(args.input)[1]:
+            sniff = sniff_encoding(args.input)
+            input_encoding, decision = wb.input_encoding_for_sniff(sniff)
+            if args.verbose:
+                log.info(f"Encoding sniff: {sniff['encoding']} ({sniff['sampled-bytes']} bytes sampled, "
+                         f"{sniff['invalid-bytes']} not UTF-8, {sniff['non-ascii-chars']} non-ASCII characters, "
+                         f"{sniff['double-encoded-chars']} in double-encoded sequences) -> {decision}")
+        elif args.verbose:
+            log.info('Encoding sniff: skipped (requires an uncompressed input file)')
+    if args.profile:
+        wb.enable_profile()
+    # The following line is the core call. ht is a dictionary (empty if no steps are to be skipped).
+    if args.analyze:
+        try:
+            if args.workers > 1 and args.input and os.path.isfile(args.input) \
+                    and not strip_compression_extension(args.input)[1]:
+                analysis = wb.analyze_file_in_parallel(ht, args.input, lang_code=lang_code, n_workers=args.workers,
+                                                       input_encoding=input_encoding)
+            else:
+                analysis = wb.analyze_file(ht, args.input, lang_code=lang_code, input_encoding=input_encoding)
+            report = wb.analysis_report(analysis, wb.ht_ncs_plan(ht, lang_code))
+            write_analysis_report(output_file, report)
+        finally:
+            if args.output not in (None, '-'):
+                output_file.close()
+        if args.verbose:
+            log.info(f"Analysis: {report['number-of-lines']} lines, {report['number-of-chars']} characters "
+                     f"({report['distinct-chars']} distinct)")
+            for step in report['steps']:
+                trigger_chars = ' '.join(entry['code-point'] for entry in step['trigger-chars'][:5])
+                log.info(f"   {step['step']}: {step['lines']} lines ({trigger_chars})")
+        return
+    elif args.since_tables:
+        try:
+            summary = renorm_file_since_tables(wb, ht, args.input, args.output, args.since_tables, lang_code=lang_code,
+                                               patched_output_filename=args.patched_output)
+        except (OSError, ValueError, KeyError) as error:
+            sys.exit(f'Error: {error}')
+        log.info(f"Tables changed for {summary['changed-chars']} characters: re-normalized "
+                 f"{summary['renormalized-lines']} of {summary['lines']} lines "
+                 f"(in {summary['renormalized-blocks']} of {summary['blocks']} blocks), "
+                 f"{summary['changed-lines']} lines changed")
+    elif args.inputs or args.input_manifest:
+        try:
+            file_pairs = batch_file_pairs(args.inputs, args.input_manifest, args.output_dir)
+            summary = norm_clean_file_batch(wb, ht, file_pairs, lang_code=lang_code, skip_list_csv=skip_list_csv,
+                                            n_workers=args.workers, tsv_columns=tsv_columns)
+        except (OSError, ValueError) as error:
+            sys.exit(f'Error: {error}')
+        if args.verbose:
+            log.info(f"Files: {summary['files']} ({summary['normalized']} normalized, "
+                     f"{summary['up-to-date']} up to date)")
+    elif args.write_index:
+        norm_clean_file_with_index(wb, ht, args.input, args.output, lang_code=lang_code,
+                                   input_encoding=input_encoding)
+    elif args.concat_manifest:
+        try:
+            output_filename = concat_shard_files(wb, args.concat_manifest, ht)
+        except (OSError, ValueError, KeyError) as error:
+            sys.exit(f'Error: {error}')
+        if args.verbose:
+            log.info(f'Concatenated shards of {args.concat_manifest} into {output_filename}')
+    elif args.shard:
+        try:
+            write_shard_files(wb, ht, args.input, args.output, shard_index, n_shards, lang_code=lang_code,
+                              skip_list_csv=skip_list_csv, checkpoint_every=args.checkpoint_every,
+                              resume=args.resume, input_encoding=input_encoding, tsv_columns=tsv_columns)
+        except ValueError as error:
+            sys.exit(f'Error: {error}')
+    elif args.checkpoint_every:
+        try:
+            norm_clean_file_with_checkpoints(wb, ht, args.input, args.output, lang_code=lang_code,
+                                             checkpoint_every=args.checkpoint_every, resume=args.resume,
+                                             input_encoding=input_encoding, tsv_columns=tsv_columns)
+        except ValueError as error:
+            sys.exit(f'Error: {error}')
+    else:
+        norm_clean_files(wb, ht, input_file, output_file, args.input, args.output, lang_code=lang_code,
+                         n_workers=args.workers, n_threads=args.threads, input_encoding=input_encoding,
+                         tsv_columns=tsv_columns)
+    if args.profile:
+        profile_report = wb.profile_report(ht, (datetime.datetime.now() - start_time).total_seconds())
+        with open(args.profile, 'w', encoding='utf-8') as f:
+            json.dump(profile_report, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        log.info(f"Profile: {profile_report['number-of-lines']} lines; "
+                 f"total {profile_report['time-total']:.3f}s, prescan {profile_report['time-prescan']:.3f}s, "
+                 f"steps {profile_report['time-steps']:.3f}s, I/O {profile_report['time-io']:.3f}s "
+                 f"(written to {args.profile})")
+        for step in profile_report['steps']:
+            time_per_changed_line = step['time-per-changed-line']
+            time_per_changed_line = f'{1e6 * time_per_changed_line:.1f}' if time_per_changed_line else '-'
+            log.info(f"   {step['step']}: {step['time']:.3f}s, {step['changed-lines']}/{step['calls']} lines changed, "
+                     f"{time_per_changed_line} µs per changed line")
+    # Log some change stats.
+    if args.verbose:
+        n_unchanged = 0
+        for unchanged_token in sorted(wb.look_alike_unchanged_dict.keys(),
+                                      key=lambda s: wb.look_alike_unchanged_dict[s],
+                                      reverse=True):
+            n_unchanged += 1
+            if n_unchanged <= 100:
+                count = wb.look_alike_unchanged_dict[unchanged_token]
+                log.debug(f'   unchanged mixed token: {unchanged_token} ({count})')
+        change_count = ht.get('COUNT-ALL', 0)
+        number_of_lines = ht.get('NUMBER-OF-LINES', 0)
+        lines = 'line' if change_count == 1 else 'lines'
+        log_info = f"{str(change_count)} out of {str(number_of_lines)} {lines} changed"
+        for skip_elem in all_skip_elems:
+            n_changed_lines = ht.get(f'COUNT-{skip_elem}', 0)
+            n_lines_with_call = ht.get(f'CALL-{skip_elem}', 0)
+            if n_changed_lines:
+                lines = 'line' if n_changed_lines == 1 else 'lines'
+                log_info += f'; {skip_elem} in {str(n_changed_lines)}/{str(n_lines_with_call)} {lines}'
+                if skip_elem == 'look-alike':
+                    n_change_list = []
+                    for key in ['n-to-Latin', 'n-to-Cyrillic', 'n-to-Greek', 'n-split', 'n-unchanged']:
+                        n_change_list.append(str(wb.look_alike_dict.get(key, 0)))
+                    log_info += f" ({'/'.join(n_change_list)} L/C/G/S/-)"
+        log.info(log_info)
+        if wb.line_cache_size:
+            log.info(f'Line cache: {wb.line_cache_hits} hits, {wb.line_cache_misses} misses')
+        end_time = datetime.datetime.now()
+        log.info(f'End: {end_time}')
+        elapsed_time = end_time - start_time
+        log.info(f'Time: {elapsed_time}')
+
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistent Wildebeest normalization server and thin client, for shell pipelines that would otherwise start
+wildebeest_normalize.py (and build its tables) many times.
+The server keeps a warm Wildebeest and listens on a Unix socket (or on a localhost TCP port).
+The client streams STDIN to the server and the normalized text back to STDOUT, with --lc and --skip per request.
+Each stream is handled in a forked child process (threads, where fork is not available),
+so that many streams can be normalized concurrently.
+Examples:
+  wildebeest_server.py serve --socket /tmp/wildebeest.sock &
+  wildebeest_server.py client --socket /tmp/wildebeest.sock --lc fas < 3S-dev-ssplit.aux.tok > 3S-dev.clean.tok
+  wildebeest_server.py serve --port 8765 &
+  wildebeest_server.py client --port 8765 --skip digit,punct -i corpus.txt -o corpus.clean.txt
+Protocol: the client sends a JSON header line, e.g. {"lc": "fas", "skip": "digit,punct"}, followed by UTF-8 text.
+The server replies with a JSON status line ({"status": "ok"} or {"error": ...}), followed by the normalized text.
+"""
+
+import argparse
+import io
+import json
+import logging as log
+import os
+import re
+import shutil
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from typing import BinaryIO, Optional, Tuple
+
+log.basicConfig(level=log.INFO)
+
+
+def new_wildebeest():
+    """
+    Warm Wildebeest of the server, shared by all concurrent streams. This is thread-safe, as each stream has
+    its own change stats and look-alike stats (see Wildebeest.norm_clean_lines).
+    """
+    # Imported here rather than at the top, so that the client does not pay for importing the normalizer.
+    try:
+        from wildebeest import wildebeest_normalize
+    except ImportError:  # when called as a script from this directory
+        import wildebeest_normalize
+    wb = wildebeest_normalize.Wildebeest()
+    wb.load_look_alike_file(verbose=False)
+    return wb
+
+
+def parse_request_header(line: bytes) -> Tuple[str, dict]:
+    """Returns language code and ht (with SKIP- entries) of a request header. Raises ValueError for bad headers."""
+    header = json.loads(line.decode('utf-8'))
+    if not isinstance(header, dict):
+        raise ValueError('header is not a JSON object')
+    lang_code = header.get('lc', '') or ''
+    skip_list_csv = header.get('skip', '') or ''
+    if not (isinstance(lang_code, str) and isinstance(skip_list_csv, str)):
+        raise ValueError("'lc' and 'skip' must be strings")
+    # Same as wildebeest_normalize.py
+    if lang_code == 'fa':
+        lang_code = 'fas'
+    ht = {}
+    if skip_list_csv != '':
+        for skip_elem in re.split(r',\s*', skip_list_csv):
+            ht[f'SKIP-{skip_elem}'] = 1
+    return lang_code, ht
+
+
+class WildebeestRequestHandler(socketserver.StreamRequestHandler):
+    """Normalizes one stream: header line, then text lines until the client closes its side of the connection."""
+
+    def handle(self):
+        header_line = self.rfile.readline()
+        if not header_line.strip():
+            return  # e.g. a connection that only checks whether the server is running
+        try:
+            lang_code, ht = parse_request_header(header_line)
+        except ValueError as error:
+            try:
+                self.wfile.write((json.dumps({'error': f'Bad request header: {error}'}) + '\n').encode('utf-8'))
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            return
+        self.wfile.write(b'{"status": "ok"}\n')
+        # Same encoding error handling as wildebeest_normalize.py
+        input_file = io.TextIOWrapper(self.rfile, encoding='utf-8', errors='surrogateescape')
+        output_file = io.TextIOWrapper(self.wfile, encoding='utf-8', errors='ignore', write_through=False)
+        wb = self.server.wildebeest
+        try:
+            wb.norm_clean_lines(ht, input_file=input_file, output_file=output_file, lang_code=lang_code,
+                                look_alike_stats=wb.new_look_alike_stats())
+            output_file.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            log.warning('Client closed connection')
+        finally:
+            input_file.detach()
+            output_file.detach()
+
+
+if hasattr(os, 'fork'):
+    # Forked child processes share the warm Wildebeest tables of the server (copy-on-write).
+    ConcurrencyMixIn = socketserver.ForkingMixIn
+else:
+    ConcurrencyMixIn = socketserver.ThreadingMixIn
+
+
+class WildebeestUnixServer(ConcurrencyMixIn, socketserver.UnixStreamServer):
+    pass
+
+
+class WildebeestTCPServer(ConcurrencyMixIn, socketserver.TCPServer):
+    allow_reuse_address = True
+
+
+def serve(socket_filename: Optional[str] = None, port: Optional[int] = None, max_streams: int = 40) -> None:
+    wb = new_wildebeest()
+    if socket_filename:
+        if os.path.exists(socket_filename):
+            # Remove a socket left over from an earlier server, unless that server is still running.
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                try:
+                    probe.connect(socket_filename)
+                    sys.exit(f'Error: a server is already listening on {socket_filename}')
+                except (ConnectionRefusedError, FileNotFoundError):
+                    os.remove(socket_filename)
+        server = WildebeestUnixServer(socket_filename, WildebeestRequestHandler)
+        address = socket_filename
+    else:
+        server = WildebeestTCPServer(('localhost', port), WildebeestRequestHandler)
+        address = f'localhost:{port}'
+    server.wildebeest = wb
+    if hasattr(server, 'max_children'):
+        server.max_children = max_streams
+    log.info(f'Wildebeest server listening on {address}')
+    server_pid = os.getpid()
+    signal.signal(signal.SIGTERM, lambda signal_number, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if os.getpid() == server_pid:
+            server.server_close()
+            if socket_filename and os.path.exists(socket_filename):
+                os.remove(socket_filename)
+
+
+def connect(socket_filename: Optional[str] = None, port: Optional[int] = None) -> socket.socket:
+    if socket_filename:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(socket_filename)
+    else:
+        sock = socket.create_connection(('localhost', port))
+    return sock
+
+
+def client(input_file: BinaryIO, output_file: BinaryIO, socket_filename: Optional[str] = None,
+           port: Optional[int] = None, lang_code: str = '', skip_list_csv: str = '') -> None:
+    """Streams input_file through the server to output_file."""
+    sock = connect(socket_filename, port)
+    with sock:
+        header = json.dumps({'lc': lang_code, 'skip': skip_list_csv}) + '\n'
+        sock.sendall(header.encode('utf-8'))
+
+        def send_input():
+            # Sent by a separate thread, so that output is read back while input is still being sent.
+            try:
+                while True:
+                    data = input_file.read(1 << 16)
+                    if not data:
+                        break
+                    sock.sendall(data)
+                sock.shutdown(socket.SHUT_WR)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+        sender = threading.Thread(target=send_input, daemon=True)
+        sender.start()
+        response_file = sock.makefile('rb')
+        status = json.loads(response_file.readline().decode('utf-8') or '{"error": "No response from server"}')
+        if 'error' in status:
+            sys.exit(f"Error: {status['error']}")
+        shutil.copyfileobj(response_file, output_file)
+        output_file.flush()
+        sender.join()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description='Persistent Wildebeest normalization server and client')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve_parser = subparsers.add_parser('serve', help='start a server with a warm Wildebeest')
+    client_parser = subparsers.add_parser('client', help='normalize STDIN (or file) through a server')
+    for subparser in (serve_parser, client_parser):
+        address_group = subparser.add_mutually_exclusive_group(required=True)
+        address_group.add_argument('--socket', type=str, metavar='SOCKET-FILENAME', help='Unix socket')
+        address_group.add_argument('--port', type=int, metavar='PORT', help='localhost TCP port')
+    serve_parser.add_argument('--max-streams', type=int, default=40, metavar='N',
+                              help='maximum number of concurrently normalized streams (default: 40)')
+    client_parser.add_argument('-i', '--input', type=argparse.FileType('rb'), default=sys.stdin.buffer,
+                               metavar='INPUT-FILENAME', help='(default: STDIN)')
+    client_parser.add_argument('-o', '--output', type=argparse.FileType('wb'), default=sys.stdout.buffer,
+                               metavar='OUTPUT-FILENAME', help='(default: STDOUT)')
+    client_parser.add_argument('--lc', type=str, default='', metavar='LANGUAGE-CODE',
+                               help="ISO 639-3, e.g. 'fas' for Persian")
+    client_parser.add_argument('--skip', type=str, default='', metavar='NORM-STEPS',
+                               help='comma-separated list of normalization/cleaning steps to be skipped')
+    args = parser.parse_args(argv)
+    if args.command == 'serve':
+        serve(socket_filename=args.socket, port=args.port, max_streams=args.max_streams)
+    else:
+        client(args.input, args.output, socket_filename=args.socket, port=args.port,
+               lang_code=args.lc, skip_list_csv=args.skip)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])